@@ -0,0 +1,62 @@
+# --- Utilitários comuns dos benchmarks ---
+# Cada benchmark roda contra um SQLite temporário com dados sintéticos; o
+# serviço é importado direto do diretório dele, como o uvicorn faria.
+
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.engine import make_url
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+def setup_env(service: str):
+    os.environ["DATABASE_URL"] = temp_sqlite_url()
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    os.environ.pop("USER_SERVICE_URL", None)
+    sys.path.insert(0, os.path.join(BACKEND_DIR, service))
+
+def temp_sqlite_url() -> str:
+    return f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='unitalks-bench-'), 'bench.db')}"
+
+# Os benchmarks apagam e geram dados à vontade: só aceitam SQLite ou um
+# Postgres na própria máquina, nunca um banco remoto
+LOCAL_HOSTS = (None, "", "localhost", "127.0.0.1", "::1")
+
+def ensure_local_database(url: str):
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "sqlite":
+        return
+    if backend != "postgresql" or parsed.host not in LOCAL_HOSTS:
+        raise SystemExit(f"Banco não permitido para benchmark: {parsed.render_as_string(hide_password=True)} "
+                         "(use SQLite ou um Postgres local)")
+
+# Mesmo passo de um deploy: user_service primeiro (dono de users/follows)
+def migrate(database_url: str, backend_dir: str = BACKEND_DIR):
+    for service in ("user_service", "post_service"):
+        subprocess.run(
+            [sys.executable, "migrate.py"], cwd=os.path.join(backend_dir, service), check=True,
+            env={**os.environ, "DATABASE_URL": database_url, "SECRET_KEY": "benchmark"},
+        )
+
+def seed_posts(database, models, posts: int, replies_per_post: int, authors: int = 50):
+    models.Base.metadata.create_all(bind=database.engine)
+    start = datetime.now(timezone.utc) - timedelta(days=30)
+    with database.engine.begin() as conn:
+        conn.execute(models.User.__table__.insert(), [
+            {"id": i, "name": f"Autor {i}", "email": f"autor{i}@unitalks.dev", "college": "UFX"}
+            for i in range(1, authors + 1)
+        ])
+        conn.execute(models.Post.__table__.insert(), [
+            {"id": i, "content": f"Opinião número {i} " * 8, "created_at": start + timedelta(minutes=i),
+             "owner_id": 1 + i % authors, "agree_count": i % 17, "disagree_count": i % 5}
+            for i in range(1, posts + 1)
+        ])
+        conn.execute(models.Reply.__table__.insert(), [
+            {"content": f"Resposta {j} ao post {i}", "created_at": start + timedelta(minutes=i, seconds=j),
+             "post_id": i, "owner_id": 1 + (i + j) % authors, "parent_reply_id": None}
+            for i in range(1, posts + 1) for j in range(replies_per_post)
+        ])
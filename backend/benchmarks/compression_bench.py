@@ -0,0 +1,57 @@
+# --- Medição: compressão das respostas do feed e da busca ---
+# Para respostas típicas de /posts/ e /search (com prévia de respostas), mostra
+# o tamanho sem compressão, o tamanho com gzip/brotli em alguns níveis e o
+# custo de CPU (mediana do tempo de compressão por resposta).
+# brotli só aparece se o pacote estiver instalado (pip install brotli).
+#
+#   python backend/benchmarks/compression_bench.py [--repeat 50]
+
+import argparse
+import statistics
+import time
+
+import common
+
+def _cpu_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    common.setup_env("post_service")
+    import database, models
+    common.seed_posts(database, models, posts=1000, replies_per_post=4)
+
+    from fastapi.testclient import TestClient
+    import compression, main as post_service
+
+    codecs = [("gzip", {"gzip_level": level}, f"gzip-{level}") for level in (1, 5, 9)]
+    if compression.brotli is not None:
+        codecs += [("br", {"brotli_quality": quality}, f"br-{quality}") for quality in (1, 4, 8)]
+
+    endpoints = [
+        "/posts/?limit=10&replies_preview=3",
+        "/posts/?limit=50&replies_preview=3",
+        "/search?q=opiniao&limit=50&replies_preview=3",
+        "/posts/user/1",
+    ]
+
+    with TestClient(post_service.app) as client:
+        for url in endpoints:
+            body = client.get(url, headers={"Accept-Encoding": "identity"}).content
+            print(f"\n{url}  ({len(body)} bytes sem compressão)")
+            print(f"  {'codec':<8} {'bytes':>8} {'razão':>7} {'CPU (ms)':>9}")
+            for encoding, options, label in codecs:
+                compressed = compression.compress(body, encoding, **options)
+                cpu = _cpu_ms(lambda: compression.compress(body, encoding, **options), args.repeat)
+                print(f"  {label:<8} {len(compressed):>8} {len(body) / len(compressed):>6.1f}x {cpu:>9.3f}")
+
+if __name__ == "__main__":
+    main()
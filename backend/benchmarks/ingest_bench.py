@@ -0,0 +1,122 @@
+# --- Medição: importação em lote x um POST por item ---
+# Sobe os dois serviços (ver loadtest.py) sobre um banco migrado e com dados
+# e grava o mesmo número de posts e de respostas pelos dois caminhos:
+#   por item   POST /posts/ e POST /posts/{id}/replies, --concurrency clientes
+#              simultâneos, cada item com o token do próprio autor
+#   em lote    POST /posts/bulk e /replies/bulk, --batch-size itens por pedido
+# e reporta linhas gravadas por segundo (medidas no cliente). Só SQLite
+# (temporário) ou um Postgres local; o banco de --database-url é recriado.
+#
+#   python backend/benchmarks/ingest_bench.py --items 2000
+#   python backend/benchmarks/ingest_bench.py --database-url postgresql://postgres@localhost/unitalks_bench
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import httpx
+from jose import jwt
+from sqlalchemy import create_engine
+
+import common
+import loadtest
+import seed
+
+ADMIN_ID = 1
+
+
+def _token(user_id: int) -> dict:
+    expire = datetime.now(timezone.utc) + timedelta(days=1)
+    token = jwt.encode({"sub": f"user{user_id}@unitalks.dev", "exp": expire}, loadtest.SECRET_KEY, algorithm="HS256")
+    return {"Authorization": f"Bearer {token}"}
+
+
+def make_items(dataset: dict, count: int, rng: random.Random):
+    users = dataset["user_ids"]
+    posts = [
+        {"content": f"post importado {index} " + "texto " * rng.randint(5, 40), "owner_id": rng.choice(users)}
+        for index in range(count)
+    ]
+    # Metade no primeiro nível, metade sob uma resposta existente do mesmo post
+    parents = dataset["reply_parents"]
+    threads = list(parents)
+    replies = []
+    for index in range(count):
+        post_id = rng.choice(threads)
+        parent_id = rng.choice(parents[post_id]) if parents[post_id] and rng.random() < 0.5 else None
+        replies.append({"content": f"resposta importada {index}", "owner_id": rng.choice(users),
+                        "post_id": post_id, "parent_reply_id": parent_id})
+    return posts, replies
+
+
+async def per_item(url: str, kind: str, items: list, concurrency: int) -> float:
+    tokens = {item["owner_id"]: _token(item["owner_id"]) for item in items}
+    queue = list(reversed(items))
+
+    async def worker(client: httpx.AsyncClient):
+        while queue:
+            item = queue.pop()
+            if kind == "posts":
+                response = await client.post("/posts/", json={"content": item["content"]},
+                                             headers=tokens[item["owner_id"]])
+            else:
+                response = await client.post(
+                    f"/posts/{item['post_id']}/replies",
+                    json={"content": item["content"], "parent_reply_id": item["parent_reply_id"]},
+                    headers=tokens[item["owner_id"]],
+                )
+            response.raise_for_status()
+
+    async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        return time.perf_counter() - started
+
+
+def bulk(url: str, kind: str, items: list, batch_size: int) -> float:
+    headers = _token(ADMIN_ID)
+    with httpx.Client(base_url=url, timeout=300) as client:
+        started = time.perf_counter()
+        for start in range(0, len(items), batch_size):
+            response = client.post(f"/{kind}/bulk", json=items[start:start + batch_size], headers=headers)
+            response.raise_for_status()
+            result = response.json()
+            if result["errors"]:
+                raise SystemExit(f"/{kind}/bulk recusou itens: {result['errors'][:3]}")
+        return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url")
+    parser.add_argument("--items", type=int, default=2000, help="posts e respostas por caminho")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    database_url = loadtest.prepare_database(args.database_url)
+    common.migrate(database_url)
+    dataset = seed.seed(create_engine(database_url), SimpleNamespace(
+        users=500, follows_per_user=30, posts=5000, replies=5000, thread_depth=5, votes=20000,
+        skew=1.1, days=30, seed=42, fanout_max_followers=10000, timeline_max_length=800,
+    ))
+    rng = random.Random(7)
+
+    env = {"INGEST_ADMINS": f"user{ADMIN_ID}@unitalks.dev"}
+    print(f"{args.items} itens por caminho; lote de {args.batch_size}; {args.concurrency} clientes no caminho por item")
+    print(f"{'':>10}{'por item (linhas/s)':>22}{'em lote (linhas/s)':>21}{'ganho':>9}")
+    with loadtest.Services(database_url, env, args.workers) as services:
+        posts, replies = make_items(dataset, args.items, rng)
+        for kind, items in (("posts", posts), ("replies", replies)):
+            single_seconds = asyncio.run(per_item(services.post_url, kind, items, args.concurrency))
+            bulk_seconds = bulk(services.post_url, kind, items, args.batch_size)
+            single_rate, bulk_rate = args.items / single_seconds, args.items / bulk_seconds
+            print(f"{kind:>10}{single_rate:>22.0f}{bulk_rate:>21.0f}{bulk_rate / single_rate:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
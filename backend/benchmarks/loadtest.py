@@ -0,0 +1,384 @@
+# --- Teste de carga dos dois serviços ---
+# Cria o schema (migrate.py de cada serviço), gera um conjunto de dados
+# sintético (seed.py), sobe user_service e post_service (uvicorn, ver
+# serve.py) e dispara as misturas de requisições de scenarios.py com N
+# clientes simultâneos. Para cada operação reporta vazão e latência
+# p50/p95/p99 medidas no cliente.
+#
+# Só roda contra SQLite (padrão: arquivo temporário) ou um Postgres local;
+# o banco indicado em --database-url é APAGADO e recriado a cada variante.
+#
+#   python backend/benchmarks/loadtest.py                       # browse + write_heavy
+#   python backend/benchmarks/loadtest.py --mix coverage --duration 30
+#   python backend/benchmarks/loadtest.py --database-url postgresql://postgres@localhost/unitalks_bench
+#
+# Variantes comparam configurações com o mesmo conjunto de dados:
+#   --variant buffer:VOTE_BUFFER_ENABLED=1 --mix hot_votes
+#   --variant async:DB_ASYNC=1
+#   --variant hash1:HASH_WORKERS=1 --variant hash4:HASH_WORKERS=4 --mix login_burst
+# A variante "default" (sem ajustes) sempre roda primeiro.
+#
+# Regressões: --check compara com baselines.json e termina com código 1 se a
+# vazão cair ou o p50 de alguma operação subir além de --tolerance (o p95,
+# além do dobro dela). --repeat N roda cada mistura N vezes e usa a mediana.
+# --update-baseline grava o resultado atual como nova referência. As
+# referências só valem para a mesma máquina, banco, dataset e concorrência;
+# numa máquina nova, gere as suas antes de usar --check.
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+import httpx
+from sqlalchemy import MetaData, create_engine
+from sqlalchemy.engine import make_url
+
+import common
+import scenarios
+import seed
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_FILE = os.path.join(BENCHMARKS_DIR, "baselines.json")
+SECRET_KEY = "benchmark"
+STARTUP_TIMEOUT = 60
+# Operações com menos amostras que isso não entram na comparação
+MIN_SAMPLES = 30
+# Folga absoluta: variações de poucos ms em operações rápidas não são regressão
+SLACK_MS = 5.0
+MAX_ERROR_RATE = 0.01
+
+
+# --- Banco e serviços ---
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def prepare_database(url: str) -> str:
+    if url is None:
+        return common.temp_sqlite_url()
+    common.ensure_local_database(url)
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        for suffix in ("", "-wal", "-shm"):
+            if parsed.database and os.path.exists(parsed.database + suffix):
+                os.remove(parsed.database + suffix)
+    else:
+        engine = create_engine(url)
+        metadata = MetaData()
+        metadata.reflect(bind=engine)
+        metadata.drop_all(bind=engine)
+        engine.dispose()
+    return url
+
+
+class Services:
+    def __init__(self, database_url: str, env: Dict[str, str], workers: int):
+        self.database_url = database_url
+        self.env = env
+        self.workers = workers
+        self.processes: List[subprocess.Popen] = []
+
+    def _start(self, service: str, port: int, extra_env: Dict[str, str]) -> str:
+        env = {**os.environ, "DATABASE_URL": self.database_url, "SECRET_KEY": SECRET_KEY, **extra_env, **self.env}
+        env.pop("BENCH_SERVICE", None)
+        process = subprocess.Popen(
+            [sys.executable, os.path.join(BENCHMARKS_DIR, "serve.py"), service, str(port),
+             "--workers", str(self.workers)],
+            env=env,
+        )
+        self.processes.append(process)
+        url = f"http://127.0.0.1:{port}"
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise SystemExit(f"{service} terminou ao subir (código {process.returncode})")
+            try:
+                if httpx.get(f"{url}/health/ready", timeout=1).status_code == 200:
+                    return url
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.2)
+        raise SystemExit(f"{service} não respondeu em {STARTUP_TIMEOUT}s")
+
+    def __enter__(self):
+        try:
+            self.user_url = self._start("user_service", _free_port(), {})
+            self.post_url = self._start("post_service", _free_port(), {"USER_SERVICE_URL": self.user_url})
+        except BaseException:
+            self.__exit__()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self.processes = []
+
+
+# --- Gerador de carga ---
+
+async def _worker(ctx: scenarios.Context, names: List[str], weights: List[int],
+                  warmup_until: float, stop_at: float, samples: Dict[str, list], errors: Dict[str, int]):
+    while True:
+        name = ctx.rng.choices(names, weights=weights)[0]
+        start = time.perf_counter()
+        if start >= stop_at:
+            return
+        try:
+            response = await scenarios.OPERATIONS[name](ctx)
+        except httpx.HTTPError:
+            failed = True
+        else:
+            if response is None:
+                continue
+            failed = response.status_code >= 400
+        elapsed = time.perf_counter() - start
+        if start < warmup_until:
+            continue
+        samples[name].append(elapsed)
+        if failed:
+            errors[name] += 1
+
+
+async def run_mix(mix: str, services: Services, dataset: dict, args) -> dict:
+    weights_by_name = scenarios.MIXES[mix]
+    names, weights = list(weights_by_name), list(weights_by_name.values())
+    samples: Dict[str, list] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+
+    limits = httpx.Limits(max_connections=args.concurrency * 2, max_keepalive_connections=args.concurrency * 2)
+    async with httpx.AsyncClient(base_url=services.user_url, limits=limits, timeout=60) as user_client, \
+            httpx.AsyncClient(base_url=services.post_url, limits=limits, timeout=60) as post_client:
+        workload = scenarios.Workload(user_client, post_client, dataset, SECRET_KEY, args.skew, args.seed)
+        warmup_until = time.perf_counter() + args.warmup
+        stop_at = warmup_until + args.duration
+        await asyncio.gather(*(
+            _worker(scenarios.Context(workload, worker), names, weights, warmup_until, stop_at, samples, errors)
+            for worker in range(args.concurrency)
+        ))
+    return summarize(samples, errors, args.duration)
+
+
+def median_of_runs(runs: List[dict]) -> dict:
+    # Mediana de cada métrica entre as repetições: uma rodada ruidosa não
+    # vira referência nem acusa regressão sozinha
+    if len(runs) == 1:
+        return runs[0]
+    names = sorted(set().union(*(run["ops"] for run in runs)))
+    return {
+        "throughput": round(statistics.median(run["throughput"] for run in runs), 2),
+        "requests": round(statistics.median(run["requests"] for run in runs)),
+        "error_rate": max(run["error_rate"] for run in runs),
+        "ops": {
+            name: {
+                metric: round(statistics.median(run["ops"][name][metric] for run in runs if name in run["ops"]), 2)
+                for metric in ("count", "errors", "rps", "p50", "p95", "p99")
+            }
+            for name in names
+        },
+    }
+
+
+def _percentile(values: List[float], q: float) -> float:
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def summarize(samples: Dict[str, list], errors: Dict[str, int], duration: float) -> dict:
+    ops = {}
+    for name, values in sorted(samples.items()):
+        values.sort()
+        ops[name] = {
+            "count": len(values),
+            "errors": errors[name],
+            "rps": round(len(values) / duration, 2),
+            "p50": round(_percentile(values, 0.50) * 1000, 2),
+            "p95": round(_percentile(values, 0.95) * 1000, 2),
+            "p99": round(_percentile(values, 0.99) * 1000, 2),
+        }
+    total = sum(op["count"] for op in ops.values())
+    failed = sum(op["errors"] for op in ops.values())
+    return {
+        "throughput": round(total / duration, 2),
+        "requests": total,
+        "error_rate": round(failed / total, 4) if total else 0.0,
+        "ops": ops,
+    }
+
+
+# --- Relatório e referências ---
+
+def print_report(key: str, result: dict):
+    print(f"\n== {key}: {result['throughput']} req/s, {result['requests']} requisições, "
+          f"erros {result['error_rate']:.2%}")
+    print(f"{'operação':<24}{'n':>7}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'erros':>7}")
+    for name, op in result["ops"].items():
+        print(f"{name:<24}{op['count']:>7}{op['rps']:>9}{op['p50']:>10}{op['p95']:>10}{op['p99']:>10}{op['errors']:>7}")
+
+
+def print_comparison(results: Dict[str, dict], mixes: List[str], variants: List[str]):
+    if len(variants) < 2:
+        return
+    print("\n== Comparação entre variantes (req/s | p95 ms das operações principais)")
+    for mix in mixes:
+        base = results[f"default/{mix}"]
+        for variant in variants[1:]:
+            other = results[f"{variant}/{mix}"]
+            print(f"{mix}: default {base['throughput']} req/s x {variant} {other['throughput']} req/s")
+            for name in sorted(set(base["ops"]) & set(other["ops"]), key=lambda n: -base["ops"][n]["count"])[:6]:
+                print(f"    {name:<22}{base['ops'][name]['p95']:>10}{other['ops'][name]['p95']:>10}")
+
+
+def profile(args) -> dict:
+    return {
+        "backend": make_url(args.database_url or "sqlite://").get_backend_name(),
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "repeat": args.repeat,
+        "workers": args.workers,
+        "dataset": {name: getattr(args, name) for name in
+                    ("users", "follows_per_user", "posts", "replies", "thread_depth", "votes", "skew", "seed")},
+    }
+
+
+def check_regressions(baselines: dict, results: Dict[str, dict], current_profile: dict, tolerance: float) -> List[str]:
+    problems = []
+    for key, result in results.items():
+        if result["error_rate"] > MAX_ERROR_RATE:
+            problems.append(f"{key}: taxa de erros {result['error_rate']:.2%}")
+        base = baselines.get(key)
+        if base is None:
+            print(f"aviso: sem referência para {key}")
+            continue
+        if base["profile"] != current_profile:
+            print(f"aviso: referência de {key} foi gerada com outra configuração; ignorada")
+            continue
+        if result["throughput"] < base["throughput"] * (1 - tolerance):
+            problems.append(f"{key}: vazão {result['throughput']} req/s < referência {base['throughput']} req/s")
+        for name, op in result["ops"].items():
+            ref = base["ops"].get(name)
+            if ref is None or op["count"] < MIN_SAMPLES or ref["count"] < MIN_SAMPLES:
+                continue
+            # A cauda oscila mais que a mediana: o p95 tem o dobro da tolerância
+            for metric, allowed in (("p50", tolerance), ("p95", 2 * tolerance)):
+                limit = ref[metric] * (1 + allowed) + SLACK_MS
+                if op[metric] > limit:
+                    problems.append(f"{key} {name}: {metric} {op[metric]} ms > {limit:.2f} ms "
+                                    f"(referência {ref[metric]} ms)")
+    return problems
+
+
+def load_baselines(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baselines(path: str, baselines: dict):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baselines, f, indent=2, sort_keys=True, ensure_ascii=False)
+        f.write("\n")
+
+
+def parse_variant(value: str) -> Tuple[str, Dict[str, str]]:
+    name, _, assignments = value.partition(":")
+    env = {}
+    for assignment in filter(None, assignments.split(",")):
+        key, sep, val = assignment.partition("=")
+        if not sep:
+            raise argparse.ArgumentTypeError(f"variante inválida: {value} (use nome:CHAVE=valor,...)")
+        env[key] = val
+    return name, env
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", help="SQLite ou Postgres local (padrão: SQLite temporário)")
+    parser.add_argument("--mix", action="append", choices=sorted(scenarios.MIXES),
+                        help="pode repetir (padrão: browse e write_heavy)")
+    parser.add_argument("--variant", action="append", type=parse_variant, default=[],
+                        help="nome:CHAVE=valor,... com variáveis de ambiente para os serviços")
+    parser.add_argument("--duration", type=float, default=15, help="segundos medidos por mistura")
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3, help="rodadas por mistura (usa a mediana)")
+    parser.add_argument("--workers", type=int, default=1, help="workers do uvicorn por serviço")
+    parser.add_argument("--output", help="grava o resultado completo em JSON")
+    parser.add_argument("--baseline-file", default=BASELINE_FILE)
+    parser.add_argument("--check", action="store_true", help="falha se houver regressão")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    seed.add_arguments(parser)
+    args = parser.parse_args()
+
+    mixes = args.mix or ["browse", "write_heavy"]
+    variants = [("default", {})] + args.variant
+    results: Dict[str, dict] = {}
+
+    for variant, env in variants:
+        database_url = prepare_database(args.database_url)
+        common.migrate(database_url)
+        # O seed segue os mesmos limites de timeline.py que os serviços
+        service_env = {**os.environ, **env}
+        args.fanout_max_followers = int(service_env.get("FANOUT_MAX_FOLLOWERS", 10000))
+        args.timeline_max_length = int(service_env.get("TIMELINE_MAX_LENGTH", 800))
+        engine = create_engine(database_url)
+        started = time.perf_counter()
+        dataset = seed.seed(engine, args)
+        engine.dispose()
+        counts = ", ".join(f"{name} {count}" for name, count in dataset["counts"].items())
+        print(f"[{variant}] dados gerados em {time.perf_counter() - started:.1f}s: {counts}")
+
+        with Services(database_url, env, args.workers) as services:
+            for mix in mixes:
+                key = f"{variant}/{mix}"
+                runs = [asyncio.run(run_mix(mix, services, dataset, args)) for _ in range(args.repeat)]
+                results[key] = median_of_runs(runs)
+                print_report(key, results[key])
+
+    print_comparison(results, mixes, [name for name, _ in variants])
+
+    current_profile = profile(args)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"profile": current_profile, "platform": platform.platform(), "results": results}, f, indent=2)
+
+    baselines = load_baselines(args.baseline_file)
+    backend = current_profile["backend"]
+    keyed = {f"{backend}/{key}": result for key, result in results.items()}
+
+    if args.update_baseline:
+        for key, result in keyed.items():
+            baselines[key] = {"profile": current_profile, **result}
+        save_baselines(args.baseline_file, baselines)
+        print(f"\nreferências gravadas em {args.baseline_file}")
+
+    if args.check:
+        problems = check_regressions(baselines, keyed, current_profile, args.tolerance)
+        if problems:
+            print("\nREGRESSÕES:")
+            for problem in problems:
+                print(f"  {problem}")
+            sys.exit(1)
+        print("\nsem regressões")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+# --- Operações e misturas do teste de carga ---
+# Cada operação é uma requisição a um endpoint do user_service ou do
+# post_service, com parâmetros sorteados sobre o conjunto de dados do seed.py
+# (posts quentes recebem mais votos e leituras, celebridades mais visitas).
+# Uma operação devolve a resposta ou None quando não se aplica no momento
+# (ex.: apagar um post quando o usuário ainda não criou nenhum).
+#
+# Misturas (--mix):
+#   browse       leitura típica do app: feed, timeline, respostas, votos
+#   write_heavy  votos, posts, respostas, follows e remoções
+#   hot_votes    rajada de votos em poucos posts (buffer de votos)
+#   login_burst  pico de logins e cadastros (argon2 no pool de processos)
+#   coverage     todos os endpoints com o mesmo peso
+
+import itertools
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+import httpx
+from jose import jwt
+
+from seed import PASSWORD, WORDS, Popularity
+
+ALGORITHM = "HS256"
+
+# Contas criadas por 'register': únicas no processo inteiro, já que
+# repetições e misturas reaproveitam o mesmo banco
+_new_accounts = itertools.count(1)
+
+
+class Workload:
+    def __init__(self, user_client: httpx.AsyncClient, post_client: httpx.AsyncClient,
+                 dataset: dict, secret_key: str, skew: float, seed: int):
+        self.users = user_client
+        self.posts = post_client
+        self.dataset = dataset
+        self.skew = skew
+        self.seed = seed
+        self.user_ids = dataset["user_ids"]
+        self.reply_parents = dataset["reply_parents"]
+        self.created_posts: Dict[int, List[int]] = {}
+        self.created_replies: Dict[int, List[int]] = {}
+        self.feed_cursors: List[str] = []
+        # Tokens emitidos direto com a SECRET_KEY compartilhada: o custo do
+        # login fica só na operação 'login'
+        expire = datetime.now(timezone.utc) + timedelta(days=1)
+        self.tokens = {
+            user_id: {"Authorization": "Bearer " + jwt.encode(
+                {"sub": f"user{user_id}@unitalks.dev", "exp": expire}, secret_key, algorithm=ALGORITHM
+            )}
+            for user_id in self.user_ids
+        }
+
+    def rng(self, worker: int) -> random.Random:
+        return random.Random(self.seed * 1000 + worker)
+
+    def popularity(self, rng: random.Random):
+        return (Popularity(rng, self.user_ids, self.skew), Popularity(rng, self.dataset["hot_order"], self.skew))
+
+
+class Context:
+    # Estado de um worker do gerador de carga
+    def __init__(self, workload: Workload, worker: int):
+        self.w = workload
+        self.rng = workload.rng(worker)
+        self.people, self.hot = workload.popularity(self.rng)
+
+    def user(self) -> int:
+        return self.rng.choice(self.w.user_ids)
+
+    def auth(self, user_id: int) -> dict:
+        return self.w.tokens[user_id]
+
+    def words(self, low: int, high: int) -> str:
+        return " ".join(self.rng.choice(WORDS) for _ in range(self.rng.randint(low, high)))
+
+
+# --- user_service ---
+
+async def login(ctx: Context):
+    user_id = ctx.user()
+    return await ctx.w.users.post("/token", data={"username": f"user{user_id}", "password": PASSWORD})
+
+async def register(ctx: Context):
+    n = next(_new_accounts)
+    return await ctx.w.users.post("/register/", json={
+        "name": f"Novo {n}", "username": f"novo{n}", "email": f"novo{n}@unitalks.dev",
+        "college": "UFMG", "password": PASSWORD,
+    })
+
+async def read_me(ctx: Context):
+    return await ctx.w.users.get("/users/me", headers=ctx.auth(ctx.user()))
+
+async def update_me(ctx: Context):
+    return await ctx.w.users.put("/users/me", json={"bio": ctx.words(3, 12)}, headers=ctx.auth(ctx.user()))
+
+async def user_summaries(ctx: Context):
+    ids = ctx.people.pick(20)
+    return await ctx.w.users.get("/users/summaries", params=[("ids", user_id) for user_id in ids])
+
+async def follow(ctx: Context):
+    user_id, target = ctx.user(), ctx.people.pick()[0]
+    if user_id == target:
+        return None
+    return await ctx.w.users.post(f"/users/{target}/follow", headers=ctx.auth(user_id))
+
+async def unfollow(ctx: Context):
+    user_id, target = ctx.user(), ctx.people.pick()[0]
+    return await ctx.w.users.delete(f"/users/{target}/follow", headers=ctx.auth(user_id))
+
+async def followers(ctx: Context):
+    return await ctx.w.users.get(f"/users/{ctx.people.pick()[0]}/followers", params={"limit": 20})
+
+async def following(ctx: Context):
+    return await ctx.w.users.get(f"/users/{ctx.user()}/following", params={"limit": 20})
+
+async def user_pool_stats(ctx: Context):
+    return await ctx.w.users.get("/pool/stats")
+
+async def user_auth_cache_stats(ctx: Context):
+    return await ctx.w.users.get("/auth/cache/stats")
+
+async def user_metrics(ctx: Context):
+    return await ctx.w.users.get("/metrics")
+
+
+# --- post_service ---
+
+async def feed(ctx: Context):
+    params = {"limit": 10, "replies_preview": 3}
+    # Parte dos leitores rola para a próxima página
+    if ctx.w.feed_cursors and ctx.rng.random() < 0.3:
+        params["cursor"] = ctx.rng.choice(ctx.w.feed_cursors)
+    response = await ctx.w.posts.get("/posts/", params=params)
+    cursor = response.headers.get("X-Next-Cursor")
+    if cursor and len(ctx.w.feed_cursors) < 1000:
+        ctx.w.feed_cursors.append(cursor)
+    return response
+
+async def feed_offset(ctx: Context):
+    return await ctx.w.posts.get("/posts/", params={"skip": ctx.rng.randrange(0, 200, 10), "limit": 10})
+
+async def timeline(ctx: Context):
+    return await ctx.w.posts.get("/timeline", params={"limit": 10, "replies_preview": 3},
+                                 headers=ctx.auth(ctx.user()))
+
+async def trending(ctx: Context):
+    return await ctx.w.posts.get("/posts/trending", params={"replies_preview": 3})
+
+async def search(ctx: Context):
+    return await ctx.w.posts.get("/search", params={"q": ctx.words(1, 2), "limit": 10})
+
+async def replies(ctx: Context):
+    return await ctx.w.posts.get(f"/posts/{ctx.hot.pick()[0]}/replies", params={"limit": 50})
+
+async def reply_thread(ctx: Context):
+    post_id = ctx.rng.choice(ctx.w.dataset["deep_threads"])
+    return await ctx.w.posts.get(f"/posts/{post_id}/replies/thread", params={"depth": 3, "page_size": 10})
+
+async def user_posts(ctx: Context):
+    return await ctx.w.posts.get(f"/posts/user/{ctx.people.pick()[0]}")
+
+async def user_posts_stream(ctx: Context):
+    return await ctx.w.posts.get(f"/posts/user/{ctx.people.pick()[0]}", params={"stream": "true"})
+
+async def liked_posts(ctx: Context):
+    return await ctx.w.posts.get(f"/posts/user/{ctx.user()}/liked")
+
+async def export(ctx: Context):
+    return await ctx.w.posts.get(f"/posts/user/{ctx.people.pick()[0]}/export", params={"format": "ndjson"})
+
+async def my_votes(ctx: Context):
+    ids = ctx.hot.pick(10)
+    return await ctx.w.posts.get("/votes/me", params=[("post_ids", post_id) for post_id in ids],
+                                 headers=ctx.auth(ctx.user()))
+
+async def vote(ctx: Context):
+    vote_type = ctx.rng.choices(["agree", "disagree", "none"], weights=[6, 3, 1])[0]
+    return await ctx.w.posts.post("/vote/", json={"post_id": ctx.hot.pick()[0], "vote_type": vote_type},
+                                  headers=ctx.auth(ctx.user()))
+
+async def create_post(ctx: Context):
+    user_id = ctx.user()
+    response = await ctx.w.posts.post("/posts/", json={"content": ctx.words(8, 40)}, headers=ctx.auth(user_id))
+    if response.status_code == 201:
+        ctx.w.created_posts.setdefault(user_id, []).append(response.json()["id"])
+    return response
+
+async def delete_post(ctx: Context):
+    owners = [user_id for user_id, ids in ctx.w.created_posts.items() if ids]
+    if not owners:
+        return None
+    user_id = ctx.rng.choice(owners)
+    post_id = ctx.w.created_posts[user_id].pop()
+    return await ctx.w.posts.delete(f"/posts/{post_id}", headers=ctx.auth(user_id))
+
+async def create_reply(ctx: Context):
+    user_id, post_id = ctx.user(), ctx.hot.pick()[0]
+    parents = ctx.w.reply_parents.get(post_id)
+    body = {"content": ctx.words(3, 20)}
+    if parents and ctx.rng.random() < 0.6:
+        body["parent_reply_id"] = ctx.rng.choice(parents)
+    response = await ctx.w.posts.post(f"/posts/{post_id}/replies", json=body, headers=ctx.auth(user_id))
+    if response.status_code == 201:
+        ctx.w.created_replies.setdefault(user_id, []).append(response.json()["id"])
+    return response
+
+async def delete_reply(ctx: Context):
+    owners = [user_id for user_id, ids in ctx.w.created_replies.items() if ids]
+    if not owners:
+        return None
+    user_id = ctx.rng.choice(owners)
+    reply_id = ctx.w.created_replies[user_id].pop()
+    return await ctx.w.posts.delete(f"/replies/{reply_id}", headers=ctx.auth(user_id))
+
+async def events(ctx: Context):
+    # Mede até o primeiro byte do stream SSE e desconecta
+    async with ctx.w.posts.stream("GET", "/events") as response:
+        async for _ in response.aiter_raw():
+            break
+    return response
+
+async def post_pool_stats(ctx: Context):
+    return await ctx.w.posts.get("/pool/stats")
+
+async def post_auth_cache_stats(ctx: Context):
+    return await ctx.w.posts.get("/auth/cache/stats")
+
+async def post_metrics(ctx: Context):
+    return await ctx.w.posts.get("/metrics")
+
+
+OPERATIONS = {
+    "login": login,
+    "register": register,
+    "read_me": read_me,
+    "update_me": update_me,
+    "user_summaries": user_summaries,
+    "follow": follow,
+    "unfollow": unfollow,
+    "followers": followers,
+    "following": following,
+    "user_pool_stats": user_pool_stats,
+    "user_auth_cache_stats": user_auth_cache_stats,
+    "user_metrics": user_metrics,
+    "feed": feed,
+    "feed_offset": feed_offset,
+    "timeline": timeline,
+    "trending": trending,
+    "search": search,
+    "replies": replies,
+    "reply_thread": reply_thread,
+    "user_posts": user_posts,
+    "user_posts_stream": user_posts_stream,
+    "liked_posts": liked_posts,
+    "export": export,
+    "my_votes": my_votes,
+    "vote": vote,
+    "create_post": create_post,
+    "delete_post": delete_post,
+    "create_reply": create_reply,
+    "delete_reply": delete_reply,
+    "events": events,
+    "post_pool_stats": post_pool_stats,
+    "post_auth_cache_stats": post_auth_cache_stats,
+    "post_metrics": post_metrics,
+}
+
+MIXES = {
+    "browse": {
+        "feed": 30, "timeline": 10, "trending": 8, "search": 5, "replies": 6, "reply_thread": 6,
+        "user_posts": 4, "liked_posts": 2, "my_votes": 8, "read_me": 4, "user_summaries": 2,
+        "followers": 2, "following": 2, "vote": 6, "create_reply": 2, "create_post": 1,
+        "follow": 1, "unfollow": 1,
+    },
+    "write_heavy": {
+        "vote": 30, "create_post": 8, "create_reply": 12, "delete_post": 3, "delete_reply": 3,
+        "follow": 6, "unfollow": 6, "update_me": 3, "register": 1, "login": 2,
+        "feed": 10, "timeline": 6, "trending": 5, "my_votes": 5,
+    },
+    "hot_votes": {"vote": 85, "trending": 10, "feed": 5},
+    "login_burst": {"login": 80, "register": 5, "read_me": 15},
+    "coverage": {name: 1 for name in OPERATIONS},
+}
+
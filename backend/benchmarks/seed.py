@@ -0,0 +1,236 @@
+# --- Dados sintéticos para o teste de carga ---
+# Gera usuários, follows, posts, threads de respostas aninhadas e votos num
+# banco com o schema já criado (migrate.py dos serviços). A popularidade
+# segue uma lei de potência (Zipf): poucos usuários concentram seguidores e
+# poucos posts "quentes" concentram votos e respostas, como no uso real.
+# A mesma semente (--seed) gera sempre o mesmo conjunto de dados.
+#
+# Contadores desnormalizados (followers_count, following_count, agree_count,
+# disagree_count) e a timeline pré-computada são preenchidos de forma
+# consistente, como se tudo tivesse passado pela API.
+#
+#   python backend/benchmarks/seed.py --database-url sqlite:////tmp/unitalks.db --users 2000
+
+import argparse
+import heapq
+import itertools
+import random
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+from passlib.context import CryptContext
+from sqlalchemy import MetaData, create_engine, func, select, text
+
+import common
+
+PASSWORD = "benchmark123"
+CHUNK_SIZE = 5000
+
+COLLEGES = ["UFMG", "USP", "UNICAMP", "UFRJ", "UFPE", "UnB", "UFRGS", "UFBA", None]
+
+WORDS = (
+    "educação universidade professor prova semestre greve bandejão biblioteca "
+    "estágio pesquisa bolsa matrícula disciplina calouro veterano campus "
+    "mobilidade transporte ônibus moradia aluguel república festa cultura "
+    "política reitoria eleição assembleia centro acadêmico diretório cotas "
+    "inclusão acessibilidade saúde mental ansiedade férias recesso trabalho "
+    "mercado carreira programação engenharia medicina direito economia "
+    "filosofia história física química biologia matemática artes música "
+    "esporte atlética campeonato opinião concordo discordo debate proposta"
+).split()
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    group = parser.add_argument_group("dataset")
+    group.add_argument("--users", type=int, default=1000)
+    group.add_argument("--follows-per-user", type=float, default=25, help="média de perfis seguidos")
+    group.add_argument("--posts", type=int, default=10000)
+    group.add_argument("--replies", type=int, default=30000)
+    group.add_argument("--thread-depth", type=int, default=8, help="profundidade máxima das threads")
+    group.add_argument("--votes", type=int, default=100000)
+    group.add_argument("--skew", type=float, default=1.1, help="expoente Zipf da popularidade")
+    group.add_argument("--days", type=int, default=30, help="janela de datas dos posts")
+    group.add_argument("--seed", type=int, default=42)
+
+
+def _zipf_cum_weights(n: int, skew: float) -> List[float]:
+    return list(itertools.accumulate(1 / (rank ** skew) for rank in range(1, n + 1)))
+
+
+class Popularity:
+    # Sorteia itens com peso 1/rank^skew; 'order' define quem fica em cada rank
+    def __init__(self, rng: random.Random, order: List[int], skew: float):
+        self.rng = rng
+        self.order = order
+        self.cum_weights = _zipf_cum_weights(len(order), skew)
+
+    def pick(self, k: int = 1) -> List[int]:
+        return self.rng.choices(self.order, cum_weights=self.cum_weights, k=k)
+
+    def top(self, fraction: float) -> List[int]:
+        return self.order[:max(1, int(len(self.order) * fraction))]
+
+
+def _insert(conn, table, rows: List[dict]):
+    for start in range(0, len(rows), CHUNK_SIZE):
+        conn.execute(table.insert(), rows[start:start + CHUNK_SIZE])
+
+
+def _content(rng: random.Random, low: int, high: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high))).capitalize() + "."
+
+
+def seed(engine, args) -> dict:
+    rng = random.Random(args.seed)
+    metadata = MetaData()
+    metadata.reflect(bind=engine)
+    users_t, follows_t = metadata.tables["users"], metadata.tables["follows"]
+    posts_t, replies_t, votes_t = metadata.tables["posts"], metadata.tables["replies"], metadata.tables["votes"]
+    timeline_t = metadata.tables["timeline_entries"]
+
+    now = datetime.now(timezone.utc)
+    start = now - timedelta(days=args.days)
+    user_ids = list(range(1, args.users + 1))
+    # Ids baixos são as "celebridades": mais seguidores e mais posts
+    people = Popularity(rng, user_ids, args.skew)
+
+    # --- Follows ---
+    following: Dict[int, set] = {}
+    for user_id in user_ids:
+        wanted = min(args.users - 1, int(rng.expovariate(1 / args.follows_per_user)) if args.follows_per_user else 0)
+        targets = set()
+        for _ in range(4):
+            if len(targets) >= wanted:
+                break
+            targets.update(target for target in people.pick(wanted * 2) if target != user_id)
+        following[user_id] = set(itertools.islice(targets, wanted))
+    followers = Counter(target for targets in following.values() for target in targets)
+
+    # --- Posts ---
+    offsets = sorted(rng.random() for _ in range(args.posts))
+    post_times = [start + timedelta(seconds=offset * args.days * 86400) for offset in offsets]
+    post_owner = [people.pick()[0] for _ in range(args.posts)]
+    post_ids = list(range(1, args.posts + 1))
+    # Posts quentes não dependem da data: a ordem de popularidade é embaralhada
+    hot_order = post_ids[:]
+    rng.shuffle(hot_order)
+    hot = Popularity(rng, hot_order, args.skew)
+
+    # --- Respostas (threads aninhadas) ---
+    replies = []
+    thread_nodes: Dict[int, List[tuple]] = {}  # post_id -> [(reply_id, depth, created_at)]
+    for reply_id, post_id in enumerate(hot.pick(args.replies) if args.posts else [], start=1):
+        nodes = thread_nodes.setdefault(post_id, [])
+        parent_id, depth = None, 0
+        if nodes and rng.random() < 0.7:
+            # Metade das vezes responde a última resposta: gera cadeias profundas
+            parent = nodes[-1] if rng.random() < 0.5 else rng.choice(nodes)
+            if parent[1] < args.thread_depth:
+                parent_id, depth = parent[0], parent[1] + 1
+        created_at = (nodes[-1][2] if nodes else post_times[post_id - 1]) + timedelta(seconds=rng.randint(1, 600))
+        nodes.append((reply_id, depth, created_at))
+        replies.append({
+            "id": reply_id, "content": _content(rng, 3, 20), "created_at": created_at,
+            "post_id": post_id, "owner_id": rng.choice(user_ids), "parent_reply_id": parent_id,
+        })
+
+    # --- Votos (concentrados nos posts quentes) ---
+    votes = {}
+    if args.posts:
+        for post_id in hot.pick(args.votes):
+            votes[(rng.choice(user_ids), post_id)] = 1 if rng.random() < 0.7 else -1
+    agree, disagree = Counter(), Counter()
+    for (_, post_id), vote_type in votes.items():
+        (agree if vote_type == 1 else disagree)[post_id] += 1
+
+    # --- Timeline pré-computada ---
+    # Mesma regra do fan-out de timeline.py (o autor sempre, os seguidores só
+    # de quem tem até FANOUT_MAX_FOLLOWERS), já cortada em TIMELINE_MAX_LENGTH
+    # como ficaria depois das leituras
+    posts_by_owner: Dict[int, List[int]] = {}
+    for post_id in reversed(post_ids):
+        posts_by_owner.setdefault(post_owner[post_id - 1], []).append(post_id)
+    timeline_rows = []
+    for user_id in user_ids:
+        authors = [user_id] + [target for target in following[user_id]
+                               if followers[target] <= args.fanout_max_followers]
+        newest_first = heapq.merge(*(posts_by_owner.get(author, []) for author in authors), reverse=True)
+        timeline_rows.extend(
+            {"user_id": user_id, "created_at": post_times[post_id - 1], "post_id": post_id,
+             "author_id": post_owner[post_id - 1]}
+            for post_id in itertools.islice(newest_first, args.timeline_max_length)
+        )
+
+    password_hash = CryptContext(schemes=["argon2"], deprecated="auto").hash(PASSWORD)
+
+    with engine.begin() as conn:
+        _insert(conn, users_t, [
+            {"id": user_id, "name": f"Usuário {user_id}", "username": f"user{user_id}",
+             "email": f"user{user_id}@unitalks.dev", "hashed_password": password_hash,
+             "college": rng.choice(COLLEGES), "followers_count": followers[user_id],
+             "following_count": len(following[user_id])}
+            for user_id in user_ids
+        ])
+        _insert(conn, follows_t, [
+            {"follower_id": user_id, "followed_id": target}
+            for user_id, targets in following.items() for target in targets
+        ])
+        _insert(conn, posts_t, [
+            {"id": post_id, "content": _content(rng, 8, 40), "created_at": post_times[post_id - 1],
+             "owner_id": post_owner[post_id - 1], "agree_count": agree[post_id],
+             "disagree_count": disagree[post_id]}
+            for post_id in post_ids
+        ])
+        _insert(conn, replies_t, replies)
+        _insert(conn, votes_t, [
+            {"user_id": user_id, "post_id": post_id, "vote_type": vote_type}
+            for (user_id, post_id), vote_type in votes.items()
+        ])
+        _insert(conn, timeline_t, timeline_rows)
+
+        # Ids explícitos não avançam as sequências do Postgres
+        if engine.dialect.name == "postgresql":
+            for table in ("users", "posts", "replies"):
+                conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"(SELECT COALESCE(MAX(id), 1) FROM {table}))"
+                ))
+
+        counts = {
+            name: conn.execute(select(func.count()).select_from(table)).scalar()
+            for name, table in (("users", users_t), ("follows", follows_t), ("posts", posts_t),
+                                ("replies", replies_t), ("votes", votes_t), ("timeline_entries", timeline_t))
+        }
+
+    deep_threads = [post_id for post_id, nodes in thread_nodes.items() if max(depth for _, depth, _ in nodes) >= 3]
+    return {
+        "counts": counts,
+        "user_ids": user_ids,
+        "celebrities": people.top(0.01),
+        "post_ids": post_ids,
+        "hot_posts": hot.top(0.01),
+        "hot_order": hot_order,
+        "deep_threads": deep_threads or list(thread_nodes),
+        "reply_parents": {post_id: [node[0] for node in nodes if node[1] < args.thread_depth]
+                          for post_id, nodes in thread_nodes.items()},
+        "search_terms": WORDS,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--fanout-max-followers", type=int, default=10000)
+    parser.add_argument("--timeline-max-length", type=int, default=800)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    common.ensure_local_database(args.database_url)
+    dataset = seed(create_engine(args.database_url), args)
+    for name, count in dataset["counts"].items():
+        print(f"{name:>18}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# --- Microbenchmark: serialização das listas de posts ---
+# Compara, para páginas de 10, 100 e 1000 posts (com prévia de respostas):
+#   antigo: objetos ORM + threads.attach_replies + response_model (Pydantic
+#           from_attributes) + json.dumps
+#   novo:   colunas (tuplas) + serialization.build_posts + orjson
+# Roda contra um SQLite temporário; não precisa de servidor nem de Postgres.
+#
+#   python backend/benchmarks/serialization_bench.py [--repeat 20] [--preview 3]
+
+import argparse
+import json
+import statistics
+import time
+
+import common
+
+def _time(fn, repeat: int) -> float:
+    fn()  # aquece caches (autores, statements compilados)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--preview", type=int, default=3)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    common.setup_env("post_service")
+    from typing import List
+    from pydantic import TypeAdapter
+    import orjson
+    import database, models, schemas, serialization, threads
+
+    common.seed_posts(database, models, max(args.sizes), replies_per_post=args.preview + 2)
+    adapter = TypeAdapter(List[schemas.PostResponse])
+
+    def page_query(db, size):
+        return db.query(models.Post).order_by(models.Post.created_at.desc(), models.Post.id.desc()).limit(size)
+
+    def old_path(size):
+        with database.SessionLocal() as db:
+            posts = threads.attach_replies(db, page_query(db, size).all(), args.preview)
+            return json.dumps(adapter.dump_python(adapter.validate_python(posts), mode="json")).encode()
+
+    def new_path(size):
+        with database.SessionLocal() as db:
+            rows = serialization.post_rows(page_query(db, size))
+            return orjson.dumps(serialization.build_posts(db, rows, args.preview))
+
+    print(f"{'posts':>6} {'antigo (ms)':>12} {'novo (ms)':>10} {'ganho':>7}")
+    for size in args.sizes:
+        # Os dois caminhos precisam produzir o mesmo JSON
+        assert json.loads(old_path(size)) == json.loads(new_path(size))
+        old_ms = _time(lambda: old_path(size), args.repeat)
+        new_ms = _time(lambda: new_path(size), args.repeat)
+        print(f"{size:>6} {old_ms:>12.2f} {new_ms:>10.2f} {old_ms / new_ms:>6.1f}x")
+
+if __name__ == "__main__":
+    main()
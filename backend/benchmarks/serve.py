@@ -0,0 +1,81 @@
+# --- Sobe um serviço para o teste de carga ---
+# Equivalente a 'uvicorn main:app' dentro do diretório do serviço, com o
+# ajuste que o SQLite precisa: ele não tem now() (default de created_at nos
+# models) e, com dois processos escrevendo no mesmo arquivo, precisa de WAL e
+# busy_timeout. Com --workers > 1 o uvicorn importa este módulo em cada worker.
+#
+#   python backend/benchmarks/serve.py user_service 8000 [--workers 2]
+#
+# BENCH_DB_LATENCY_MS simula um banco remoto: cada conexão nova e cada
+# comando SQL esperam esse tempo (ida e volta na rede).
+# BENCH_BACKEND_DIR sobe o serviço de outro checkout (ex.: a versão anterior,
+# para comparar), mantendo este script.
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+import common
+
+SERVICE = os.environ.get("BENCH_SERVICE")
+BACKEND_DIR = os.environ.get("BENCH_BACKEND_DIR", common.BACKEND_DIR)
+DB_LATENCY = float(os.environ.get("BENCH_DB_LATENCY_MS", 0)) / 1000
+
+
+@event.listens_for(Engine, "connect")
+def _sqlite_compat(dbapi_connection, connection_record):
+    # Só conexões SQLite (sqlite3 ou aiosqlite) têm create_function
+    if not hasattr(dbapi_connection, "create_function"):
+        return
+    dbapi_connection.create_function(
+        "now", 0, lambda: datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")
+    )
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA busy_timeout=10000")
+    cursor.close()
+
+
+if DB_LATENCY:
+    @event.listens_for(Engine, "connect")
+    def _connect_latency(dbapi_connection, connection_record):
+        time.sleep(DB_LATENCY)
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _statement_latency(conn, cursor, statement, parameters, context, executemany):
+        time.sleep(DB_LATENCY)
+
+
+if SERVICE:
+    service_dir = os.path.join(BACKEND_DIR, SERVICE)
+    sys.path.insert(0, service_dir)
+    os.chdir(service_dir)
+    from main import app  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("service", choices=["user_service", "post_service"])
+    parser.add_argument("port", type=int)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    common.ensure_local_database(os.environ["DATABASE_URL"])
+    os.environ["BENCH_SERVICE"] = args.service
+    # Os workers do uvicorn são processos novos: precisam achar este módulo
+    benchmarks_dir = os.path.dirname(os.path.abspath(__file__))
+    os.environ["PYTHONPATH"] = os.pathsep.join(filter(None, [benchmarks_dir, os.environ.get("PYTHONPATH")]))
+    sys.path.insert(0, benchmarks_dir)
+
+    import uvicorn
+    uvicorn.run("serve:app", host="127.0.0.1", port=args.port, workers=args.workers,
+                log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    main()
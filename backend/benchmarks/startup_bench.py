@@ -0,0 +1,112 @@
+# --- Medição: tempo de subida com vários workers ---
+# Sobe o post_service com N workers do uvicorn (ver serve.py) sobre um banco já
+# migrado e com dados, e mede a partir do spawn do processo:
+#   primeira resposta   primeiro GET /posts/ com 200
+#   todos prontos       todos os N workers respondendo 200 em /health/ready
+#                       (cada sondagem abre uma conexão nova, então cai num
+#                       worker qualquer; conta os pids distintos)
+# --db-latency-ms simula um banco remoto (espera em cada conexão e comando).
+# --backend-dir mede outro checkout com o mesmo script, ex. a versão que ainda
+# fazia create_all ao importar (sem /health/ready, só a primeira resposta):
+#
+#   git worktree add /tmp/unitalks-old <commit>
+#   python backend/benchmarks/startup_bench.py --workers 4 --db-latency-ms 20
+#   python backend/benchmarks/startup_bench.py --workers 4 --db-latency-ms 20 --backend-dir /tmp/unitalks-old/backend
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+import httpx
+from sqlalchemy import create_engine
+
+import common
+import seed
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+TIMEOUT = 120
+POLL_INTERVAL = 0.005
+
+
+def _get(url: str):
+    try:
+        return httpx.get(url, timeout=5)
+    except httpx.HTTPError:
+        return None
+
+
+def measure(database_url: str, workers: int, latency_ms: float, backend_dir: str) -> dict:
+    port = 8900 + os.getpid() % 90
+    env = {**os.environ, "DATABASE_URL": database_url, "SECRET_KEY": "benchmark",
+           "BENCH_BACKEND_DIR": backend_dir, "BENCH_DB_LATENCY_MS": str(latency_ms)}
+    env.pop("BENCH_SERVICE", None)
+    base = f"http://127.0.0.1:{port}"
+
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(BENCHMARKS_DIR, "serve.py"), "post_service", str(port), "--workers", str(workers)],
+        env=env,
+    )
+    first_request = all_ready = None
+    has_readiness = True
+    ready_pids = set()
+    try:
+        while time.perf_counter() - started < TIMEOUT:
+            if process.poll() is not None:
+                raise SystemExit(f"post_service terminou ao subir (código {process.returncode})")
+            if first_request is None:
+                response = _get(f"{base}/posts/?limit=10")
+                if response is not None and response.status_code == 200:
+                    first_request = time.perf_counter() - started
+            if has_readiness and all_ready is None:
+                response = _get(f"{base}/health/ready")
+                if response is not None and response.status_code == 404:
+                    has_readiness = False
+                elif response is not None and response.status_code == 200:
+                    ready_pids.add(response.json()["pid"])
+                    if len(ready_pids) == workers:
+                        all_ready = time.perf_counter() - started
+            if first_request is not None and (all_ready is not None or not has_readiness):
+                break
+            time.sleep(POLL_INTERVAL)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return {"first_request": first_request, "all_ready": all_ready}
+
+
+def _ms(values):
+    values = [value for value in values if value is not None]
+    return f"{statistics.median(values) * 1000:8.0f}" if values else "       -"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--db-latency-ms", type=float, action="append",
+                        help="pode repetir (padrão: 0 e 20)")
+    parser.add_argument("--backend-dir", default=common.BACKEND_DIR)
+    parser.add_argument("--posts", type=int, default=5000)
+    args = parser.parse_args()
+
+    database_url = common.temp_sqlite_url()
+    common.migrate(database_url)
+    dataset = SimpleNamespace(users=300, follows_per_user=20, posts=args.posts, replies=args.posts,
+                              thread_depth=5, votes=args.posts * 5, skew=1.1, days=30, seed=42,
+                              fanout_max_followers=10000, timeline_max_length=800)
+    seed.seed(create_engine(database_url), dataset)
+
+    print(f"{args.backend_dir}: {args.workers} workers, mediana de {args.runs} rodadas (ms desde o spawn)")
+    print(f"{'latência do banco':>18}{'1ª resposta':>14}{'todos prontos':>15}")
+    for latency_ms in args.db_latency_ms or [0, 20]:
+        runs = [measure(database_url, args.workers, latency_ms, args.backend_dir) for _ in range(args.runs)]
+        print(f"{latency_ms:>15.0f} ms{_ms(r['first_request'] for r in runs):>14}{_ms(r['all_ready'] for r in runs):>15}")
+
+
+if __name__ == "__main__":
+    main()
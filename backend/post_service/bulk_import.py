@@ -0,0 +1,135 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+import argparse
+import json
+import os
+import sys
+import time
+
+# --- Importação em lote pela linha de comando ---
+# Envia arquivos NDJSON (um item por linha) para POST /posts/bulk e
+# /replies/bulk em lotes de --batch-size. Só usa a biblioteca padrão e não
+# toca o banco: as mesmas validações da API valem aqui.
+#
+#   python bulk_import.py --url http://127.0.0.1:8001 --token $TOKEN \
+#       --posts posts.ndjson --replies replies.ndjson --refs refs.json
+#
+# O token é de um usuário listado em INGEST_ADMINS (login normal em /token).
+# Cada linha tem os campos de schemas.PostImport / ReplyImport. Para migrar
+# conteúdo de outro fórum, sem saber os ids de antemão, use referências:
+#   post     {"ref": "p1", "content": "...", "owner_id": 7, "created_at": "..."}
+#   resposta {"ref": "r1", "post_ref": "p1", "content": "...", "owner_id": 9}
+#            {"post_ref": "p1", "parent_ref": "r1", "content": "...", "owner_id": 7}
+# Uma referência só pode apontar para uma linha anterior (ou para --refs, de
+# uma execução passada). --refs carrega e grava o mapa ref -> id.
+# Linhas recusadas vão para a saída de erros como "arquivo:linha: motivo".
+
+REF_FIELDS = {"post_ref": "post_id", "parent_ref": "parent_reply_id"}
+
+
+class Importer:
+    def __init__(self, url: str, token: str, batch_size: int, refs: Dict[str, Dict[str, int]]):
+        self.url = url.rstrip("/")
+        self.token = token
+        self.batch_size = batch_size
+        # "posts"/"replies" -> ref -> id
+        self.refs = refs
+        self.created = 0
+        self.failed = 0
+
+    def _post(self, path: str, items: List[dict]) -> dict:
+        request = Request(
+            f"{self.url}{path}",
+            data=json.dumps(items).encode(),
+            headers={"Content-Type": "application/json", "Authorization": f"Bearer {self.token}"},
+        )
+        try:
+            with urlopen(request, timeout=300) as response:
+                return json.load(response)
+        except HTTPError as error:
+            raise SystemExit(f"{path}: HTTP {error.code} {error.read().decode(errors='replace')}")
+
+    def _fail(self, origin: str, detail: str):
+        self.failed += 1
+        print(f"{origin}: {detail}", file=sys.stderr)
+
+    def _send(self, kind: str, batch: List[Tuple[str, Optional[str], dict]]):
+        if not batch:
+            return
+        result = self._post(f"/{kind}/bulk", [item for _, _, item in batch])
+        errors = {error["index"]: error["detail"] for error in result["errors"]}
+        for index, ((origin, ref, _), item_id) in enumerate(zip(batch, result["ids"])):
+            if item_id is None:
+                self._fail(origin, errors.get(index, "recusado"))
+                continue
+            self.created += 1
+            if ref is not None:
+                self.refs[kind][ref] = item_id
+        batch.clear()
+
+    def _resolve(self, item: dict, batch: List[Tuple[str, Optional[str], dict]], kind: str) -> Optional[str]:
+        for ref_field, id_field in REF_FIELDS.items():
+            ref = item.pop(ref_field, None)
+            if ref is None:
+                continue
+            target = "posts" if ref_field == "post_ref" else "replies"
+            # Referência a um item do lote ainda não enviado: envia o lote antes
+            if target == kind and any(pending_ref == ref for _, pending_ref, _ in batch):
+                self._send(kind, batch)
+            if ref not in self.refs[target]:
+                return f"referência '{ref}' não importada"
+            item[id_field] = self.refs[target][ref]
+        return None
+
+    def run(self, kind: str, lines: Iterator[Tuple[str, dict]]):
+        batch: List[Tuple[str, Optional[str], dict]] = []
+        for origin, item in lines:
+            ref = item.pop("ref", None)
+            error = self._resolve(item, batch, kind)
+            if error:
+                self._fail(origin, error)
+                continue
+            batch.append((origin, ref, item))
+            if len(batch) >= self.batch_size:
+                self._send(kind, batch)
+        self._send(kind, batch)
+
+
+def read_ndjson(path: str) -> Iterator[Tuple[str, dict]]:
+    with open(path, encoding="utf-8") as file:
+        for number, line in enumerate(file, 1):
+            if line.strip():
+                yield f"{path}:{number}", json.loads(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Importa posts e respostas em lote (NDJSON)")
+    parser.add_argument("--url", default=os.environ.get("POST_SERVICE_URL", "http://127.0.0.1:8001"))
+    parser.add_argument("--token", default=os.environ.get("INGEST_TOKEN"), help="padrão: $INGEST_TOKEN")
+    parser.add_argument("--posts", help="NDJSON de posts")
+    parser.add_argument("--replies", help="NDJSON de respostas (depois dos posts)")
+    parser.add_argument("--refs", help="arquivo JSON com o mapa ref -> id (lido e atualizado)")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    if not args.token:
+        parser.error("informe --token ou INGEST_TOKEN")
+
+    refs = {"posts": {}, "replies": {}}
+    if args.refs and os.path.exists(args.refs):
+        with open(args.refs, encoding="utf-8") as file:
+            refs.update(json.load(file))
+
+    importer = Importer(args.url, args.token, args.batch_size, refs)
+    started = time.perf_counter()
+    try:
+        for kind, path in (("posts", args.posts), ("replies", args.replies)):
+            if path:
+                importer.run(kind, read_ndjson(path))
+    finally:
+        if args.refs:
+            with open(args.refs, "w", encoding="utf-8") as file:
+                json.dump(importer.refs, file)
+    elapsed = time.perf_counter() - started
+    print(f"{importer.created} importados, {importer.failed} recusados em {elapsed:.1f}s "
+          f"({importer.created / elapsed if elapsed else 0:.0f} itens/s)")
@@ -0,0 +1,35 @@
+from fastapi import Request, Response, status
+from typing import Optional
+import hashlib
+
+# --- ETag fraco e GET condicional ---
+# O endpoint calcula um fingerprint barato do que a resposta conteria (ids,
+# contadores...) antes de montar o corpo. Se bater com o If-None-Match do
+# cliente, responde 304 sem serializar nada e, quando dá, sem rodar a
+# consulta completa.
+
+# Pode guardar a cópia, mas revalida a cada uso (o 304 é barato)
+NO_CACHE = "public, no-cache"
+
+def make_etag(*parts) -> str:
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+def _matches(if_none_match: Optional[str], tag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Comparação fraca: W/"x" e "x" são equivalentes
+    wanted = tag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == wanted for candidate in if_none_match.split(","))
+
+def conditional(request: Request, response: Response, tag: str, cache_control: str = NO_CACHE) -> Optional[Response]:
+    response.headers["ETag"] = tag
+    response.headers["Cache-Control"] = cache_control
+    if _matches(request.headers.get("if-none-match"), tag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": tag, "Cache-Control": cache_control}
+        )
+    return None
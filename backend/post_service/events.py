@@ -0,0 +1,211 @@
+from dotenv import load_dotenv
+from typing import AsyncIterator, Callable, Dict, Optional, Set, Tuple
+import abc
+import asyncio
+import logging
+import orjson
+import os
+import socket
+import struct
+import threading
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# --- Eventos em tempo real (SSE) ---
+# GET /events mantém uma conexão Server-Sent Events aberta e recebe pequenas
+# diferenças em vez de recarregar /posts/ e /posts/trending:
+#   post_created  {id, owner_id, created_at}
+#   post_deleted  {id}
+#   reply_created {id, post_id, parent_reply_id}
+#   reply_deleted {id, post_id}
+#   votes         {counts: [[post_id, agree_count, disagree_count], ...]}
+# Votos são agrupados: cada post entra no máximo uma vez (com os contadores
+# mais recentes) a cada EVENTS_VOTE_INTERVAL segundos.
+#
+# Os endpoints publicam no 'broker', que entrega a mensagem ao hub de cada
+# worker; o hub repassa para as conexões abertas naquele worker.
+#   EVENTS_BROKER=local      só este processo (padrão)
+#   EVENTS_BROKER=multicast  vários workers na mesma máquina, via UDP
+#                            multicast sem sair do host (TTL 0). Um broker
+#                            externo (Redis, NOTIFY do Postgres...) é só mais
+#                            uma implementação de Broker.
+
+EVENTS_BROKER = os.environ.get("EVENTS_BROKER", "local")
+EVENTS_MULTICAST = os.environ.get("EVENTS_MULTICAST", "239.255.42.99:5007")
+VOTE_INTERVAL = float(os.environ.get("EVENTS_VOTE_INTERVAL", 0.5))
+QUEUE_SIZE = int(os.environ.get("EVENTS_QUEUE_SIZE", 256))
+HEARTBEAT_SECONDS = 15
+VOTES_PER_MESSAGE = 200
+
+
+class Broker(abc.ABC):
+    @abc.abstractmethod
+    def start(self, deliver: Callable[[bytes], None]):
+        ...
+
+    @abc.abstractmethod
+    def publish(self, message: bytes):
+        ...
+
+    def stop(self):
+        pass
+
+
+class LocalBroker(Broker):
+    def start(self, deliver: Callable[[bytes], None]):
+        self._deliver = deliver
+
+    def publish(self, message: bytes):
+        self._deliver(message)
+
+
+class MulticastBroker(Broker):
+    def __init__(self, address: str):
+        group, port = address.rsplit(":", 1)
+        self.group = group
+        self.port = int(port)
+        self._stopping = False
+        self._thread = None
+
+    def start(self, deliver: Callable[[bytes], None]):
+        self._receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        self._receiver.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, "SO_REUSEPORT"):
+            self._receiver.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        self._receiver.bind(("", self.port))
+        membership = struct.pack("4s4s", socket.inet_aton(self.group), socket.inet_aton("127.0.0.1"))
+        self._receiver.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+        self._receiver.settimeout(1.0)
+
+        self._sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        self._sender.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton("127.0.0.1"))
+        # TTL 0: não sai da máquina; LOOP: o próprio worker também recebe
+        self._sender.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 0)
+        self._sender.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+
+        self._stopping = False
+        self._thread = threading.Thread(target=self._receive, args=(deliver,), name="events-multicast", daemon=True)
+        self._thread.start()
+
+    def _receive(self, deliver: Callable[[bytes], None]):
+        while not self._stopping:
+            try:
+                message, _ = self._receiver.recvfrom(65535)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            deliver(message)
+
+    def publish(self, message: bytes):
+        self._sender.sendto(message, (self.group, self.port))
+
+    def stop(self):
+        self._stopping = True
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._receiver.close()
+        self._sender.close()
+
+
+def make_broker(kind: str) -> Broker:
+    if kind == "multicast":
+        return MulticastBroker(EVENTS_MULTICAST)
+    return LocalBroker()
+
+
+class EventHub:
+    def __init__(self, broker: Broker, vote_interval: float, queue_size: int):
+        self.broker = broker
+        self.vote_interval = vote_interval
+        self.queue_size = queue_size
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._votes_lock = threading.Lock()
+        # post_id -> (agree_count, disagree_count) mais recentes
+        self._votes: Dict[int, Tuple[int, int]] = {}
+        self._flusher = None
+
+    # --- Publicação (qualquer thread) ---
+    def publish(self, kind: str, data: dict):
+        # Sem o lifespan (scripts, benchmarks) não há para quem entregar
+        if self._loop is None:
+            return
+        try:
+            self.broker.publish(orjson.dumps({"type": kind, "data": data}))
+        except OSError:
+            logger.exception("Falha ao publicar evento %s", kind)
+
+    def publish_vote(self, post_id: int, agree_count: int, disagree_count: int):
+        if self._loop is None:
+            return
+        with self._votes_lock:
+            self._votes[post_id] = (agree_count, disagree_count)
+
+    def flush_votes(self):
+        with self._votes_lock:
+            pending, self._votes = self._votes, {}
+        counts = [[post_id, agree, disagree] for post_id, (agree, disagree) in pending.items()]
+        for start in range(0, len(counts), VOTES_PER_MESSAGE):
+            self.publish("votes", {"counts": counts[start:start + VOTES_PER_MESSAGE]})
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.vote_interval)
+            self.flush_votes()
+
+    # --- Entrega para as conexões deste worker (no event loop) ---
+    def _deliver(self, message: bytes):
+        loop = self._loop
+        if loop is not None:
+            loop.call_soon_threadsafe(self._fan_out, message)
+
+    def _fan_out(self, message: bytes):
+        event = orjson.loads(message)
+        frame = f"event: {event['type']}\ndata: ".encode() + orjson.dumps(event["data"]) + b"\n\n"
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                # Cliente lento: encerra a conexão (o EventSource reconecta)
+                self._subscribers.discard(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+    # Ao desconectar, o StreamingResponse cancela o gerador e o 'finally' limpa
+    async def stream(self) -> AsyncIterator[bytes]:
+        queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        self._subscribers.add(queue)
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                try:
+                    frame = await asyncio.wait_for(queue.get(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    frame = b": ping\n\n"
+                if frame is None:
+                    break
+                yield frame
+        finally:
+            self._subscribers.discard(queue)
+
+    # --- Ciclo de vida (lifespan) ---
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self.broker.start(self._deliver)
+        self._flusher = self._loop.create_task(self._flush_periodically())
+
+    async def stop(self):
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        self.flush_votes()
+        self.broker.stop()
+        self._loop = None
+
+
+hub = EventHub(make_broker(EVENTS_BROKER), VOTE_INTERVAL, QUEUE_SIZE)
@@ -0,0 +1,85 @@
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from dotenv import load_dotenv
+from typing import Iterator
+import orjson
+import os
+import threading
+import weakref
+
+import models, database, serialization
+
+load_dotenv()
+
+# --- Listagem/exportação em streaming ---
+# Para perfis com histórico grande: as linhas vêm do banco em lotes de
+# EXPORT_BATCH_SIZE (yield_per, cursor no servidor no Postgres) e cada lote é
+# montado (prévias, autores) e escrito na resposta antes do próximo ser lido.
+# A memória do worker fica em um lote, não no histórico inteiro.
+# Formatos: NDJSON (um post por linha, para exportação) ou um array JSON
+# escrito em partes (mesmo formato da listagem normal).
+# Cada stream segura uma conexão do pool (e uma transação aberta) até o
+# cliente terminar de baixar. Para poucos clientes lentos não esgotarem o
+# pool dos demais endpoints, no máximo EXPORT_MAX_STREAMS streams rodam ao
+# mesmo tempo por worker (mantenha abaixo de DB_POOL_SIZE + DB_MAX_OVERFLOW);
+# além disso a resposta é 503 com Retry-After, antes de tocar o banco. A vaga
+# volta quando o stream termina ou é descartado (cliente desconectou).
+
+EXPORT_BATCH_SIZE = int(os.environ.get("EXPORT_BATCH_SIZE", 500))
+EXPORT_MAX_STREAMS = int(os.environ.get("EXPORT_MAX_STREAMS", 4))
+
+_slots = threading.BoundedSemaphore(EXPORT_MAX_STREAMS)
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "json": "application/json"}
+
+def user_posts_stmt(user_id: int):
+    return select(*serialization.POST_COLUMNS)\
+        .where(models.Post.owner_id == user_id)\
+        .order_by(models.Post.created_at.desc(), models.Post.id.desc())
+
+def liked_posts_stmt(user_id: int):
+    return select(*serialization.POST_COLUMNS)\
+        .join(models.Vote, models.Vote.post_id == models.Post.id)\
+        .where(models.Vote.user_id == user_id, models.Vote.vote_type == 1)\
+        .order_by(models.Vote.post_id.desc())
+
+def _stream(stmt, fmt: str, preview: int) -> Iterator[bytes]:
+    # Sessão própria: a resposta é escrita depois que o endpoint já retornou
+    with database.SessionLocal() as db:
+        result = db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        if fmt == "json":
+            yield b"["
+        first = True
+        for rows in result.partitions():
+            items = [orjson.dumps(item) for item in serialization.build_posts(db, rows, preview)]
+            if fmt == "ndjson":
+                yield b"\n".join(items) + b"\n"
+            else:
+                yield (b"" if first else b",") + b",".join(items)
+            first = False
+        if fmt == "json":
+            yield b"]"
+
+def _releasing(body: Iterator[bytes], release) -> Iterator[bytes]:
+    try:
+        yield from body
+    finally:
+        release()
+
+def streaming_response(stmt, fmt: str = "json", preview: int = 0, filename: str = None) -> StreamingResponse:
+    if not _slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Muitas exportações em andamento. Tente novamente em instantes.",
+            headers={"Retry-After": "5"},
+        )
+    body = _stream(stmt, fmt, preview)
+    # O Starlette não fecha um stream abandonado: a vaga também volta quando o
+    # gerador é coletado, mesmo que nunca tenha começado (finalize roda uma vez)
+    release = weakref.finalize(body, _slots.release)
+
+    headers = {}
+    if filename:
+        headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return StreamingResponse(_releasing(body, release), media_type=MEDIA_TYPES[fmt], headers=headers)
@@ -0,0 +1,189 @@
+from fastapi import Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from sqlalchemy import exc, insert, select
+from collections import Counter
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+from typing import Dict, List, Optional, Tuple
+import logging
+import os
+
+import models, schemas, auth, search, timeline, trending
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# --- Importação em lote (POST /posts/bulk e /replies/bulk) ---
+# Para carga de campus novos e migração de outros fóruns: milhares de itens
+# por requisição, em vez de um POST (insert, commit, refresh, releitura) por
+# item. Os itens são processados em blocos de INGEST_CHUNK_SIZE, um bloco por
+# transação:
+#   1. autores, posts e respostas pai do bloco são conferidos com um SELECT
+#      ... IN (...) para cada tabela;
+#   2. os itens válidos entram num único INSERT com executemany (várias linhas
+#      por comando, com RETURNING id na ordem do pedido);
+#   3. posts: a timeline dos seguidores é preenchida com um INSERT ... SELECT
+#      para o bloco inteiro (mesma regra do fan-out de timeline.py).
+# Item inválido não derruba o lote: vai para 'errors' com seu índice e o id
+# fica null em 'ids'. Se o banco recusar um bloco (ex.: autor apagado entre a
+# conferência e o INSERT), só aquele bloco volta atrás e todos os seus itens
+# são reportados.
+# Sem 'created_at' o item recebe a hora da importação; datas sem fuso são
+# tratadas como UTC. Importações não publicam eventos SSE (seriam milhares de
+# 'post_created' antigos); os clientes veem o conteúdo na próxima leitura.
+#
+# Só e-mails listados em INGEST_ADMINS (separados por vírgula) podem importar:
+# os itens são gravados em nome de qualquer autor. Vazio = desabilitado.
+
+INGEST_CHUNK_SIZE = int(os.environ.get("INGEST_CHUNK_SIZE", 1000))
+INGEST_MAX_ITEMS = int(os.environ.get("INGEST_MAX_ITEMS", 10000))
+INGEST_ADMINS = {email.strip() for email in os.environ.get("INGEST_ADMINS", "").split(",") if email.strip()}
+
+def require_admin(current_user: models.User = Depends(auth.get_current_user)) -> models.User:
+    if current_user.email not in INGEST_ADMINS:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Sem permissão para importar.")
+    return current_user
+
+def check_size(items: list):
+    if len(items) > INGEST_MAX_ITEMS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Máximo de {INGEST_MAX_ITEMS} itens por lote.")
+
+
+class _Result:
+    def __init__(self, size: int):
+        self.ids: List[Optional[int]] = [None] * size
+        self.errors: List[dict] = []
+
+    def reject(self, index: int, detail: str):
+        self.errors.append({"index": index, "detail": detail})
+
+    def as_dict(self) -> dict:
+        self.errors.sort(key=lambda error: error["index"])
+        return {
+            "created": sum(1 for item_id in self.ids if item_id is not None),
+            "ids": self.ids,
+            "errors": self.errors,
+        }
+
+
+def _created_at(value: Optional[datetime], now: datetime) -> datetime:
+    if value is None:
+        return now
+    # O SQLite grava a data como veio, sem fuso: tudo vira UTC antes
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+def _common_error(item, owners, now: datetime) -> Optional[str]:
+    if not item.content.strip():
+        return "Conteúdo vazio."
+    if item.owner_id not in owners:
+        return "Autor não encontrado."
+    if item.created_at is not None and _created_at(item.created_at, now) > now:
+        return "Data no futuro."
+    return None
+
+def _existing(db: Session, *columns, ids) -> Dict[int, tuple]:
+    # id -> linha, para os ids do bloco que existem (um SELECT ... IN)
+    if not ids:
+        return {}
+    key = columns[0]
+    return {row[0]: row for row in db.execute(select(*columns).where(key.in_(ids)))}
+
+def _run_chunks(db: Session, items: list, write_chunk) -> dict:
+    result = _Result(len(items))
+    for start in range(0, len(items), INGEST_CHUNK_SIZE):
+        chunk = list(enumerate(items[start:start + INGEST_CHUNK_SIZE], start))
+        try:
+            created, after_commit = write_chunk(db, chunk, result)
+            db.commit()
+        except exc.DBAPIError as error:
+            db.rollback()
+            logger.warning("Importação: bloco %s-%s recusado pelo banco (%s)", start, start + len(chunk) - 1, error.orig)
+            rejected = {error["index"] for error in result.errors}
+            for index, _ in chunk:
+                if index not in rejected:
+                    result.reject(index, "Bloco recusado pelo banco; tente novamente.")
+            continue
+        for index, item_id in created:
+            result.ids[index] = item_id
+        after_commit()
+    return result.as_dict()
+
+# --- Posts ---
+
+def _write_posts(db: Session, chunk: List[Tuple[int, schemas.PostImport]], result: _Result):
+    now = datetime.now(timezone.utc)
+    owners = _existing(db, models.User.id, models.User.name, ids={item.owner_id for _, item in chunk})
+
+    accepted, rows = [], []
+    for index, item in chunk:
+        error = _common_error(item, owners, now)
+        if error:
+            result.reject(index, error)
+            continue
+        accepted.append((index, item))
+        rows.append({"content": item.content, "owner_id": item.owner_id, "created_at": _created_at(item.created_at, now)})
+    if not rows:
+        return [], lambda: None
+
+    # Core (Post.__table__), não ORM: sem montar objetos nem identity map
+    post_ids = db.scalars(
+        insert(models.Post.__table__).returning(models.Post.id, sort_by_parameter_order=True), rows
+    ).all()
+    timeline.fan_out_many(db, post_ids)
+
+    def after_commit():
+        for post_id, (_, item) in zip(post_ids, accepted):
+            search.index_post(models.Post(id=post_id, content=item.content), owners[item.owner_id].name)
+
+    return [(index, post_id) for post_id, (index, _) in zip(post_ids, accepted)], after_commit
+
+def ingest_posts(db: Session, items: List[schemas.PostImport]) -> dict:
+    return _run_chunks(db, items, _write_posts)
+
+# --- Respostas ---
+
+def _write_replies(db: Session, chunk: List[Tuple[int, schemas.ReplyImport]], result: _Result):
+    now = datetime.now(timezone.utc)
+    owners = _existing(db, models.User.id, ids={item.owner_id for _, item in chunk})
+    posts = _existing(db, models.Post.id, models.Post.created_at, models.Post.agree_count,
+                      ids={item.post_id for _, item in chunk})
+    parents = _existing(db, models.Reply.id, models.Reply.post_id,
+                        ids={item.parent_reply_id for _, item in chunk if item.parent_reply_id})
+
+    accepted, rows = [], []
+    for index, item in chunk:
+        error = _common_error(item, owners, now)
+        if error is None and item.post_id not in posts:
+            error = "Post não encontrado."
+        if error is None and item.parent_reply_id:
+            if item.parent_reply_id not in parents:
+                error = "Resposta pai não encontrada."
+            elif parents[item.parent_reply_id].post_id != item.post_id:
+                error = "Resposta pai é de outro post."
+        if error:
+            result.reject(index, error)
+            continue
+        accepted.append((index, item))
+        rows.append({
+            "content": item.content, "owner_id": item.owner_id, "post_id": item.post_id,
+            "parent_reply_id": item.parent_reply_id, "created_at": _created_at(item.created_at, now),
+        })
+    if not rows:
+        return [], lambda: None
+
+    reply_ids = db.scalars(
+        insert(models.Reply.__table__).returning(models.Reply.id, sort_by_parameter_order=True), rows
+    ).all()
+
+    def after_commit():
+        added = Counter(item.post_id for _, item in accepted)
+        for post_id, count in added.items():
+            trending.cache.record_reply(db, posts[post_id], count)
+
+    return [(index, reply_id) for reply_id, (index, _) in zip(reply_ids, accepted)], after_commit
+
+def ingest_replies(db: Session, items: List[schemas.ReplyImport]) -> dict:
+    return _run_chunks(db, items, _write_replies)
@@ -0,0 +1,93 @@
+from dotenv import load_dotenv
+from typing import Callable, List, Optional, Tuple
+import asyncio
+import inspect
+import logging
+import os
+import time
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# --- Ciclo de vida do worker: liveness x readiness ---
+# Nada toca o banco ao importar o main.py: o worker sobe e já responde
+# GET /health/live. Os passos de inicialização (conferir o schema, aquecer
+# o pool, carregar caches quentes) rodam em segundo plano no lifespan e são
+# repetidos com espera exponencial (até STARTUP_RETRY_MAX segundos) se o
+# banco estiver fora ou lento. GET /health/ready só devolve 200 depois de
+# todos eles, e volta a 503 quando o worker começa a encerrar.
+# Passos síncronos rodam numa thread para não travar o event loop.
+
+STARTUP_RETRY_MAX = float(os.environ.get("STARTUP_RETRY_MAX", 30))
+STARTUP_RETRY_MIN = 0.5
+
+Step = Tuple[str, Callable]
+
+
+class Lifecycle:
+    def __init__(self):
+        self.ready = False
+        self.stopping = False
+        self.step: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.ready_in: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run_step(self, name: str, step: Callable):
+        delay = STARTUP_RETRY_MIN
+        while True:
+            self.step = name
+            try:
+                if inspect.iscoroutinefunction(step):
+                    await step()
+                else:
+                    await asyncio.to_thread(step)
+                return
+            except Exception as exc:
+                self.last_error = f"{name}: {exc}"
+                logger.warning("Inicialização: '%s' falhou (%s); nova tentativa em %.1fs", name, exc, delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, STARTUP_RETRY_MAX)
+
+    async def _run(self, steps: List[Step]):
+        for name, step in steps:
+            await self._run_step(name, step)
+        self.step = None
+        self.last_error = None
+        self.ready_in = time.monotonic() - self.started_at
+        self.ready = True
+        logger.info("Worker %s pronto em %.0f ms", os.getpid(), self.ready_in * 1000)
+
+    def start(self, steps: List[Step]):
+        self.started_at = time.monotonic()
+        self._task = asyncio.get_running_loop().create_task(self._run(steps))
+
+    async def stop(self):
+        self.stopping = True
+        self.ready = False
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def status(self) -> dict:
+        if self.stopping:
+            status = "stopping"
+        elif self.ready:
+            status = "ready"
+        else:
+            status = "starting"
+        return {
+            "status": status,
+            "pid": os.getpid(),
+            "step": self.step,
+            "last_error": self.last_error,
+            "ready_in_ms": round(self.ready_in * 1000, 1) if self.ready_in is not None else None,
+        }
+
+
+state = Lifecycle()
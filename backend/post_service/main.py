@@ -1,14 +1,44 @@
-from fastapi import FastAPI, Depends, HTTPException, status, Response
+from fastapi import FastAPI, Depends, HTTPException, status, Response, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy.orm import joinedload
-from sqlalchemy import or_, desc
-import models, schemas, database, auth 
-from typing import List
+from sqlalchemy import or_, desc, tuple_
+import models, schemas, database, auth, compression, pagination, search, trending, threads, votes, vote_buffer, timeline, etag, serialization, export, events, metrics, lifecycle, ingest
+from typing import List, Literal, Optional
+from contextlib import asynccontextmanager
 
-models.Base.metadata.create_all(bind=database.engine)
+# --- Inicialização (ver lifecycle.py) ---
+# As tabelas são criadas/atualizadas pelo migrate.py, antes do deploy. O worker
+# responde /health/live na hora e fica pronto depois destes passos.
+def _prime_caches():
+    with database.SessionLocal() as db:
+        trending.cache.top_ids(db)
+        search.warm_up(db)
 
-app = FastAPI()
+STARTUP_STEPS = [
+    ("schema", lambda: database.require_tables(models.Base.metadata.tables)),
+    ("pool", database.warm_up),
+    ("async_pool", database.warm_up_async),
+    ("caches", _prime_caches),
+]
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    lifecycle.state.start(STARTUP_STEPS)
+    vote_buffer.buffer.start()
+    timeline.trimmer.start()
+    events.hub.start()
+    yield
+    await lifecycle.state.stop()
+    await events.hub.stop()
+    timeline.trimmer.stop()
+    # Grava os contadores pendentes antes de encerrar o worker
+    vote_buffer.buffer.stop()
+    if database.async_engine is not None:
+        await database.async_engine.dispose()
+
+app = FastAPI(lifespan=lifespan)
 
 # --- Configuração do CORS ---
 
@@ -20,6 +50,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.add_middleware(
@@ -28,54 +59,165 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# --- Compressão gzip/brotli das respostas grandes (ver compression.py) ---
+app.add_middleware(compression.CompressionMiddleware)
+
+# --- Métricas por rota e SQL por requisição (ver metrics.py) ---
+# Adicionado por último = mais externo: mede também a compressão
+app.add_middleware(metrics.MetricsMiddleware)
+
+# --- Saúde do worker ---
+# live: o processo responde (não toca o banco). ready: inicialização concluída
+# e o worker não está encerrando; enquanto isso, 503 com o passo atual.
+# São 'async def' para responder mesmo com o threadpool ocupado.
+@app.get("/health/live")
+async def health_live():
+    return {"status": "ok"}
+
+@app.get("/health/ready")
+async def health_ready(response: Response):
+    if not lifecycle.state.ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return lifecycle.state.status()
+
+# --- Estatísticas do pool de conexões (por worker) ---
+@app.get("/pool/stats")
+def get_pool_stats():
+    return database.pool_status()
+
+# --- Acertos/erros do cache de autenticação (por worker) ---
+@app.get("/auth/cache/stats")
+def get_auth_cache_stats():
+    return auth.cache_stats()
+
+# --- Métricas no formato do Prometheus (por worker) ---
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+# --- ETag das listas de posts (ver etag.py) ---
+# Sai das mesmas linhas (colunas) que vão montar a resposta: ids e contadores
+# (somando o que estiver no buffer de votos) e, por post, quantas respostas
+# existem e a mais recente. Muda quando entra/sai post, voto ou resposta.
+# Em caso de 304, as prévias de respostas, os autores e o JSON nem são montados.
+def _posts_etag(rows: list, stats: dict, *params) -> str:
+    counters = [
+        (row.id, *vote_buffer.buffer.counts(row.id, row.agree_count, row.disagree_count))
+        for row in rows
+    ]
+    return etag.make_etag(params, counters, sorted(stats.items()))
+
+def _posts_response(request: Request, response: Response, db: Session, rows: list, replies_preview: int, *params):
+    stats = threads.reply_stats(db, [row.id for row in rows])
+    not_modified = etag.conditional(request, response, _posts_etag(rows, stats, replies_preview, *params))
+    if not_modified:
+        return not_modified
+    return serialization.json_response(serialization.build_posts(db, rows, replies_preview, stats), response)
+
+# --- Eventos em tempo real (ver events.py) ---
+@app.get("/events")
+async def stream_events():
+    return StreamingResponse(
+        events.hub.stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # --- Endpoint de Leitura (Com Paginação) ---
+# Dois modos: 'skip' (legado, por offset) e 'cursor' (keyset sobre created_at + id).
+# O próximo cursor sempre volta no header X-Next-Cursor, então clientes antigos
+# continuam recebendo a mesma lista de sempre.
 @app.get("/posts/", response_model=List[schemas.PostResponse])
+@database.endpoint
 def get_posts(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 10,
+    cursor: Optional[str] = None,
+    replies_preview: int = Query(0, ge=0, le=10),
     db: Session = Depends(database.get_db)
 ):
+    query = db.query(models.Post).order_by(models.Post.created_at.desc(), models.Post.id.desc())
 
-    posts = db.query(models.Post).options(
-        joinedload(models.Post.owner), 
-        joinedload(models.Post.replies).joinedload(models.Reply.owner)
-    ).order_by(models.Post.created_at.desc()).offset(skip).limit(limit).all()
-    
-    return posts
+    if cursor:
+        created_at, post_id = pagination.decode_cursor(cursor)
+        query = query.filter(tuple_(models.Post.created_at, models.Post.id) < (created_at, post_id))
+    else:
+        query = query.offset(skip)
+
+    rows = serialization.post_rows(query.limit(limit))
+
+    cursor_out = pagination.next_cursor(rows, limit)
+    if cursor_out:
+        response.headers["X-Next-Cursor"] = cursor_out
+    return _posts_response(request, response, db, rows, replies_preview)
+
+# --- Timeline "Seguindo" ---
+# Posts de quem o usuário segue (e os dele), do mais novo para o mais antigo.
+# Lida da timeline pré-computada; ver timeline.py.
+@app.get("/timeline", response_model=List[schemas.PostResponse])
+@database.endpoint
+def get_timeline(
+    response: Response,
+    limit: int = Query(10, ge=1, le=50),
+    cursor: Optional[str] = None,
+    replies_preview: int = Query(0, ge=0, le=10),
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(auth.get_current_user)
+):
+    post_ids, cursor_out = timeline.load_page(db, current_user.id, cursor, limit)
+    if cursor_out:
+        response.headers["X-Next-Cursor"] = cursor_out
+    rows = serialization.post_rows_by_ids(db, post_ids)
+    return serialization.json_response(serialization.build_posts(db, rows, replies_preview), response)
 
 # --- TRENDING TOPICS ---
+# O ranking vem do cache em memória (ver trending.py); aqui só buscamos os
+# poucos posts do topo pela chave primária.
 @app.get("/posts/trending", response_model=List[schemas.PostResponse])
-def get_trending_posts(db: Session = Depends(database.get_db)):
-    posts = db.query(models.Post).options(
-        joinedload(models.Post.owner),
-        joinedload(models.Post.replies).joinedload(models.Reply.owner)
-    ).order_by(models.Post.agree_count.desc()).limit(5).all()
-    
-    return posts
+@database.endpoint
+def get_trending_posts(
+    request: Request,
+    response: Response,
+    replies_preview: int = Query(0, ge=0, le=10),
+    db: Session = Depends(database.get_db)
+):
+    # Linhas na ordem do ranking, que também entra no ETag
+    rows = serialization.post_rows_by_ids(db, trending.cache.top_ids(db))
+    return _posts_response(request, response, db, rows, replies_preview)
 
 # --- PESQUISA ---
+# Paginação obrigatória: o ranking vem do índice de texto (ver search.py) e só
+# os posts da página pedida são carregados.
 @app.get("/search", response_model=List[schemas.PostResponse])
-def search_posts(q: str, db: Session = Depends(database.get_db)):
-    if not q:
+@database.endpoint
+def search_posts(
+    q: str,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=50),
+    replies_preview: int = Query(0, ge=0, le=10),
+    db: Session = Depends(database.get_db)
+):
+    if not q.strip():
+        return []
+
+    post_ids = search.ranked_post_ids(db, q, skip, limit)
+    if not post_ids:
         return []
-        
-    posts = db.query(models.Post).join(models.User).options(
-        joinedload(models.Post.owner),
-        joinedload(models.Post.replies).joinedload(models.Reply.owner)
-    ).filter(
-        or_(
-            models.Post.content.ilike(f"%{q}%"), 
-            models.User.name.ilike(f"%{q}%")     
-        )
-    ).order_by(models.Post.agree_count.desc()).all()
-    
-    return posts
+
+    # Mantém a ordem do ranking
+    rows = serialization.post_rows_by_ids(db, post_ids)
+    return serialization.json_response(serialization.build_posts(db, rows, replies_preview), response)
 
 # --- Endpoints de Criação e Edição ---
 
 @app.post("/posts/", response_model=schemas.PostResponse, status_code=status.HTTP_201_CREATED)
+@database.endpoint
 def create_post(
     post: schemas.PostCreate, 
     db: Session = Depends(database.get_db),
@@ -86,13 +228,21 @@ def create_post(
         owner_id=current_user.id
     )
     db.add(new_post)
+    db.flush()
+    # Na mesma transação do post: ele aparece nas timelines junto com o commit
+    timeline.fan_out(db, new_post, current_user.followers_count)
     db.commit()
     db.refresh(new_post)
     
     db_post = db.query(models.Post).options(joinedload(models.Post.owner)).filter(models.Post.id == new_post.id).first()
-    return db_post
+    search.index_post(db_post, current_user.name)
+    events.hub.publish("post_created", {
+        "id": db_post.id, "owner_id": db_post.owner_id, "created_at": db_post.created_at
+    })
+    return threads.attach_replies(db, [db_post])[0]
 
 @app.delete("/posts/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
+@database.endpoint
 def delete_post(
     post_id: int, 
     db: Session = Depends(database.get_db),
@@ -108,67 +258,106 @@ def delete_post(
 
     post_query.delete(synchronize_session=False)
     db.commit()
+    search.remove_post(post_id)
+    trending.cache.forget(post_id)
+    events.hub.publish("post_deleted", {"id": post_id})
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
-@app.post("/vote/", response_model=schemas.PostResponse)
+@app.post("/vote/", response_model=schemas.VoteResponse)
+@database.endpoint
 def vote_post(
     vote: schemas.Vote, 
     db: Session = Depends(database.get_db), 
     current_user: models.User = Depends(auth.get_current_user)
 ):
-    post = db.query(models.Post).filter(models.Post.id == vote.post_id).first()
-    if not post:
+    counts = votes.apply_vote(db, vote.post_id, current_user.id, vote.vote_type)
+    if counts is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post não encontrado.")
 
-    vote_query = db.query(models.Vote).filter(
-        models.Vote.post_id == vote.post_id, 
-        models.Vote.user_id == current_user.id
-    )
-    existing_vote = vote_query.first()
+    trending.cache.record_vote(db, counts)
+    events.hub.publish_vote(counts.id, counts.agree_count, counts.disagree_count)
 
-    if vote.vote_type == "none":
-        if existing_vote:
-            if existing_vote.vote_type == 1: post.agree_count -= 1
-            elif existing_vote.vote_type == -1: post.disagree_count -= 1
-            vote_query.delete(synchronize_session=False)
-    
-    elif vote.vote_type == "agree":
-        if existing_vote:
-            if existing_vote.vote_type == -1: 
-                existing_vote.vote_type = 1
-                post.agree_count += 1
-                post.disagree_count -= 1
-        else:
-            new_vote = models.Vote(post_id=vote.post_id, user_id=current_user.id, vote_type=1)
-            db.add(new_vote)
-            post.agree_count += 1
-
-    elif vote.vote_type == "disagree":
-        if existing_vote:
-            if existing_vote.vote_type == 1:
-                existing_vote.vote_type = -1
-                post.disagree_count += 1
-                post.agree_count -= 1
-        else:
-            new_vote = models.Vote(post_id=vote.post_id, user_id=current_user.id, vote_type=-1)
-            db.add(new_vote)
-            post.disagree_count += 1
+    return {
+        "post_id": counts.id,
+        "agree_count": counts.agree_count,
+        "disagree_count": counts.disagree_count,
+        "vote_type": vote.vote_type
+    }
 
-    db.commit()
-    db.refresh(post)
-    
-    db_post = db.query(models.Post).options(joinedload(models.Post.owner)).filter(models.Post.id == post.id).first()
-    return db_post
+# --- Votos do usuário logado para uma página de posts ---
+# Uma única consulta pela chave primária (user_id, post_id) de 'votes'.
+# Posts sem voto simplesmente não aparecem na resposta.
+MAX_VOTE_LOOKUP = 100
+
+@app.get("/votes/me", response_model=List[schemas.MyVote])
+@database.endpoint
+def get_my_votes(
+    post_ids: List[int] = Query(...),
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(auth.get_current_user)
+):
+    if len(post_ids) > MAX_VOTE_LOOKUP:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Máximo de {MAX_VOTE_LOOKUP} posts por consulta.")
+
+    rows = db.query(models.Vote.post_id, models.Vote.vote_type).filter(
+        models.Vote.user_id == current_user.id,
+        models.Vote.post_id.in_(set(post_ids))
+    ).all()
+
+    return [
+        {"post_id": post_id, "vote_type": "agree" if vote_type == 1 else "disagree"}
+        for post_id, vote_type in rows
+    ]
 
+# Paginado por cursor (mesmo esquema do feed, em ordem crescente)
 @app.get("/posts/{post_id}/replies", response_model=List[schemas.ReplyResponse])
-def get_replies_for_post(post_id: int, db: Session = Depends(database.get_db)):
-    replies = db.query(models.Reply).filter(models.Reply.post_id == post_id)\
-        .options(joinedload(models.Reply.owner))\
-        .order_by(models.Reply.created_at.asc())\
-        .all()
-    return replies
+@database.endpoint
+def get_replies_for_post(
+    post_id: int,
+    request: Request,
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: Session = Depends(database.get_db)
+):
+    query = db.query(models.Reply).filter(models.Reply.post_id == post_id)\
+        .order_by(models.Reply.created_at.asc(), models.Reply.id.asc())
+
+    if cursor:
+        created_at, reply_id = pagination.decode_cursor(cursor)
+        query = query.filter(tuple_(models.Reply.created_at, models.Reply.id) > (created_at, reply_id))
+
+    rows = serialization.reply_rows(query.limit(limit))
+
+    cursor_out = pagination.next_cursor(rows, limit)
+    if cursor_out:
+        response.headers["X-Next-Cursor"] = cursor_out
+
+    # Respostas não são editadas: os ids da página bastam como versão
+    tag = etag.make_etag(post_id, [row.id for row in rows])
+    not_modified = etag.conditional(request, response, tag)
+    if not_modified:
+        return not_modified
+    return serialization.json_response(serialization.build_replies(db, rows), response)
+
+# --- Thread de respostas em árvore ---
+# Sem 'parent_id' devolve as respostas de primeiro nível; com 'parent_id' (e o
+# 'next_cursor' do nó) carrega mais filhos daquela subárvore.
+@app.get("/posts/{post_id}/replies/thread", response_model=schemas.ThreadResponse)
+@database.endpoint
+def get_reply_thread(
+    post_id: int,
+    parent_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    depth: int = Query(3, ge=1, le=10),
+    page_size: int = Query(10, ge=1, le=50),
+    db: Session = Depends(database.get_db)
+):
+    roots, next_cursor = threads.load_thread(db, post_id, parent_id, cursor, depth, page_size)
+    return {"replies": roots, "next_cursor": next_cursor}
 
 @app.post("/posts/{post_id}/replies", response_model=schemas.ReplyResponse, status_code=status.HTTP_201_CREATED)
+@database.endpoint
 def create_reply_for_post(
     post_id: int, 
     reply: schemas.ReplyCreate, 
@@ -183,6 +372,8 @@ def create_reply_for_post(
         parent_reply = db.query(models.Reply).filter(models.Reply.id == reply.parent_reply_id).first()
         if not parent_reply:
              raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Resposta pai não encontrada.")
+        if parent_reply.post_id != post_id:
+             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Resposta pai é de outro post.")
 
     new_reply = models.Reply(
         content=reply.content,
@@ -194,13 +385,40 @@ def create_reply_for_post(
     db.add(new_reply)
     db.commit()
     db.refresh(new_reply)
+    trending.cache.record_reply(db, post)
+    events.hub.publish("reply_created", {
+        "id": new_reply.id, "post_id": post_id, "parent_reply_id": new_reply.parent_reply_id
+    })
 
     db_reply = db.query(models.Reply).options(joinedload(models.Reply.owner))\
         .filter(models.Reply.id == new_reply.id).first()
 
     return db_reply
 
+# --- Importação em lote de posts e respostas (ver ingest.py) ---
+# Só para INGEST_ADMINS. Erros por item voltam em 'errors'; os demais são gravados.
+@app.post("/posts/bulk", response_model=schemas.BulkResult)
+@database.endpoint
+def bulk_create_posts(
+    items: List[schemas.PostImport],
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(ingest.require_admin)
+):
+    ingest.check_size(items)
+    return ingest.ingest_posts(db, items)
+
+@app.post("/replies/bulk", response_model=schemas.BulkResult)
+@database.endpoint
+def bulk_create_replies(
+    items: List[schemas.ReplyImport],
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(ingest.require_admin)
+):
+    ingest.check_size(items)
+    return ingest.ingest_replies(db, items)
+
 @app.delete("/replies/{reply_id}", status_code=status.HTTP_204_NO_CONTENT)
+@database.endpoint
 def delete_reply(
     reply_id: int,
     db: Session = Depends(database.get_db),
@@ -214,28 +432,57 @@ def delete_reply(
     if reply.owner_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Sem permissão.")
 
+    post_id = reply.post_id
     reply_query.delete(synchronize_session=False)
     db.commit()
+    trending.cache.record_reply_deleted(db, post_id)
+    events.hub.publish("reply_deleted", {"id": reply_id, "post_id": post_id})
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 # --- Endpoint: Posts de um usuário específico ---
+# stream=true: mesmo array JSON, escrito em lotes (ver export.py), para
+# perfis com histórico muito grande
 @app.get("/posts/user/{user_id}", response_model=List[schemas.PostResponse])
-def get_user_posts(user_id: int, db: Session = Depends(database.get_db)):
-    posts = db.query(models.Post).filter(models.Post.owner_id == user_id).options(
-        joinedload(models.Post.owner),
-        joinedload(models.Post.replies).joinedload(models.Reply.owner)
-    ).order_by(models.Post.created_at.desc()).all()
-    return posts
+@database.endpoint
+def get_user_posts(
+    user_id: int,
+    request: Request,
+    response: Response,
+    replies_preview: int = Query(0, ge=0, le=10),
+    stream: bool = False,
+    db: Session = Depends(database.get_db)
+):
+    if stream:
+        return export.streaming_response(export.user_posts_stmt(user_id), "json", replies_preview)
+
+    rows = db.execute(export.user_posts_stmt(user_id)).all()
+    return _posts_response(request, response, db, rows, replies_preview, user_id)
 
 # --- Endpoint: Posts curtidos por um usuário ---
 @app.get("/posts/user/{user_id}/liked", response_model=List[schemas.PostResponse])
-def get_user_liked_posts(user_id: int, db: Session = Depends(database.get_db)):
-    # Faz um JOIN entre Post e Vote onde o voto é '1' (agree) e o usuário é o user_id
-    posts = db.query(models.Post).join(models.Vote).filter(
-        models.Vote.user_id == user_id,
-        models.Vote.vote_type == 1 # Apenas Likes/Concordo
-    ).options(
-        joinedload(models.Post.owner),
-        joinedload(models.Post.replies).joinedload(models.Reply.owner)
-    ).order_by(models.Vote.post_id.desc()).all() # Ordena pelos likes mais recentes
-    return posts
\ No newline at end of file
+@database.endpoint
+def get_user_liked_posts(
+    user_id: int,
+    response: Response,
+    replies_preview: int = Query(0, ge=0, le=10),
+    stream: bool = False,
+    db: Session = Depends(database.get_db)
+):
+    # Posts com voto '1' (agree) do usuário, pelos likes mais recentes
+    if stream:
+        return export.streaming_response(export.liked_posts_stmt(user_id), "json", replies_preview)
+
+    rows = db.execute(export.liked_posts_stmt(user_id)).all()
+    return serialization.json_response(serialization.build_posts(db, rows, replies_preview), response)
+
+# --- Exportação dos posts / curtidas de um usuário (download) ---
+@app.get("/posts/user/{user_id}/export")
+def export_user_posts(
+    user_id: int,
+    kind: Literal["posts", "liked"] = "posts",
+    format: Literal["ndjson", "json"] = "ndjson",
+    replies_preview: int = Query(0, ge=0, le=10)
+):
+    stmt = export.user_posts_stmt(user_id) if kind == "posts" else export.liked_posts_stmt(user_id)
+    filename = f"unitalks-user-{user_id}-{kind}.{format}"
+    return export.streaming_response(stmt, format, replies_preview, filename)
\ No newline at end of file
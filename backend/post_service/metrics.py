@@ -0,0 +1,230 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from bisect import bisect_left
+from contextvars import ContextVar
+from dotenv import load_dotenv
+from typing import Dict, List, Optional, Tuple
+import logging
+import os
+import threading
+import time
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# --- Métricas por rota (formato Prometheus, GET /metrics) ---
+# O middleware abre um RequestStats por requisição (num ContextVar, que o
+# threadpool e o run_sync do modo assíncrono herdam) e os eventos de cursor
+# do SQLAlchemy somam nele cada comando SQL: quantidade, tempo e linhas.
+# Ao fim da resposta tudo é agregado por rota (o template, ex.
+# "/posts/{post_id}/replies", não o caminho real):
+#   unitalks_http_requests_total{route,method,status}
+#   unitalks_http_request_duration_seconds   (histograma)
+#   unitalks_sql_statements_per_request      (histograma; N+1 aparece aqui)
+#   unitalks_sql_statements_total / unitalks_sql_seconds_total / unitalks_sql_rows_total
+# Linhas = cursor.rowcount do driver: no Postgres inclui as devolvidas por
+# SELECT; o SQLite só informa as afetadas por INSERT/UPDATE/DELETE.
+# SQL fora de requisição (flush do buffer de votos, etc.) entra na rota
+# "(background)". Os números são por worker, como /pool/stats.
+#
+# SLOW_REQUEST_MS > 0 liga o log de requisições lentas: as que passarem do
+# limite são logadas com os comandos SQL executados e o tempo de cada um.
+
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"
+SLOW_REQUEST_MS = float(os.environ.get("SLOW_REQUEST_MS", 0))
+SLOW_LOG_MAX_STATEMENTS = 50
+SLOW_LOG_STATEMENT_CHARS = 500
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+BACKGROUND = "(background)"
+UNMATCHED = "(unmatched)"
+
+
+class RequestStats:
+    __slots__ = ("statements", "sql_seconds", "rows", "captured")
+
+    def __init__(self, capture: bool):
+        self.statements = 0
+        self.sql_seconds = 0.0
+        self.rows = 0
+        self.captured: Optional[List[Tuple[float, str]]] = [] if capture else None
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # o último é o +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _labels(**labels) -> str:
+    escaped = (
+        f'{name}="' + str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for name, value in labels.items()
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests: Dict[Tuple[str, str, int], int] = {}
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.statements_per_request: Dict[Tuple[str, str], Histogram] = {}
+        # (rota, método) -> [comandos, segundos, linhas]
+        self.sql: Dict[Tuple[str, str], list] = {}
+
+    def _add_sql(self, key: Tuple[str, str], statements: int, seconds: float, rows: int):
+        totals = self.sql.setdefault(key, [0, 0.0, 0])
+        totals[0] += statements
+        totals[1] += seconds
+        totals[2] += rows
+
+    def record_request(self, route: str, method: str, status: int, seconds: Optional[float], stats: RequestStats):
+        key = (route, method)
+        with self._lock:
+            self.requests[(route, method, status)] = self.requests.get((route, method, status), 0) + 1
+            if seconds is not None:
+                self.latency.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(seconds)
+            self.statements_per_request.setdefault(key, Histogram(STATEMENT_BUCKETS)).observe(stats.statements)
+            self._add_sql(key, stats.statements, stats.sql_seconds, stats.rows)
+
+    def record_background(self, seconds: float, rows: int):
+        with self._lock:
+            self._add_sql((BACKGROUND, ""), 1, seconds, rows)
+
+    def _histogram_lines(self, name: str, histograms: Dict[Tuple[str, str], Histogram]) -> List[str]:
+        lines = []
+        for (route, method), histogram in sorted(histograms.items()):
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(route=route, method=method, le=bound)} {cumulative}")
+            lines.append(f"{name}_sum{_labels(route=route, method=method)} {histogram.sum}")
+            lines.append(f"{name}_count{_labels(route=route, method=method)} {histogram.count}")
+        return lines
+
+    def render(self) -> str:
+        with self._lock:
+            lines = [
+                "# HELP unitalks_http_requests_total Requisições HTTP por rota, método e status.",
+                "# TYPE unitalks_http_requests_total counter",
+            ]
+            lines += [
+                f"unitalks_http_requests_total{_labels(route=route, method=method, status=status)} {count}"
+                for (route, method, status), count in sorted(self.requests.items())
+            ]
+            lines += [
+                "# HELP unitalks_http_request_duration_seconds Latência das requisições (sem streams SSE).",
+                "# TYPE unitalks_http_request_duration_seconds histogram",
+            ]
+            lines += self._histogram_lines("unitalks_http_request_duration_seconds", self.latency)
+            lines += [
+                "# HELP unitalks_sql_statements_per_request Comandos SQL por requisição.",
+                "# TYPE unitalks_sql_statements_per_request histogram",
+            ]
+            lines += self._histogram_lines("unitalks_sql_statements_per_request", self.statements_per_request)
+            for index, (name, help_text) in enumerate((
+                ("unitalks_sql_statements_total", "Comandos SQL executados."),
+                ("unitalks_sql_seconds_total", "Tempo gasto em SQL, em segundos."),
+                ("unitalks_sql_rows_total", "Linhas informadas pelo driver (cursor.rowcount)."),
+            )):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+                lines += [
+                    f"{name}{_labels(route=route, method=method)} {totals[index]}"
+                    for (route, method), totals in sorted(self.sql.items())
+                ]
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+# --- Ganchos do SQLAlchemy (todas as engines, inclusive a síncrona por trás da assíncrona) ---
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["metrics_started"].pop()
+    rows = max(cursor.rowcount or 0, 0)
+    stats = _current.get()
+    if stats is None:
+        registry.record_background(elapsed, rows)
+        return
+    stats.statements += 1
+    stats.sql_seconds += elapsed
+    stats.rows += rows
+    if stats.captured is not None and len(stats.captured) < SLOW_LOG_MAX_STATEMENTS:
+        stats.captured.append((elapsed, statement))
+
+def _handle_error(exception_context):
+    # O comando falhou: after_cursor_execute não roda, descarta o início
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("metrics_started"):
+        connection.info["metrics_started"].pop()
+
+if METRICS_ENABLED:
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+
+
+def _log_slow(method: str, path: str, route: str, elapsed: float, stats: RequestStats):
+    lines = [
+        f"Requisição lenta: {method} {path} ({route}) {elapsed * 1000:.1f} ms, "
+        f"{stats.statements} comandos SQL em {stats.sql_seconds * 1000:.1f} ms"
+    ]
+    for seconds, statement in stats.captured:
+        lines.append(f"  {seconds * 1000:8.2f} ms  {' '.join(statement.split())[:SLOW_LOG_STATEMENT_CHARS]}")
+    if stats.statements > len(stats.captured):
+        lines.append(f"  ... mais {stats.statements - len(stats.captured)} comandos")
+    logger.warning("\n".join(lines))
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(capture=SLOW_REQUEST_MS > 0)
+        response = {"status": 500, "stream": False}
+
+        async def send_with_status(message: Message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                content_type = Headers(raw=message["headers"]).get("content-type", "")
+                response["stream"] = content_type.startswith("text/event-stream")
+            await send(message)
+
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _current.reset(token)
+            # O roteador grava a rota encontrada no próprio scope
+            route = getattr(scope.get("route"), "path", UNMATCHED)
+            # Streams SSE duram o tempo da conexão: não entram na latência
+            seconds = None if response["stream"] else elapsed
+            registry.record_request(route, scope["method"], response["status"], seconds, stats)
+            if seconds is not None and stats.captured is not None and seconds * 1000 >= SLOW_REQUEST_MS:
+                _log_slow(scope["method"], scope["path"], route, seconds, stats)
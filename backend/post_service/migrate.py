@@ -0,0 +1,71 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateColumn
+import argparse
+import logging
+
+import database, models, timeline
+
+logger = logging.getLogger(__name__)
+
+# --- Migração do schema do post_service ---
+# Roda uma vez por deploy, depois da migração do user_service (dono de 'users'
+# e 'follows', que aqui só são lidas) e antes de subir os workers:
+#     python migrate.py
+# Só faz mudanças aditivas e idempotentes: cria as tabelas do serviço e os
+# índices que faltam e acrescenta colunas novas dos models. Se a
+# timeline_entries acabou de ser criada, ela é preenchida com os posts já
+# existentes (--backfill-timeline força a carga numa tabela vazia).
+
+OWNED_TABLES = ("posts", "votes", "replies", "timeline_entries")
+
+def add_missing_columns(conn, table) -> list:
+    existing = {column["name"] for column in inspect(conn).get_columns(table.name)}
+    added = []
+    for column in table.columns:
+        if column.name in existing:
+            continue
+        ddl = CreateColumn(column).compile(dialect=conn.dialect)
+        conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+        added.append(column.name)
+    return added
+
+def create_missing_indexes(conn, table) -> list:
+    # checkfirst: só cria o que não existe; índices 'ddl_if' seguem o dialeto.
+    # create_all não cria índices em tabelas que já existem, então é aqui que
+    # bancos antigos ganham os índices novos dos models.
+    before = {index["name"] for index in inspect(conn).get_indexes(table.name)}
+    for index in table.indexes:
+        index.create(conn, checkfirst=True)
+    after = {index["name"] for index in inspect(conn).get_indexes(table.name)}
+    return sorted(after - before)
+
+def migrate(engine, backfill_timeline: bool = False):
+    # Uma transação só: no Postgres o DDL também volta atrás se algo falhar
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        users_columns = {column["name"] for column in inspector.get_columns("users")} \
+            if inspector.has_table("users") else set()
+        if not inspector.has_table("follows") or "followers_count" not in users_columns:
+            raise SystemExit("Schema do user_service desatualizado: rode antes a migração do user_service.")
+
+        timeline_is_new = not inspector.has_table("timeline_entries")
+        tables = [models.Base.metadata.tables[name] for name in OWNED_TABLES]
+        models.Base.metadata.create_all(bind=conn, tables=tables)
+        for table in tables:
+            for column in add_missing_columns(conn, table):
+                logger.info("Coluna criada: %s.%s", table.name, column)
+            for index in create_missing_indexes(conn, table):
+                logger.info("Índice criado: %s", index)
+
+        if timeline_is_new or backfill_timeline:
+            if conn.execute(text("SELECT 1 FROM timeline_entries LIMIT 1")).first() is None:
+                logger.info("Timeline preenchida: %s entradas", timeline.backfill(conn))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cria/atualiza o schema do post_service")
+    parser.add_argument("--backfill-timeline", action="store_true",
+                        help="preenche timeline_entries se estiver vazia")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    migrate(database.engine, args.backfill_timeline)
+    logger.info("Schema do post_service atualizado")
@@ -1,9 +1,18 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index, Table, func
 from sqlalchemy.orm import relationship
+from sqlalchemy.dialects import postgresql # registra to_tsvector/ts_rank do Postgres
 from sqlalchemy.sql.sqltypes import TIMESTAMP
 from sqlalchemy.sql.expression import text
 from database import Base 
 
+# Tabela de "Seguir" do user_service (mesmo banco); aqui só é lida pela timeline
+follows = Table(
+    'follows', Base.metadata,
+    Column('follower_id', Integer, ForeignKey('users.id', ondelete="CASCADE"), primary_key=True),
+    Column('followed_id', Integer, ForeignKey('users.id', ondelete="CASCADE"), primary_key=True),
+    Index('ix_follows_followed_id_follower_id', 'followed_id', 'follower_id')
+)
+
 class User(Base):
     __tablename__ = "users"
     
@@ -11,6 +20,10 @@ class User(Base):
     name = Column(String, nullable=False) 
     email = Column(String, unique=True, nullable=False)
     college = Column(String, nullable=True) 
+    # Mantido pelo user_service; decide entre fan-out e merge na leitura (timeline.py)
+    followers_count = Column(Integer, nullable=False, server_default=text('0'))
+    # O índice de texto do nome (ix_users_name_fts, usado por search.py) é
+    # declarado e criado pelo user_service, dono da tabela
 
 class Post(Base):
     __tablename__ = "posts"
@@ -30,6 +43,19 @@ class Post(Base):
     # cascade="all, delete-orphan": Se um Post é apagado, todas as suas 'replies' são apagadas.
     replies = relationship("Reply", back_populates="post", cascade="all, delete-orphan")
 
+    # Índice composto que sustenta a paginação por cursor do feed (created_at, id)
+    # Índice GIN de texto para a busca (apenas Postgres, ver search.py)
+    __table_args__ = (
+        Index("ix_posts_created_at_id", "created_at", "id"),
+        # Posts de um autor em ordem cronológica (perfil e merge da timeline)
+        Index("ix_posts_owner_id_created_at_id", "owner_id", "created_at", "id"),
+        Index(
+            "ix_posts_content_fts",
+            func.to_tsvector(text("'portuguese'"), content),
+            postgresql_using="gin"
+        ).ddl_if(dialect="postgresql"),
+    )
+
 class Vote(Base):
     __tablename__ = "votes"
 
@@ -37,6 +63,17 @@ class Vote(Base):
     post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True)
     vote_type = Column(Integer, nullable=False) 
 
+# --- Timeline "Seguindo" pré-computada (ver timeline.py) ---
+# Uma linha por (leitor, post). A PK (user_id, created_at, post_id) é a
+# própria ordem de leitura da timeline, paginada por keyset.
+class TimelineEntry(Base):
+    __tablename__ = "timeline_entries"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    created_at = Column(TIMESTAMP(timezone=True), primary_key=True)
+    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True, index=True)
+    author_id = Column(Integer, nullable=False)
+
 # --- NOVA TABELA ---
 class Reply(Base):
     __tablename__ = "replies"
@@ -50,10 +87,10 @@ class Reply(Base):
     owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     
     # Chave estrangeira para o post ao qual a resposta pertence
-    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), nullable=False)
+    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), nullable=False, index=True)
 
     # Suporte para respostas aninhadas (uma resposta pode ter um 'pai')
-    parent_reply_id = Column(Integer, ForeignKey("replies.id", ondelete="CASCADE"), nullable=True)
+    parent_reply_id = Column(Integer, ForeignKey("replies.id", ondelete="CASCADE"), nullable=True, index=True)
 
     # Relações do SQLAlchemy
     owner = relationship("User")
@@ -0,0 +1,27 @@
+from fastapi import HTTPException, status
+from datetime import datetime
+from typing import Optional, Tuple
+import base64
+
+# --- Cursor opaco para paginação por keyset ---
+# O cliente recebe apenas uma string base64; internamente ela guarda a
+# posição (created_at, id) do último item da página anterior.
+
+def encode_cursor(created_at: datetime, item_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{item_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, item_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido.")
+
+def next_cursor(items: list, limit: int) -> Optional[str]:
+    # Página incompleta = fim da lista, não há próximo cursor
+    if len(items) < limit or not items:
+        return None
+    last = items[-1]
+    return encode_cursor(last.created_at, last.id)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field, AliasChoices
 from datetime import datetime
 from typing import Optional, List, Literal # <-- 'Literal' está no lugar correto
 
@@ -21,6 +21,18 @@ class Vote(BaseModel):
     post_id: int
     vote_type: Literal['agree', 'disagree', 'none']
 
+# Resposta do voto: só os contadores atualizados
+class VoteResponse(BaseModel):
+    post_id: int
+    agree_count: int
+    disagree_count: int
+    vote_type: Literal['agree', 'disagree', 'none']
+
+# Voto do usuário logado em um post (GET /votes/me)
+class MyVote(BaseModel):
+    post_id: int
+    vote_type: Literal['agree', 'disagree']
+
 # --- NOVOS SCHEMAS PARA REPLIES ---
 
 # O que a API devolve (definido ANTES de PostResponse)
@@ -31,11 +43,22 @@ class ReplyResponse(BaseModel):
     post_id: int
     owner_id: int
     parent_reply_id: Optional[int] = None
-    owner: UserResponse # Dados do autor
+    # Dados do autor: 'author' é preenchido em lote por users.py; senão usa a relação
+    owner: UserResponse = Field(validation_alias=AliasChoices("author", "owner"))
 
     class Config:
         from_attributes = True
 
+# Nó da árvore de respostas (GET /posts/{id}/replies/thread)
+class ReplyNode(ReplyResponse):
+    reply_count: int = 0 # Total de respostas diretas a este nó
+    children: List['ReplyNode'] = []
+    next_cursor: Optional[str] = None # Para carregar mais filhos deste nó
+
+class ThreadResponse(BaseModel):
+    replies: List[ReplyNode]
+    next_cursor: Optional[str] = None
+
 # O que o front-end envia para criar uma resposta
 class ReplyCreate(BaseModel):
     content: str
@@ -48,10 +71,34 @@ class PostResponse(BaseModel):
     content: str
     created_at: datetime
     owner_id: int
-    owner: UserResponse
+    owner: UserResponse = Field(validation_alias=AliasChoices("author", "owner"))
     agree_count: int
     disagree_count: int
-    replies: List[ReplyResponse] = [] # Inclui a lista de respostas
+    reply_count: int = 0
+    replies: List[ReplyResponse] = [] # Prévia: só as primeiras respostas (ver 'replies_preview')
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+# --- Importação em lote (POST /posts/bulk e /replies/bulk, ver ingest.py) ---
+class PostImport(BaseModel):
+    content: str
+    owner_id: int
+    created_at: Optional[datetime] = None # Sem data: hora da importação
+
+class ReplyImport(BaseModel):
+    content: str
+    owner_id: int
+    post_id: int
+    parent_reply_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+
+class BulkError(BaseModel):
+    index: int # Posição do item no pedido
+    detail: str
+
+class BulkResult(BaseModel):
+    created: int
+    ids: List[Optional[int]] # Na ordem do pedido; null = item recusado
+    errors: List[BulkError]
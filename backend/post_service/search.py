@@ -0,0 +1,201 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, or_, select, literal_column
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+import bisect
+import math
+import re
+import threading
+import unicodedata
+
+import models
+
+# --- Motor de busca de posts ---
+# No Postgres a busca usa os índices GIN de tsvector declarados em models.py
+# (conteúdo do post + nome do autor). Em outros bancos (SQLite nos testes)
+# cai para um índice invertido em memória, mantido incrementalmente por
+# create_post/delete_post e construído na primeira busca de cada worker.
+# Escritas que chegam durante a carga inicial ficam guardadas e são
+# aplicadas ao fim dela: um post gravado depois do SELECT da carga (ou
+# apagado depois de lido por ele) não se perde.
+
+# Precisa ser idêntico à expressão dos índices em models.py para o planner usá-los
+TS_CONFIG = literal_column("'portuguese'")
+
+_TOKEN_RE = re.compile(r"\w+")
+
+def tokenize(text: str) -> List[str]:
+    # Minúsculas e sem acentos, para que "educação" encontre "educacao"
+    normalized = unicodedata.normalize("NFKD", text.lower())
+    normalized = "".join(c for c in normalized if not unicodedata.combining(c))
+    return _TOKEN_RE.findall(normalized)
+
+
+class InvertedIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self._doc_terms: Dict[int, List[str]] = {}
+        self._terms: List[str] = []  # termos ordenados, para busca por prefixo
+        self._load_lock = threading.Lock()
+        # Durante a carga: (post_id, texto ou None = remover), na ordem
+        self._pending: Optional[List[Tuple[int, Optional[str]]]] = None
+        self.loaded = False
+
+    def _add(self, post_id: int, text: str):
+        tokens = tokenize(text)
+        counts: Dict[str, int] = defaultdict(int)
+        for token in tokens:
+            counts[token] += 1
+        for token, tf in counts.items():
+            if token not in self._postings:
+                bisect.insort(self._terms, token)
+            self._postings[token][post_id] = tf
+        self._doc_terms[post_id] = list(counts)
+
+    def _apply(self, post_id: int, text: Optional[str]):
+        self._remove(post_id)
+        if text is not None:
+            self._add(post_id, text)
+
+    def _write(self, post_id: int, text: Optional[str]):
+        # Antes da carga não há o que atualizar: o SELECT dela já verá a escrita
+        with self._lock:
+            if self.loaded:
+                self._apply(post_id, text)
+            elif self._pending is not None:
+                self._pending.append((post_id, text))
+
+    def add(self, post_id: int, text: str):
+        self._write(post_id, text)
+
+    def _remove(self, post_id: int):
+        for token in self._doc_terms.pop(post_id, []):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(post_id, None)
+            if not postings:
+                del self._postings[token]
+                i = bisect.bisect_left(self._terms, token)
+                if i < len(self._terms) and self._terms[i] == token:
+                    self._terms.pop(i)
+
+    def remove(self, post_id: int):
+        self._write(post_id, None)
+
+    def load(self, rows: Iterable[Tuple[int, str]]):
+        # 'rows' deve ser preguiçoso: o SELECT só pode começar depois que as
+        # escritas passam a ser guardadas
+        with self._load_lock:
+            if self.loaded:
+                return
+            with self._lock:
+                self._pending = []
+            try:
+                for post_id, text in rows:
+                    # Trava por linha: as escritas concorrentes não esperam a carga toda
+                    with self._lock:
+                        self._add(post_id, text)
+            except Exception:
+                with self._lock:
+                    self._reset()
+                raise
+            with self._lock:
+                for post_id, text in self._pending:
+                    self._apply(post_id, text)
+                self._pending = None
+                self.loaded = True
+
+    def _reset(self):
+        self._postings.clear()
+        self._doc_terms.clear()
+        self._terms.clear()
+        self._pending = None
+
+    def _expand(self, token: str) -> List[str]:
+        # O último termo da consulta casa por prefixo ("prog" -> "programação")
+        start = bisect.bisect_left(self._terms, token)
+        end = bisect.bisect_left(self._terms, token + "\uffff")
+        return self._terms[start:end]
+
+    def search(self, query: str, skip: int, limit: int) -> List[int]:
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        with self._lock:
+            total_docs = max(len(self._doc_terms), 1)
+            scores: Dict[int, float] = defaultdict(float)
+            matched: Optional[set] = None
+
+            for i, token in enumerate(tokens):
+                terms = self._expand(token) if i == len(tokens) - 1 else [token]
+                token_docs = set()
+                for term in terms:
+                    postings = self._postings.get(term, {})
+                    idf = math.log(1 + total_docs / len(postings)) if postings else 0
+                    for post_id, tf in postings.items():
+                        scores[post_id] += tf * idf
+                        token_docs.add(post_id)
+                # Todos os termos precisam aparecer (semântica AND, como plainto_tsquery)
+                matched = token_docs if matched is None else matched & token_docs
+
+            ranked = sorted(matched or (), key=lambda post_id: (-scores[post_id], -post_id))
+
+        return ranked[skip:skip + limit]
+
+
+_index = InvertedIndex()
+
+def _uses_fulltext(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+def _document(content: str, owner_name: str) -> str:
+    return f"{content} {owner_name}"
+
+def _ensure_loaded(db: Session):
+    if _index.loaded:
+        return
+    rows = db.query(models.Post.id, models.Post.content, models.User.name)\
+        .join(models.User, models.Post.owner_id == models.User.id)\
+        .yield_per(1000)
+    _index.load((post_id, _document(content, name)) for post_id, content, name in rows)
+
+# Chamado na inicialização do worker: sem Postgres, monta o índice em memória
+# antes da primeira busca em vez de durante ela
+def warm_up(db: Session):
+    if not _uses_fulltext(db):
+        _ensure_loaded(db)
+
+# --- Atualização incremental (chamada pelos endpoints de escrita) ---
+
+def index_post(post: models.Post, owner_name: str):
+    # No Postgres o próprio banco mantém o índice GIN (e o em memória nunca é carregado)
+    _index.add(post.id, _document(post.content, owner_name))
+
+def remove_post(post_id: int):
+    _index.remove(post_id)
+
+# --- Consulta ---
+
+def ranked_post_ids(db: Session, q: str, skip: int, limit: int) -> List[int]:
+    if not _uses_fulltext(db):
+        _ensure_loaded(db)
+        return _index.search(q, skip, limit)
+
+    ts_query = func.plainto_tsquery(TS_CONFIG, q)
+    content_vector = func.to_tsvector(TS_CONFIG, models.Post.content)
+    name_vector = func.to_tsvector(TS_CONFIG, models.User.name)
+
+    matching_owners = select(models.User.id).where(name_vector.bool_op("@@")(ts_query))
+    rank = func.ts_rank(content_vector, ts_query)
+
+    rows = db.query(models.Post.id).filter(
+        or_(
+            content_vector.bool_op("@@")(ts_query),
+            models.Post.owner_id.in_(matching_owners)
+        )
+    ).order_by(rank.desc(), models.Post.id.desc()).offset(skip).limit(limit).all()
+
+    return [post_id for (post_id,) in rows]
@@ -0,0 +1,105 @@
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import orjson
+
+import models, threads, users, vote_buffer
+
+# --- Serialização rápida das listas ---
+# As listas não passam mais pelo response_model com from_attributes, que
+# percorre post, owner e replies objeto a objeto. As consultas trazem só as
+# colunas (tuplas), os dicts da resposta são montados aqui e o JSON sai do
+# orjson. O formato é o mesmo de schemas.PostResponse / ReplyResponse, que
+# continuam no response_model dos endpoints para a documentação.
+
+POST_COLUMNS = (
+    models.Post.id,
+    models.Post.content,
+    models.Post.created_at,
+    models.Post.owner_id,
+    models.Post.agree_count,
+    models.Post.disagree_count,
+)
+
+REPLY_COLUMNS = (
+    models.Reply.id,
+    models.Reply.content,
+    models.Reply.created_at,
+    models.Reply.post_id,
+    models.Reply.owner_id,
+    models.Reply.parent_reply_id,
+)
+
+def post_rows(query) -> list:
+    return query.with_entities(*POST_COLUMNS).all()
+
+def post_rows_by_ids(db: Session, post_ids: List[int]) -> list:
+    if not post_ids:
+        return []
+    rows = db.query(*POST_COLUMNS).filter(models.Post.id.in_(post_ids)).all()
+    position = {post_id: i for i, post_id in enumerate(post_ids)}
+    rows.sort(key=lambda row: position[row.id])
+    return rows
+
+def reply_rows(query) -> list:
+    return query.with_entities(*REPLY_COLUMNS).all()
+
+def _owners(db: Session, owner_ids: Iterable[int]) -> Dict[int, dict]:
+    return {user_id: summary.model_dump() for user_id, summary in users.get_summaries(db, owner_ids).items()}
+
+def _reply_dict(row, owners: Dict[int, dict]) -> dict:
+    return {
+        "id": row.id,
+        "content": row.content,
+        "created_at": row.created_at,
+        "post_id": row.post_id,
+        "owner_id": row.owner_id,
+        "parent_reply_id": row.parent_reply_id,
+        "owner": owners.get(row.owner_id),
+    }
+
+def build_posts(
+    db: Session,
+    rows: list,
+    preview: int = 0,
+    stats: Optional[Dict[int, Tuple[int, int]]] = None
+) -> List[dict]:
+    post_ids = [row.id for row in rows]
+    if stats is None:
+        stats = threads.reply_stats(db, post_ids)
+    previews = threads.preview_replies(db, post_ids, preview, *REPLY_COLUMNS)
+
+    owner_ids = {row.owner_id for row in rows}
+    for replies in previews.values():
+        owner_ids.update(reply.owner_id for reply in replies)
+    owners = _owners(db, owner_ids)
+
+    payload = []
+    for row in rows:
+        agree, disagree = vote_buffer.buffer.counts(row.id, row.agree_count, row.disagree_count)
+        payload.append({
+            "id": row.id,
+            "content": row.content,
+            "created_at": row.created_at,
+            "owner_id": row.owner_id,
+            "owner": owners.get(row.owner_id),
+            "agree_count": agree,
+            "disagree_count": disagree,
+            "reply_count": stats.get(row.id, (0, None))[0],
+            "replies": [_reply_dict(reply, owners) for reply in previews[row.id]],
+        })
+    return payload
+
+def build_replies(db: Session, rows: list) -> List[dict]:
+    owners = _owners(db, {row.owner_id for row in rows})
+    return [_reply_dict(row, owners) for row in rows]
+
+class FastJSONResponse(JSONResponse):
+    # orjson já serializa datetime (ISO 8601, como o Pydantic) e devolve bytes
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+def json_response(content, response: Response) -> FastJSONResponse:
+    # Leva junto os headers já definidos no endpoint (X-Next-Cursor, ETag...)
+    return FastJSONResponse(content, headers=dict(response.headers))
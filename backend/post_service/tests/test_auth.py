@@ -0,0 +1,28 @@
+from types import SimpleNamespace
+
+from sqlalchemy import insert, update
+
+import auth, cache, database, models
+from conftest import auth_headers
+
+
+def test_principal_from_another_worker_goes_stale_for_at_most_the_ttl(client, db_engine, monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(cache, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    with db_engine.begin() as conn:
+        conn.execute(insert(models.User).values(id=1, name="Ana", email="ana@x.com"))
+    token = auth_headers("ana@x.com")["Authorization"].split()[1]
+
+    def current_name():
+        with database.SessionLocal() as db:
+            return auth.get_current_user(token=token, db=db).name
+
+    assert current_name() == "Ana"
+    # PUT /users/me atendido por outro worker: este não recebe invalidate_user
+    with db_engine.begin() as conn:
+        conn.execute(update(models.User).where(models.User.id == 1).values(name="Ana Maria"))
+    assert current_name() == "Ana"
+
+    clock.now += auth.AUTH_PRINCIPAL_TTL + 0.1
+    assert current_name() == "Ana Maria"
+
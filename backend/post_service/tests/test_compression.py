@@ -0,0 +1,44 @@
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+
+import compression
+
+BODY = "unitalks " * 500
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(compression.CompressionMiddleware)
+
+    @app.get("/")
+    def index():
+        return PlainTextResponse(BODY)
+
+    return TestClient(app)
+
+
+def test_negotiate_respects_quality():
+    assert compression.negotiate("gzip") == "gzip"
+    assert compression.negotiate("gzip;q=0.5") == "gzip"
+    assert compression.negotiate("gzip;q=0") is None
+    assert compression.negotiate("deflate, *") == "gzip"
+
+
+def test_negotiate_treats_malformed_quality_as_refused():
+    assert compression.negotiate("gzip;q=abc") is None
+    assert compression.negotiate("gzip;q=") is None
+    assert compression.negotiate("gzip;q=abc, identity") is None
+    assert compression.negotiate("br;q=oops, gzip;q=1") == "gzip"
+
+
+def test_malformed_accept_encoding_is_served_uncompressed():
+    response = _client().get("/", headers={"Accept-Encoding": "gzip;q=abc"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert response.text == BODY
+
+    response = _client().get("/", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == BODY
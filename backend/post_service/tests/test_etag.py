@@ -0,0 +1,61 @@
+from sqlalchemy import insert
+
+import models
+from conftest import auth_headers
+
+
+def _seed(engine):
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            {"id": 1, "name": "Ana", "email": "ana@x.com"},
+            {"id": 2, "name": "Bia", "email": "bia@x.com"},
+        ])
+        conn.execute(insert(models.Post), [
+            {"id": post_id, "content": f"post {post_id}", "owner_id": 1} for post_id in (1, 2, 3)
+        ])
+
+
+def _revalidate(client, path, tag, **params):
+    return client.get(path, params=params, headers={"If-None-Match": tag})
+
+
+def test_unchanged_page_is_a_304_without_body(client, db_engine):
+    _seed(db_engine)
+    first = client.get("/posts/")
+    tag = first.headers["ETag"]
+    assert tag.startswith('W/"')
+
+    again = _revalidate(client, "/posts/", tag)
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["ETag"] == tag
+    # Comparação fraca e listas de ETags
+    assert _revalidate(client, "/posts/", tag.removeprefix("W/")).status_code == 304
+    assert _revalidate(client, "/posts/", f'W/"outro", {tag}').status_code == 304
+
+
+def test_votes_replies_and_parameters_change_the_etag(client, db_engine):
+    _seed(db_engine)
+    tag = client.get("/posts/").headers["ETag"]
+
+    client.post("/vote/", json={"post_id": 2, "vote_type": "agree"}, headers=auth_headers("bia@x.com"))
+    after_vote = _revalidate(client, "/posts/", tag)
+    assert after_vote.status_code == 200
+    tag = after_vote.headers["ETag"]
+
+    client.post("/posts/2/replies", json={"content": "oi"}, headers=auth_headers("bia@x.com"))
+    after_reply = _revalidate(client, "/posts/", tag)
+    assert after_reply.status_code == 200
+    tag = after_reply.headers["ETag"]
+
+    # Mesmos posts, outro formato de resposta (prévias)
+    assert _revalidate(client, "/posts/", tag, replies_preview=2).status_code == 200
+    assert _revalidate(client, "/posts/", tag).status_code == 304
+
+
+def test_user_posts_listing_is_conditional_too(client, db_engine):
+    _seed(db_engine)
+    tag = client.get("/posts/user/1").headers["ETag"]
+    assert _revalidate(client, "/posts/user/1", tag).status_code == 304
+    # O ETag inclui o usuário: a lista (vazia) de outro usuário não casa
+    assert _revalidate(client, "/posts/user/2", tag).status_code == 200
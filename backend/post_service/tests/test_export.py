@@ -0,0 +1,60 @@
+import asyncio
+import gc
+import threading
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert
+
+import export, models
+
+
+@pytest.fixture
+def one_slot(monkeypatch):
+    monkeypatch.setattr(export, "_slots", threading.BoundedSemaphore(1))
+
+
+def _seed(engine):
+    with engine.begin() as conn:
+        conn.execute(insert(models.User).values(id=1, name="Ana", email="ana@x.com"))
+        conn.execute(insert(models.Post), [
+            {"content": f"post {index}", "owner_id": 1} for index in range(3)
+        ])
+
+
+async def _drain(response) -> bytes:
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
+def test_streams_over_the_limit_get_503_until_one_finishes(db_engine, one_slot):
+    _seed(db_engine)
+    first = export.streaming_response(export.user_posts_stmt(1), "ndjson")
+
+    with pytest.raises(HTTPException) as busy:
+        export.streaming_response(export.user_posts_stmt(1), "ndjson")
+    assert busy.value.status_code == 503
+    assert busy.value.headers["Retry-After"]
+
+    assert asyncio.run(_drain(first)).count(b"\n") == 3
+    second = export.streaming_response(export.user_posts_stmt(1), "ndjson")
+    asyncio.run(_drain(second))
+
+
+def test_abandoned_stream_gives_its_slot_back(db_engine, one_slot):
+    _seed(db_engine)
+    # Cliente desconectou antes do corpo começar: o gerador nunca roda
+    abandoned = export.streaming_response(export.user_posts_stmt(1), "ndjson")
+    del abandoned
+    gc.collect()
+
+    response = export.streaming_response(export.user_posts_stmt(1), "json")
+    assert asyncio.run(_drain(response)).startswith(b"[")
+
+
+def test_export_endpoint_answers_503_when_full(client, db_engine, one_slot):
+    _seed(db_engine)
+    held = export.streaming_response(export.user_posts_stmt(1), "ndjson")
+    response = client.get("/posts/user/1/export")
+    assert response.status_code == 503
+    asyncio.run(_drain(held))
+    assert client.get("/posts/user/1/export").status_code == 200
@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, insert, select
+
+import ingest, models
+from conftest import auth_headers
+
+ADMIN = "admin@x.com"
+
+
+def _seed(engine, monkeypatch):
+    monkeypatch.setattr(ingest, "INGEST_ADMINS", {ADMIN})
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            {"id": 1, "name": "Admin", "email": ADMIN},
+            {"id": 2, "name": "Ana", "email": "ana@x.com"},
+            {"id": 3, "name": "Bia", "email": "bia@x.com"},
+        ])
+        # Bia segue Ana: os posts importados de Ana vão para a timeline dela
+        conn.execute(insert(models.follows).values(follower_id=3, followed_id=2))
+
+
+def _count(engine, model, *where) -> int:
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(model).where(*where)).scalar()
+
+
+def test_only_admins_can_import(client, db_engine, monkeypatch):
+    _seed(db_engine, monkeypatch)
+    item = [{"content": "oi", "owner_id": 2}]
+    assert client.post("/posts/bulk", json=item, headers=auth_headers("ana@x.com")).status_code == 403
+    assert client.post("/replies/bulk", json=item, headers=auth_headers("ana@x.com")).status_code == 403
+    assert _count(db_engine, models.Post) == 0
+
+
+def test_bulk_posts_report_rejected_items_by_index(client, db_engine, monkeypatch):
+    _seed(db_engine, monkeypatch)
+    # Blocos de 2: os itens válidos atravessam vários blocos/transações
+    monkeypatch.setattr(ingest, "INGEST_CHUNK_SIZE", 2)
+    future = (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
+    items = [
+        {"content": "importado um", "owner_id": 2, "created_at": "2020-01-01T10:00:00"},
+        {"content": "   ", "owner_id": 2},
+        {"content": "sem autor", "owner_id": 99},
+        {"content": "do futuro", "owner_id": 2, "created_at": future},
+        {"content": "importado dois", "owner_id": 2},
+    ]
+    # Índice em memória já carregado: os itens entram por search.index_post
+    assert client.get("/search", params={"q": "importado"}).json() == []
+    response = client.post("/posts/bulk", json=items, headers=auth_headers(ADMIN))
+    assert response.status_code == 200
+    body = response.json()
+
+    assert body["created"] == 2
+    assert [item_id is not None for item_id in body["ids"]] == [True, False, False, False, True]
+    assert body["errors"] == [
+        {"index": 1, "detail": "Conteúdo vazio."},
+        {"index": 2, "detail": "Autor não encontrado."},
+        {"index": 3, "detail": "Data no futuro."},
+    ]
+    first, second = body["ids"][0], body["ids"][4]
+    with db_engine.connect() as conn:
+        created_at = conn.execute(select(models.Post.created_at).where(models.Post.id == first)).scalar()
+    assert created_at.replace(tzinfo=None) == datetime(2020, 1, 1, 10, 0)
+
+    assert _count(db_engine, models.TimelineEntry, models.TimelineEntry.user_id == 3) == 2
+    found = client.get("/search", params={"q": "importado"}).json()
+    assert {post["id"] for post in found} == {first, second}
+
+
+def test_bulk_replies_check_post_and_parent(client, db_engine, monkeypatch):
+    _seed(db_engine, monkeypatch)
+    with db_engine.begin() as conn:
+        conn.execute(insert(models.Post), [
+            {"id": 1, "content": "a", "owner_id": 2},
+            {"id": 2, "content": "b", "owner_id": 2},
+        ])
+        conn.execute(insert(models.Reply).values(id=10, content="r", owner_id=3, post_id=2))
+
+    items = [
+        {"content": "ok", "owner_id": 3, "post_id": 1},
+        {"content": "post inexistente", "owner_id": 3, "post_id": 99},
+        {"content": "pai inexistente", "owner_id": 3, "post_id": 1, "parent_reply_id": 999},
+        {"content": "pai de outro post", "owner_id": 3, "post_id": 1, "parent_reply_id": 10},
+        {"content": "filha", "owner_id": 3, "post_id": 2, "parent_reply_id": 10},
+    ]
+    body = client.post("/replies/bulk", json=items, headers=auth_headers(ADMIN)).json()
+
+    assert body["created"] == 2
+    assert [item_id is not None for item_id in body["ids"]] == [True, False, False, False, True]
+    assert [error["detail"] for error in body["errors"]] == [
+        "Post não encontrado.", "Resposta pai não encontrada.", "Resposta pai é de outro post.",
+    ]
+    assert _count(db_engine, models.Reply, models.Reply.post_id == 1) == 1
+    assert _count(db_engine, models.Reply, models.Reply.parent_reply_id == 10) == 1
+
+
+def test_oversized_batch_is_refused(client, db_engine, monkeypatch):
+    _seed(db_engine, monkeypatch)
+    monkeypatch.setattr(ingest, "INGEST_MAX_ITEMS", 2)
+    items = [{"content": "x", "owner_id": 2}] * 3
+    # Índice em memória já carregado: os itens entram por search.index_post
+    assert client.get("/search", params={"q": "importado"}).json() == []
+    response = client.post("/posts/bulk", json=items, headers=auth_headers(ADMIN))
+    assert response.status_code == 400
+    assert _count(db_engine, models.Post) == 0
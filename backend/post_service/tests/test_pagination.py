@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+import models
+
+POSTS = 25
+
+
+def _seed(engine):
+    # Grupos de 3 posts com o mesmo created_at: o id desempata
+    start = datetime(2026, 3, 1, 12, 0, 0)
+    with engine.begin() as conn:
+        conn.execute(insert(models.User).values(id=1, name="Ana", email="ana@x.com"))
+        conn.execute(insert(models.Post), [
+            {"id": post_id, "content": f"post {post_id}", "owner_id": 1,
+             "created_at": start + timedelta(minutes=post_id // 3)}
+            for post_id in range(1, POSTS + 1)
+        ])
+
+
+def _expected_order():
+    return sorted(range(1, POSTS + 1), key=lambda post_id: (post_id // 3, post_id), reverse=True)
+
+
+def test_cursor_walk_visits_every_post_once_in_order(client, db_engine):
+    _seed(db_engine)
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": 7}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/posts/", params=params)
+        assert response.status_code == 200
+        seen.extend(post["id"] for post in response.json())
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert seen == _expected_order()
+    assert pages == 4
+
+
+def test_cursor_skips_posts_created_after_the_first_page(client, db_engine):
+    _seed(db_engine)
+    first = client.get("/posts/", params={"limit": 5})
+    with db_engine.begin() as conn:
+        conn.execute(insert(models.Post).values(id=100, content="novo", owner_id=1, created_at=datetime(2027, 1, 1)))
+
+    second = client.get("/posts/", params={"limit": 5, "cursor": first.headers["X-Next-Cursor"]})
+    assert [post["id"] for post in second.json()] == _expected_order()[5:10]
+
+
+def test_skip_mode_still_returns_the_cursor_header(client, db_engine):
+    _seed(db_engine)
+    response = client.get("/posts/", params={"skip": 20, "limit": 5})
+    assert [post["id"] for post in response.json()] == _expected_order()[20:25]
+    assert "X-Next-Cursor" in response.headers
+    assert client.get("/posts/", params={"skip": 25, "limit": 5}).headers.get("X-Next-Cursor") is None
+
+
+def test_invalid_cursor_is_a_400(client, db_engine):
+    assert client.get("/posts/", params={"cursor": "não-é-um-cursor"}).status_code == 400
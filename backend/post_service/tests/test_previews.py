@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+import models
+
+
+def _seed(engine):
+    start = datetime(2026, 3, 1, 12, 0, 0)
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            {"id": 1, "name": "Ana", "email": "ana@x.com"},
+            {"id": 2, "name": "Bia", "email": "bia@x.com"},
+        ])
+        conn.execute(insert(models.Post), [
+            {"id": 1, "content": "com respostas", "owner_id": 1, "created_at": start},
+            {"id": 2, "content": "sem respostas", "owner_id": 2, "created_at": start + timedelta(minutes=1)},
+        ])
+        # 5 de primeiro nível (inseridas fora de ordem) e 2 aninhadas
+        for reply_id, minute in ((1, 3), (2, 1), (3, 5), (4, 2), (5, 4)):
+            conn.execute(insert(models.Reply).values(
+                id=reply_id, content=f"r{reply_id}", owner_id=2, post_id=1,
+                created_at=start + timedelta(minutes=minute)
+            ))
+        for reply_id in (6, 7):
+            conn.execute(insert(models.Reply).values(
+                id=reply_id, content=f"r{reply_id}", owner_id=1, post_id=1, parent_reply_id=2,
+                created_at=start
+            ))
+
+
+def _by_id(response):
+    assert response.status_code == 200
+    return {post["id"]: post for post in response.json()}
+
+
+def test_feed_counts_every_reply_but_previews_only_the_first_top_level_ones(client, db_engine):
+    _seed(db_engine)
+    posts = _by_id(client.get("/posts/", params={"replies_preview": 2}))
+
+    assert posts[1]["reply_count"] == 7
+    assert [reply["id"] for reply in posts[1]["replies"]] == [2, 4]
+    assert all(reply["parent_reply_id"] is None for reply in posts[1]["replies"])
+    assert posts[1]["replies"][0]["owner"]["name"] == "Bia"
+    assert posts[2]["reply_count"] == 0 and posts[2]["replies"] == []
+
+
+def test_feed_without_preview_sends_only_the_count(client, db_engine):
+    _seed(db_engine)
+    posts = _by_id(client.get("/posts/"))
+    assert posts[1]["reply_count"] == 7
+    assert posts[1]["replies"] == []
+
+
+def test_preview_size_is_bounded(client, db_engine):
+    assert client.get("/posts/", params={"replies_preview": 11}).status_code == 422
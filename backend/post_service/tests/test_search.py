@@ -0,0 +1,91 @@
+import pytest
+from sqlalchemy import insert
+
+import models, search
+from conftest import auth_headers
+
+
+def _rows_with_writes_midway(index: search.InvertedIndex):
+    # Simula escritas de outras requisições enquanto a carga lê o banco
+    yield 1, "introdução à programação"
+    index.add(3, "programação funcional")   # gravado depois do SELECT
+    index.remove(2)                         # apagado depois de lido
+    yield 2, "programação de jogos"
+
+
+def test_writes_during_the_initial_load_are_not_lost():
+    index = search.InvertedIndex()
+    index.load(_rows_with_writes_midway(index))
+
+    assert index.loaded
+    assert index.search("programação", 0, 10) == [3, 1]
+
+
+def test_writes_before_the_load_are_left_to_the_select():
+    index = search.InvertedIndex()
+    index.add(9, "antes da carga")
+    index.load(iter([(1, "carga")]))
+    assert index.search("antes", 0, 10) == []
+    assert index.search("carga", 0, 10) == [1]
+
+
+def test_failed_load_can_be_retried():
+    index = search.InvertedIndex()
+
+    def broken_rows():
+        yield 1, "parcial"
+        raise RuntimeError("conexão perdida")
+
+    with pytest.raises(RuntimeError):
+        index.load(broken_rows())
+    assert not index.loaded
+
+    index.load(iter([(2, "completo")]))
+    assert index.search("parcial", 0, 10) == []
+    assert index.search("completo", 0, 10) == [2]
+
+
+def _seed_posts(engine):
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            {"id": 1, "name": "Ana Souza", "email": "ana@x.com"},
+            {"id": 2, "name": "Bia", "email": "bia@x.com"},
+        ])
+        conn.execute(insert(models.Post), [
+            {"id": 1, "content": "Educação pública e educação privada", "owner_id": 2},
+            {"id": 2, "content": "Vale a pena estudar programação?", "owner_id": 2},
+            {"id": 3, "content": "educacao a distancia", "owner_id": 2},
+            {"id": 4, "content": "Cardápio do bandejão", "owner_id": 1},
+        ])
+
+
+def _search(client, q, **params):
+    response = client.get("/search", params={"q": q, **params})
+    assert response.status_code == 200
+    return [post["id"] for post in response.json()]
+
+
+def test_fallback_search_ranks_folds_accents_and_pages(client, db_engine):
+    _seed_posts(db_engine)
+    # Mais ocorrências primeiro; "educação" casa com "educacao"
+    assert _search(client, "educação") == [1, 3]
+    assert _search(client, "educação", limit=1) == [1]
+    assert _search(client, "educação", limit=1, skip=1) == [3]
+    assert _search(client, "educação", limit=1, skip=2) == []
+    # Último termo por prefixo e nome do autor
+    assert _search(client, "progr") == [2]
+    assert _search(client, "souza") == [4]
+    assert _search(client, "   ") == []
+
+
+def test_fallback_search_follows_created_and_deleted_posts(client, db_engine):
+    _seed_posts(db_engine)
+    assert _search(client, "bandejão") == [4]
+
+    created = client.post("/posts/", json={"content": "Fila do bandejão hoje"}, headers=auth_headers("bia@x.com"))
+    assert created.status_code == 201
+    new_id = created.json()["id"]
+    assert sorted(_search(client, "bandejão")) == [4, new_id]
+
+    assert client.delete("/posts/4", headers=auth_headers("ana@x.com")).status_code == 204
+    assert _search(client, "bandejão") == [new_id]
@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+import models
+from conftest import auth_headers
+
+
+def _seed(engine):
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            {"id": 1, "name": "Ana", "email": "ana@x.com"},
+            {"id": 2, "name": "Bia", "email": "bia@x.com"},
+        ])
+        conn.execute(insert(models.Post), [
+            {"id": 1, "content": "post um", "owner_id": 1},
+            {"id": 2, "content": "post dois", "owner_id": 2},
+        ])
+        conn.execute(insert(models.Reply), [
+            {"id": 1, "content": "raiz", "owner_id": 2, "post_id": 1, "parent_reply_id": None},
+            {"id": 2, "content": "filha", "owner_id": 1, "post_id": 1, "parent_reply_id": 1},
+        ])
+
+
+def test_reply_with_parent_from_another_post_is_rejected(client, db_engine):
+    _seed(db_engine)
+    response = client.post("/posts/2/replies", json={"content": "intrusa", "parent_reply_id": 1},
+                           headers=auth_headers("bia@x.com"))
+    assert response.status_code == 400
+
+    thread = client.get("/posts/1/replies/thread").json()
+    assert thread["replies"][0]["reply_count"] == 1
+
+
+def test_thread_ignores_children_stored_under_another_post(client, db_engine):
+    _seed(db_engine)
+    # Linha inconsistente gravada antes da validação (ou por outro caminho)
+    with db_engine.begin() as conn:
+        conn.execute(insert(models.Reply).values(
+            id=3, content="intrusa", owner_id=2, post_id=2, parent_reply_id=1
+        ))
+
+    for depth in (1, 2):
+        root = client.get("/posts/1/replies/thread", params={"depth": depth}).json()["replies"][0]
+        assert root["reply_count"] == 1
+    root = client.get("/posts/1/replies/thread", params={"depth": 2}).json()["replies"][0]
+    assert [child["id"] for child in root["children"]] == [2]
+
+    children = client.get("/posts/1/replies/thread", params={"parent_id": 1}).json()["replies"]
+    assert [child["id"] for child in children] == [2]
+
+
+def test_nested_reply_on_the_same_post_is_accepted(client, db_engine):
+    _seed(db_engine)
+    response = client.post("/posts/1/replies", json={"content": "neta", "parent_reply_id": 2},
+                           headers=auth_headers("bia@x.com"))
+    assert response.status_code == 201
+
+    root = client.get("/posts/1/replies/thread", params={"depth": 3}).json()["replies"][0]
+    assert [grandchild["content"] for grandchild in root["children"][0]["children"]] == ["neta"]
+
+
+def _seed_wide(engine):
+    # Post 1: 4 raízes; a raiz 1 tem 3 filhos, o filho 10 tem 1 neto (e o neto, 1 bisneto)
+    start = datetime(2026, 3, 1, 12, 0, 0)
+    rows = [(root, None, root) for root in (1, 2, 3, 4)]
+    rows += [(10, 1, 10), (11, 1, 11), (12, 1, 12), (20, 10, 20), (30, 20, 30)]
+    with engine.begin() as conn:
+        conn.execute(insert(models.User).values(id=1, name="Ana", email="ana@x.com"))
+        conn.execute(insert(models.Post).values(id=1, content="post", owner_id=1))
+        for reply_id, parent_id, minute in rows:
+            conn.execute(insert(models.Reply).values(
+                id=reply_id, content=f"r{reply_id}", owner_id=1, post_id=1, parent_reply_id=parent_id,
+                created_at=start + timedelta(minutes=minute)
+            ))
+
+
+def test_thread_pages_roots_and_children_with_cursors(client, db_engine):
+    _seed_wide(db_engine)
+    page = client.get("/posts/1/replies/thread", params={"page_size": 2, "depth": 2}).json()
+    assert [root["id"] for root in page["replies"]] == [1, 2]
+    root = page["replies"][0]
+    assert root["reply_count"] == 3
+    assert [child["id"] for child in root["children"]] == [10, 11]
+    assert root["children"][0]["reply_count"] == 1
+
+    more_roots = client.get("/posts/1/replies/thread",
+                            params={"page_size": 2, "cursor": page["next_cursor"]}).json()
+    assert [reply["id"] for reply in more_roots["replies"]] == [3, 4]
+    assert more_roots["next_cursor"] is None
+
+    more_children = client.get("/posts/1/replies/thread", params={
+        "parent_id": 1, "page_size": 2, "cursor": root["next_cursor"]
+    }).json()
+    assert [child["id"] for child in more_children["replies"]] == [12]
+
+
+def test_thread_stops_at_the_requested_depth(client, db_engine):
+    _seed_wide(db_engine)
+    # depth conta os níveis exibidos: raízes, filhos e netos
+    root = client.get("/posts/1/replies/thread", params={"depth": 3}).json()["replies"][0]
+    child = root["children"][0]
+    grandchild = child["children"][0]
+    # Último nível exibido: só a contagem, sem filhos nem cursor
+    assert grandchild["id"] == 20
+    assert grandchild["reply_count"] == 1
+    assert grandchild["children"] == [] and grandchild["next_cursor"] is None
+
+    deeper = client.get("/posts/1/replies/thread", params={"parent_id": 20}).json()["replies"]
+    assert [reply["id"] for reply in deeper] == [30]
+
+
+def test_thread_window_parameters_are_bounded(client, db_engine):
+    assert client.get("/posts/1/replies/thread", params={"depth": 11}).status_code == 422
+    assert client.get("/posts/1/replies/thread", params={"page_size": 51}).status_code == 422
@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta, timezone
+import time
+
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.orm import Session
+
+import database, models, timeline
+from conftest import auth_headers
+
+
+def _seed(engine, posts: int):
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            {"id": 1, "name": "Ana", "email": "ana@x.com"},
+            {"id": 2, "name": "Bia", "email": "bia@x.com"},
+        ])
+        conn.execute(insert(models.follows).values(follower_id=1, followed_id=2))
+        conn.execute(insert(models.Post), [
+            {"id": post_id, "content": f"post {post_id}", "owner_id": 2,
+             "created_at": start + timedelta(minutes=post_id)}
+            for post_id in range(1, posts + 1)
+        ])
+        conn.execute(insert(models.TimelineEntry), [
+            {"user_id": 1, "post_id": post_id, "author_id": 2,
+             "created_at": start + timedelta(minutes=post_id)}
+            for post_id in range(1, posts + 1)
+        ])
+
+
+def _entries(engine) -> int:
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(models.TimelineEntry)).scalar()
+
+
+def test_timeline_read_does_not_write(client, db_engine, monkeypatch):
+    monkeypatch.setattr(timeline, "TIMELINE_MAX_LENGTH", 3)
+    _seed(db_engine, 6)
+    writes = []
+
+    def record(state):
+        if not state.is_select:
+            writes.append(state.statement)
+
+    event.listen(Session, "do_orm_execute", record)
+    try:
+        response = client.get("/timeline", params={"limit": 2}, headers=auth_headers("ana@x.com"))
+    finally:
+        event.remove(Session, "do_orm_execute", record)
+
+    assert response.status_code == 200
+    assert [post["id"] for post in response.json()] == [6, 5]
+    assert writes == []
+    assert _entries(db_engine) == 6
+
+
+def test_trim_keeps_the_newest_entries(db_engine, monkeypatch):
+    monkeypatch.setattr(timeline, "TIMELINE_MAX_LENGTH", 3)
+    _seed(db_engine, 6)
+    with database.SessionLocal() as db:
+        assert timeline.trim_overflowing(db) == 1
+        assert timeline.trim_overflowing(db) == 0
+        kept = db.scalars(select(models.TimelineEntry.post_id).order_by(models.TimelineEntry.post_id)).all()
+    assert kept == [4, 5, 6]
+
+
+def test_trimmer_thread_prunes_in_the_background(db_engine, monkeypatch):
+    monkeypatch.setattr(timeline, "TIMELINE_MAX_LENGTH", 3)
+    _seed(db_engine, 6)
+    trimmer = timeline.Trimmer(0.05)
+    trimmer.start()
+    try:
+        deadline = time.monotonic() + 5
+        while _entries(db_engine) > 3 and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        trimmer.stop()
+    assert _entries(db_engine) == 3
+
+
+def _timeline_ids(client, email: str, **params):
+    response = client.get("/timeline", params=params, headers=auth_headers(email))
+    assert response.status_code == 200
+    return [post["id"] for post in response.json()], response.headers.get("X-Next-Cursor")
+
+
+def test_timeline_shows_own_and_followed_authors_only(client, db_engine, monkeypatch):
+    with db_engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            {"id": 1, "name": "Ana", "email": "ana@x.com"},
+            {"id": 2, "name": "Bia", "email": "bia@x.com"},
+            {"id": 3, "name": "Caio", "email": "caio@x.com"},
+            {"id": 4, "name": "Duda", "email": "duda@x.com"},
+        ])
+        conn.execute(insert(models.follows), [
+            {"follower_id": 1, "followed_id": 2},
+            {"follower_id": 1, "followed_id": 4},
+            {"follower_id": 3, "followed_id": 4},
+        ])
+
+    def publish(email: str) -> int:
+        return client.post("/posts/", json={"content": email}, headers=auth_headers(email)).json()["id"]
+
+    own = publish("ana@x.com")
+    followed = publish("bia@x.com")
+    publish("caio@x.com")
+    # Duda tem "seguidores demais": sem fan-out, os posts vêm na leitura
+    monkeypatch.setattr(timeline, "FANOUT_MAX_FOLLOWERS", 1)
+    celebrity = publish("duda@x.com")
+
+    ids, _ = _timeline_ids(client, "ana@x.com")
+    assert ids == [celebrity, followed, own]
+
+    first, cursor = _timeline_ids(client, "ana@x.com", limit=2)
+    rest, end = _timeline_ids(client, "ana@x.com", limit=2, cursor=cursor)
+    assert (first + rest, end) == (ids, None)
+
+    # Deixar de seguir esconde os posts já entregues, sem apagá-los
+    with db_engine.begin() as conn:
+        conn.execute(models.follows.delete().where(models.follows.c.followed_id == 2))
+    assert _timeline_ids(client, "ana@x.com")[0] == [celebrity, own]
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert
+
+import database, models, trending
+from conftest import auth_headers
+
+
+def _seed(engine):
+    old = datetime.now(timezone.utc) - timedelta(days=3)
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            {"id": 1, "name": "Ana", "email": "ana@x.com"},
+            {"id": 2, "name": "Bia", "email": "bia@x.com"},
+        ])
+        conn.execute(insert(models.Post), [
+            {"id": 1, "content": "antigo", "owner_id": 1, "created_at": old},
+            {"id": 2, "content": "novo", "owner_id": 2, "created_at": datetime.now(timezone.utc)},
+        ])
+        conn.execute(insert(models.Reply), [
+            {"id": reply_id, "content": "r", "owner_id": 2, "post_id": 1, "parent_reply_id": None}
+            for reply_id in (1, 2, 3)
+        ])
+        conn.execute(insert(models.Reply).values(id=4, content="filha", owner_id=1, post_id=1, parent_reply_id=1))
+
+
+def _load(window: int, monkeypatch):
+    monkeypatch.setattr(trending, "CANDIDATES", window)
+    with database.SessionLocal() as db:
+        trending.cache.top_ids(db)
+
+
+def test_post_outside_the_window_enters_with_its_real_reply_count(client, db_engine, monkeypatch):
+    _seed(db_engine)
+    _load(1, monkeypatch)
+    assert 1 not in trending.cache._candidates
+
+    response = client.post("/posts/1/replies", json={"content": "volta"}, headers=auth_headers("bia@x.com"))
+    assert response.status_code == 201
+    assert trending.cache._candidates[1][2] == 5
+
+    client.post("/posts/1/replies", json={"content": "mais uma"}, headers=auth_headers("bia@x.com"))
+    assert trending.cache._candidates[1][2] == 6
+
+
+def test_vote_on_post_outside_the_window_keeps_its_replies(client, db_engine, monkeypatch):
+    _seed(db_engine)
+    _load(1, monkeypatch)
+    response = client.post("/vote/", json={"post_id": 1, "vote_type": "agree"}, headers=auth_headers("bia@x.com"))
+    assert response.status_code == 200
+    assert trending.cache._candidates[1][1:] == [1, 4]
+
+
+def test_deleting_a_reply_recounts_including_cascaded_children(client, db_engine, monkeypatch):
+    _seed(db_engine)
+    _load(10, monkeypatch)
+    assert trending.cache._candidates[1][2] == 4
+
+    # Resposta 1 leva junto a filha (4)
+    response = client.delete("/replies/1", headers=auth_headers("bia@x.com"))
+    assert response.status_code == 204
+    assert trending.cache._candidates[1][2] == 2
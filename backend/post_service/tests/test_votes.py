@@ -0,0 +1,101 @@
+import random
+import threading
+
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.orm import Session
+
+import database, models, votes, vote_buffer
+
+USERS = 8
+THREADS_PER_USER = 4
+VOTES_PER_THREAD = 25
+
+
+def _seed(engine) -> int:
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            {"id": user_id, "name": f"u{user_id}", "email": f"u{user_id}@x.com"} for user_id in range(1, USERS + 1)
+        ])
+        return conn.execute(insert(models.Post).values(content="p", owner_id=1).returning(models.Post.id)).scalar()
+
+
+def _vote_concurrently(post_id: int):
+    # Várias threads por usuário: o mesmo usuário vota no mesmo post ao mesmo tempo
+    barrier = threading.Barrier(USERS * THREADS_PER_USER)
+    errors = []
+
+    def run(user_id: int, seed: int):
+        rng = random.Random(seed)
+        barrier.wait()
+        try:
+            for _ in range(VOTES_PER_THREAD):
+                with database.SessionLocal() as db:
+                    votes.apply_vote(db, post_id, user_id, rng.choice(["agree", "disagree", "none", "agree"]))
+        except Exception as error:
+            errors.append(error)
+
+    threads = [
+        threading.Thread(target=run, args=(user_id, user_id * 100 + index))
+        for user_id in range(1, USERS + 1) for index in range(THREADS_PER_USER)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def _assert_counters_match_votes(engine, post_id: int):
+    with engine.connect() as conn:
+        agree, disagree = conn.execute(
+            select(models.Post.agree_count, models.Post.disagree_count).where(models.Post.id == post_id)
+        ).one()
+        rows = dict(conn.execute(
+            select(models.Vote.vote_type, func.count()).where(models.Vote.post_id == post_id).group_by(models.Vote.vote_type)
+        ).all())
+    assert (agree, disagree) == (rows.get(1, 0), rows.get(-1, 0))
+
+
+def test_concurrent_votes_keep_counters_exact(db_engine):
+    post_id = _seed(db_engine)
+    _vote_concurrently(post_id)
+    _assert_counters_match_votes(db_engine, post_id)
+
+
+def test_concurrent_buffered_votes_keep_counters_exact(db_engine, monkeypatch):
+    monkeypatch.setattr(vote_buffer.buffer, "enabled", True)
+    post_id = _seed(db_engine)
+    _vote_concurrently(post_id)
+    vote_buffer.buffer.flush()
+    _assert_counters_match_votes(db_engine, post_id)
+
+
+def test_vote_on_missing_post_returns_none(db_engine):
+    _seed(db_engine)
+    with database.SessionLocal() as db:
+        assert votes.apply_vote(db, 999, 1, "agree") is None
+
+
+def test_buffered_vote_does_not_lock_or_update_the_post(db_engine, monkeypatch):
+    # O buffer existe para tirar a disputa pela linha do post dos votos
+    monkeypatch.setattr(vote_buffer.buffer, "enabled", True)
+    post_id = _seed(db_engine)
+    locked, updated = [], []
+
+    def record(state):
+        # O SQLite descarta FOR UPDATE ao compilar: confere o statement em si
+        if getattr(state.statement, "_for_update_arg", None) is not None:
+            locked.append(state.statement)
+        if state.is_update and state.statement.table.name == "posts":
+            updated.append(state.statement)
+
+    event.listen(Session, "do_orm_execute", record)
+    try:
+        with database.SessionLocal() as db:
+            counts = votes.apply_vote(db, post_id, 1, "agree")
+    finally:
+        event.remove(Session, "do_orm_execute", record)
+        vote_buffer.buffer.flush()
+
+    assert counts.agree_count == 1
+    assert locked == [] and updated == []
@@ -0,0 +1,161 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import func, select, tuple_
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import models, pagination, users
+
+# --- Respostas resumidas para os itens do feed ---
+# Em vez de um joinedload(Post.replies) por item (JOIN que multiplica linhas),
+# uma página de posts custa no máximo duas consultas extras em lote:
+#   1. contagem de respostas por post (GROUP BY sobre o índice de post_id)
+#   2. as primeiras N respostas de primeiro nível de cada post (row_number)
+# Os autores de posts e respostas são resolvidos juntos, em lote (users.py).
+
+def reply_stats(db: Session, post_ids: List[int]) -> Dict[int, Tuple[int, int]]:
+    # post_id -> (total de respostas, id da mais recente)
+    if not post_ids:
+        return {}
+    rows = db.query(models.Reply.post_id, func.count(models.Reply.id), func.max(models.Reply.id))\
+        .filter(models.Reply.post_id.in_(post_ids))\
+        .group_by(models.Reply.post_id).all()
+    return {post_id: (count, last_id) for post_id, count, last_id in rows}
+
+def preview_replies(db: Session, post_ids: List[int], preview: int, *entities):
+    # 'entities' pode ser models.Reply (objetos) ou colunas (tuplas, ver serialization.py)
+    previews = defaultdict(list)
+    if not post_ids or preview <= 0:
+        return previews
+
+    ranked = select(
+        models.Reply.id,
+        func.row_number().over(
+            partition_by=models.Reply.post_id,
+            order_by=(models.Reply.created_at, models.Reply.id)
+        ).label("position")
+    ).where(
+        models.Reply.post_id.in_(post_ids),
+        models.Reply.parent_reply_id.is_(None)
+    ).subquery()
+
+    rows = db.query(*entities)\
+        .join(ranked, ranked.c.id == models.Reply.id)\
+        .filter(ranked.c.position <= preview)\
+        .order_by(models.Reply.created_at, models.Reply.id).all()
+    for reply in rows:
+        previews[reply.post_id].append(reply)
+    return previews
+
+def attach_replies(db: Session, posts: List[models.Post], preview: int = 0) -> List[models.Post]:
+    post_ids = [post.id for post in posts]
+    stats = reply_stats(db, post_ids)
+    previews = preview_replies(db, post_ids, preview, models.Reply)
+
+    preview_list = []
+    for post in posts:
+        post.reply_count = stats.get(post.id, (0, None))[0]
+        # Preenche a relação sem disparar o lazy load da lista completa
+        set_committed_value(post, "replies", previews[post.id])
+        preview_list.extend(previews[post.id])
+
+    users.attach_owners(db, posts + preview_list)
+    return posts
+
+
+# --- Árvore de respostas (thread) ---
+# Carrega a árvore nível a nível: cada nível custa uma consulta em lote que
+# traz, para todos os pais exibidos, só os primeiros 'page_size' filhos
+# (row_number) e o total de filhos de cada pai (count over). O custo depende
+# do que é exibido (profundidade x página), não do tamanho da thread.
+# Toda consulta filtra por post_id: uma resposta só aparece na thread do
+# próprio post, mesmo que o banco tenha um pai de outro post gravado.
+
+def _children_page(db: Session, post_id: int, parent_ids: List[int], page_size: int):
+    ranked = select(
+        models.Reply.id,
+        func.row_number().over(
+            partition_by=models.Reply.parent_reply_id,
+            order_by=(models.Reply.created_at, models.Reply.id)
+        ).label("position"),
+        func.count().over(partition_by=models.Reply.parent_reply_id).label("siblings")
+    ).where(models.Reply.post_id == post_id, models.Reply.parent_reply_id.in_(parent_ids)).subquery()
+
+    rows = db.query(models.Reply, ranked.c.siblings)\
+        .join(ranked, ranked.c.id == models.Reply.id)\
+        .filter(ranked.c.position <= page_size)\
+        .order_by(models.Reply.created_at, models.Reply.id).all()
+
+    children = defaultdict(list)
+    totals = {}
+    for reply, siblings in rows:
+        children[reply.parent_reply_id].append(reply)
+        totals[reply.parent_reply_id] = siblings
+    return children, totals
+
+def _child_counts(db: Session, post_id: int, parent_ids: List[int]):
+    return dict(
+        db.query(models.Reply.parent_reply_id, func.count(models.Reply.id))
+        .filter(models.Reply.post_id == post_id, models.Reply.parent_reply_id.in_(parent_ids))
+        .group_by(models.Reply.parent_reply_id).all()
+    )
+
+def load_thread(
+    db: Session,
+    post_id: int,
+    parent_id: Optional[int],
+    cursor: Optional[str],
+    depth: int,
+    page_size: int
+):
+    query = db.query(models.Reply)\
+        .filter(models.Reply.post_id == post_id)\
+        .order_by(models.Reply.created_at, models.Reply.id)
+
+    if parent_id is None:
+        query = query.filter(models.Reply.parent_reply_id.is_(None))
+    else:
+        query = query.filter(models.Reply.parent_reply_id == parent_id)
+
+    if cursor:
+        created_at, reply_id = pagination.decode_cursor(cursor)
+        query = query.filter(tuple_(models.Reply.created_at, models.Reply.id) > (created_at, reply_id))
+
+    # Busca um item a mais só para saber se existe próxima página
+    roots = query.limit(page_size + 1).all()
+    has_more = len(roots) > page_size
+    roots = roots[:page_size]
+    next_cursor = pagination.encode_cursor(roots[-1].created_at, roots[-1].id) if has_more else None
+
+    shown = list(roots)
+    level = roots
+    for current_depth in range(1, depth + 1):
+        if not level:
+            break
+        parent_ids = [reply.id for reply in level]
+
+        # Último nível exibido: só precisamos saber quantos filhos cada um tem
+        if current_depth == depth:
+            counts = _child_counts(db, post_id, parent_ids)
+            for reply in level:
+                reply.reply_count = counts.get(reply.id, 0)
+                reply.children = []
+                reply.next_cursor = None
+            break
+
+        children, totals = _children_page(db, post_id, parent_ids, page_size)
+        next_level = []
+        for reply in level:
+            reply.children = children.get(reply.id, [])
+            reply.reply_count = totals.get(reply.id, 0)
+            # Cursor de "carregar mais" para a subárvore deste nó
+            reply.next_cursor = None
+            if reply.reply_count > len(reply.children):
+                last = reply.children[-1]
+                reply.next_cursor = pagination.encode_cursor(last.created_at, last.id)
+            next_level.extend(reply.children)
+        shown.extend(next_level)
+        level = next_level
+
+    users.attach_owners(db, shown)
+    return roots, next_cursor
@@ -0,0 +1,202 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select, insert, delete, desc, exists, func, or_, tuple_, union_all
+from dotenv import load_dotenv
+from typing import List, Optional, Tuple
+import logging
+import os
+import threading
+
+import models, pagination, database
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# --- Timeline "Seguindo" ---
+# Fan-out na escrita: ao publicar, o post é copiado (um único INSERT ... SELECT
+# sobre 'follows') para a timeline_entries de cada seguidor e do próprio autor.
+# Autores com mais de FANOUT_MAX_FOLLOWERS seguidores não fazem fan-out: os
+# posts deles são buscados na leitura (índice owner_id, created_at, id) e
+# intercalados com a timeline pré-computada.
+# Cada timeline guarda no máximo TIMELINE_MAX_LENGTH posts. O excedente é
+# apagado por uma thread de cada worker a cada TIMELINE_TRIM_INTERVAL segundos
+# (0 = desligado), só nas timelines que passaram do limite; a leitura
+# (GET /timeline) não escreve nada. Entre duas podas uma timeline pode ter
+# alguns posts a mais, que a paginação simplesmente alcança mais tarde.
+# Deixar de seguir não apaga nada: a leitura só considera autores que o
+# usuário ainda segue (EXISTS em 'follows', pela PK).
+
+TIMELINE_MAX_LENGTH = int(os.environ.get("TIMELINE_MAX_LENGTH", 800))
+TIMELINE_TRIM_INTERVAL = float(os.environ.get("TIMELINE_TRIM_INTERVAL", 60))
+FANOUT_MAX_FOLLOWERS = int(os.environ.get("FANOUT_MAX_FOLLOWERS", 10000))
+
+Entry = models.TimelineEntry
+follows = models.follows
+
+def fan_out(db: Session, post: models.Post, followers_count: int):
+    columns = (models.Post.id, models.Post.created_at, models.Post.owner_id)
+    rows = select(models.Post.owner_id, *columns).where(models.Post.id == post.id)
+    if followers_count <= FANOUT_MAX_FOLLOWERS:
+        rows = union_all(
+            rows,
+            select(follows.c.follower_id, *columns)
+            .join(follows, follows.c.followed_id == models.Post.owner_id)
+            .where(models.Post.id == post.id)
+        )
+    db.execute(
+        insert(Entry).from_select(
+            [Entry.user_id, Entry.post_id, Entry.created_at, Entry.author_id], rows
+        )
+    )
+
+# Fan-out de vários posts de uma vez (importação em lote, ver ingest.py): um
+# único INSERT ... SELECT; o limite de seguidores é lido de cada autor.
+def fan_out_many(db: Session, post_ids: List[int]):
+    columns = (models.Post.id, models.Post.created_at, models.Post.owner_id)
+    rows = union_all(
+        select(models.Post.owner_id, *columns).where(models.Post.id.in_(post_ids)),
+        select(follows.c.follower_id, *columns)
+        .join(follows, follows.c.followed_id == models.Post.owner_id)
+        .join(models.User, models.User.id == models.Post.owner_id)
+        .where(models.Post.id.in_(post_ids), models.User.followers_count <= FANOUT_MAX_FOLLOWERS)
+    )
+    db.execute(
+        insert(Entry).from_select(
+            [Entry.user_id, Entry.post_id, Entry.created_at, Entry.author_id], rows
+        )
+    )
+
+# --- Carga inicial (migrate.py) ---
+# Preenche timeline_entries a partir dos posts já existentes, com a mesma regra
+# do fan-out e já limitada aos TIMELINE_MAX_LENGTH mais recentes de cada leitor.
+def backfill(db):
+    columns = (models.Post.created_at, models.Post.id.label("post_id"), models.Post.owner_id.label("author_id"))
+    candidates = union_all(
+        select(models.Post.owner_id.label("user_id"), *columns),
+        select(follows.c.follower_id.label("user_id"), *columns)
+        .join(follows, follows.c.followed_id == models.Post.owner_id)
+        .join(models.User, models.User.id == models.Post.owner_id)
+        .where(models.User.followers_count <= FANOUT_MAX_FOLLOWERS)
+    ).subquery()
+    position = func.row_number().over(
+        partition_by=candidates.c.user_id,
+        order_by=(desc(candidates.c.created_at), desc(candidates.c.post_id))
+    ).label("position")
+    ranked = select(candidates, position).subquery()
+    result = db.execute(
+        insert(Entry).from_select(
+            [Entry.user_id, Entry.created_at, Entry.post_id, Entry.author_id],
+            select(ranked.c.user_id, ranked.c.created_at, ranked.c.post_id, ranked.c.author_id)
+            .where(ranked.c.position <= TIMELINE_MAX_LENGTH)
+        )
+    )
+    return result.rowcount
+
+# --- Poda das timelines (fora do caminho de leitura) ---
+
+def _trim(db: Session, user_id: int):
+    cutoff = db.execute(
+        select(Entry.created_at, Entry.post_id)
+        .where(Entry.user_id == user_id)
+        .order_by(desc(Entry.created_at), desc(Entry.post_id))
+        .offset(TIMELINE_MAX_LENGTH)
+        .limit(1)
+    ).first()
+    if cutoff is None:
+        return
+    db.execute(
+        delete(Entry).where(
+            Entry.user_id == user_id,
+            tuple_(Entry.created_at, Entry.post_id) <= tuple_(*cutoff)
+        )
+    )
+
+def trim_overflowing(db: Session) -> int:
+    # A PK começa por user_id: a contagem por leitor percorre só o índice
+    user_ids = db.scalars(
+        select(Entry.user_id).group_by(Entry.user_id).having(func.count() > TIMELINE_MAX_LENGTH)
+    ).all()
+    # Uma transação curta por timeline
+    for user_id in user_ids:
+        _trim(db, user_id)
+        db.commit()
+    return len(user_ids)
+
+class Trimmer:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = None
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            if self._stopping:
+                return
+            try:
+                with database.SessionLocal() as db:
+                    trim_overflowing(db)
+            except Exception:
+                logger.exception("Falha ao podar timelines; nova tentativa no próximo ciclo")
+
+    def start(self):
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="timeline-trim", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stopping = True
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+            self._wake.clear()
+
+trimmer = Trimmer(TIMELINE_TRIM_INTERVAL)
+
+# --- Leitura ---
+
+def _precomputed(db: Session, user_id: int, position, limit: int) -> List[Tuple]:
+    still_following = exists().where(
+        follows.c.follower_id == user_id, follows.c.followed_id == Entry.author_id
+    )
+    stmt = select(Entry.created_at, Entry.post_id).where(
+        Entry.user_id == user_id,
+        or_(Entry.author_id == user_id, still_following)
+    )
+    if position:
+        stmt = stmt.where(tuple_(Entry.created_at, Entry.post_id) < position)
+    return db.execute(
+        stmt.order_by(desc(Entry.created_at), desc(Entry.post_id)).limit(limit)
+    ).all()
+
+def _merged_on_read(db: Session, user_id: int, position, limit: int) -> List[Tuple]:
+    large_accounts = (
+        select(follows.c.followed_id)
+        .join(models.User, models.User.id == follows.c.followed_id)
+        .where(follows.c.follower_id == user_id, models.User.followers_count > FANOUT_MAX_FOLLOWERS)
+    )
+    stmt = select(models.Post.created_at, models.Post.id).where(models.Post.owner_id.in_(large_accounts))
+    if position:
+        stmt = stmt.where(tuple_(models.Post.created_at, models.Post.id) < position)
+    return db.execute(
+        stmt.order_by(desc(models.Post.created_at), desc(models.Post.id)).limit(limit)
+    ).all()
+
+def load_page(db: Session, user_id: int, cursor: Optional[str], limit: int):
+    position = pagination.decode_cursor(cursor) if cursor else None
+
+    # Um post pode vir das duas fontes se o autor cruzou o limite de seguidores
+    rows = {}
+    for created_at, post_id in _precomputed(db, user_id, position, limit) + _merged_on_read(db, user_id, position, limit):
+        rows[post_id] = (created_at, post_id)
+    page = sorted(rows.values(), reverse=True)[:limit]
+
+    next_cursor = None
+    if len(page) == limit:
+        next_cursor = pagination.encode_cursor(*page[-1])
+
+    return [post_id for _, post_id in page], next_cursor
@@ -0,0 +1,150 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+from typing import Dict, List, Optional
+import heapq
+import os
+import threading
+import time
+
+import models
+
+load_dotenv()
+
+# --- Motor de Trending ---
+# Mantém em memória os posts mais recentes (candidatos) com seus contadores e
+# ordena por um score com decaimento no tempo, no estilo do Hacker News:
+#   (agree + REPLY_WEIGHT * respostas) / (horas_de_idade + 2) ^ GRAVITY
+# Os candidatos são recarregados do banco no máximo a cada REFRESH_SECONDS
+# (consulta limitada, usando o índice de created_at) e atualizados entre uma
+# recarga e outra por vote_post, create_reply_for_post e delete_reply.
+# Um post fora da janela que volta a ter atividade entra com a contagem real
+# de respostas (um COUNT pelo índice de post_id), não com zero. Apagar uma
+# resposta também reconta: o CASCADE leva junto as respostas filhas.
+
+TOP_N = int(os.environ.get("TRENDING_TOP_N", 5))
+CANDIDATES = int(os.environ.get("TRENDING_CANDIDATES", 500))
+REFRESH_SECONDS = float(os.environ.get("TRENDING_REFRESH_SECONDS", 60))
+GRAVITY = float(os.environ.get("TRENDING_GRAVITY", 1.5))
+REPLY_WEIGHT = 2.0
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite devolve datas sem fuso; o Postgres devolve com fuso
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _reply_count(db: Session, post_id: int) -> int:
+    return db.query(func.count(models.Reply.id)).filter(models.Reply.post_id == post_id).scalar()
+
+
+class TrendingCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # post_id -> [created_at, agree_count, reply_count]
+        self._candidates: Dict[int, list] = {}
+        # None = nunca carregado (monotonic() pode ser menor que REFRESH_SECONDS
+        # logo depois do boot da máquina)
+        self._loaded_at: Optional[float] = None
+
+    def score(self, created_at: datetime, agree_count: int, reply_count: int, now: datetime) -> float:
+        age_hours = max((now - created_at).total_seconds(), 0) / 3600
+        return (agree_count + REPLY_WEIGHT * reply_count) / (age_hours + 2) ** GRAVITY
+
+    def _claim_refresh(self) -> bool:
+        # Só uma thread por worker recarrega quando o cache expira
+        with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at <= REFRESH_SECONDS:
+                return False
+            self._loaded_at = time.monotonic()
+            return True
+
+    def refresh(self, db: Session):
+        recent = db.query(models.Post.id, models.Post.created_at, models.Post.agree_count)\
+            .order_by(models.Post.created_at.desc(), models.Post.id.desc())\
+            .limit(CANDIDATES).all()
+
+        reply_counts = {}
+        if recent:
+            reply_counts = dict(
+                db.query(models.Reply.post_id, func.count(models.Reply.id))
+                .filter(models.Reply.post_id.in_([row.id for row in recent]))
+                .group_by(models.Reply.post_id).all()
+            )
+
+        candidates = {
+            row.id: [_as_utc(row.created_at), row.agree_count, reply_counts.get(row.id, 0)]
+            for row in recent
+        }
+        with self._lock:
+            self._candidates = candidates
+            self._loaded_at = time.monotonic()
+
+    def _track(self, db: Session, post) -> Optional[list]:
+        # Devolve a entrada já existente; None = acabou de entrar, com a
+        # contagem lida do banco (que já inclui a atividade recém-gravada)
+        with self._lock:
+            entry = self._candidates.get(post.id)
+        if entry is not None:
+            return entry
+        # Post fora da janela de candidatos voltou a receber atividade
+        reply_count = _reply_count(db, post.id)
+        with self._lock:
+            if post.id not in self._candidates:
+                self._candidates[post.id] = [_as_utc(post.created_at), post.agree_count, reply_count]
+                return None
+            return self._candidates[post.id]
+
+    # --- Atualizações incrementais ---
+
+    def record_vote(self, db: Session, post):
+        # Aceita o Post ou a linha devolvida pelo UPDATE ... RETURNING de votes.py
+        entry = self._track(db, post)
+        if entry is not None:
+            with self._lock:
+                entry[1] = post.agree_count
+
+    def record_reply(self, db: Session, post: models.Post, added: int = 1):
+        entry = self._track(db, post)
+        if entry is not None:
+            with self._lock:
+                entry[2] += added
+
+    def record_reply_deleted(self, db: Session, post_id: int):
+        with self._lock:
+            if post_id not in self._candidates:
+                return
+        reply_count = _reply_count(db, post_id)
+        with self._lock:
+            entry = self._candidates.get(post_id)
+            if entry is not None:
+                entry[2] = reply_count
+
+    def forget(self, post_id: int):
+        with self._lock:
+            self._candidates.pop(post_id, None)
+
+    # --- Leitura ---
+
+    def top_ids(self, db: Session, limit: int = TOP_N) -> List[int]:
+        if self._claim_refresh():
+            try:
+                self.refresh(db)
+            except Exception:
+                self._loaded_at = None
+                raise
+
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            ranked = heapq.nlargest(
+                limit,
+                self._candidates.items(),
+                key=lambda item: (self.score(item[1][0], item[1][1], item[1][2], now), item[0])
+            )
+        return [post_id for post_id, _ in ranked]
+
+
+cache = TrendingCache()
@@ -0,0 +1,80 @@
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from typing import Dict, Iterable, List
+from urllib.parse import urlencode
+from urllib.request import urlopen
+import json
+import logging
+import os
+
+import models, schemas, cache, database
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# --- Autores de posts e respostas ---
+# As consultas do feed não fazem mais JOIN com 'users': depois de carregar a
+# página, os owner_id distintos são resolvidos de uma vez por este módulo.
+# Primeiro o cache local (LRU com TTL, limitado em tamanho); o que faltar vem
+# em lote do user_service (GET /users/summaries, se USER_SERVICE_URL estiver
+# definido) ou, sem ele, de um único SELECT ... WHERE id IN (...).
+# O resumo é gravado no atributo 'author' do post/resposta, que os schemas
+# leem antes da relação 'owner'. A chamada HTTP passa por
+# database.run_blocking: com DB_ASYNC=1 ela não ocupa o event loop.
+
+USER_SERVICE_URL = os.environ.get("USER_SERVICE_URL")
+USER_SERVICE_TIMEOUT = float(os.environ.get("USER_SERVICE_TIMEOUT", 2))
+USER_CACHE_SIZE = int(os.environ.get("USER_CACHE_SIZE", 10000))
+USER_CACHE_TTL = float(os.environ.get("USER_CACHE_TTL", 300))
+BATCH_SIZE = 200
+
+summary_cache = cache.TTLCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+
+def _fetch_from_service(user_ids: List[int]) -> List[dict]:
+    found = []
+    for start in range(0, len(user_ids), BATCH_SIZE):
+        query = urlencode([("ids", user_id) for user_id in user_ids[start:start + BATCH_SIZE]])
+        with urlopen(f"{USER_SERVICE_URL}/users/summaries?{query}", timeout=USER_SERVICE_TIMEOUT) as response:
+            found.extend(json.load(response))
+    return found
+
+def _fetch_from_db(db: Session, user_ids: List[int]) -> List[dict]:
+    rows = db.query(models.User.id, models.User.name, models.User.email, models.User.college)\
+        .filter(models.User.id.in_(user_ids)).all()
+    return [row._asdict() for row in rows]
+
+def get_summaries(db: Session, user_ids: Iterable[int]) -> Dict[int, schemas.UserResponse]:
+    summaries = {}
+    missing = []
+    for user_id in set(user_ids):
+        summary = summary_cache.get(user_id)
+        if summary is None:
+            missing.append(user_id)
+        else:
+            summaries[user_id] = summary
+
+    if missing:
+        rows = None
+        if USER_SERVICE_URL:
+            try:
+                rows = database.run_blocking(_fetch_from_service, missing)
+            except (OSError, ValueError):
+                logger.warning("user_service indisponível; buscando autores direto no banco")
+        if rows is None:
+            rows = _fetch_from_db(db, missing)
+
+        for row in rows:
+            summary = schemas.UserResponse.model_validate(row)
+            summary_cache.set(summary.id, summary)
+            summaries[summary.id] = summary
+
+    return summaries
+
+def attach_owners(db: Session, items: list) -> list:
+    summaries = get_summaries(db, (item.owner_id for item in items))
+    for item in items:
+        # Sem resumo (usuário removido), o schema cai de volta na relação 'owner'
+        if item.owner_id in summaries:
+            item.author = summaries[item.owner_id]
+    return items
@@ -0,0 +1,147 @@
+from sqlalchemy import update, bindparam, event
+from sqlalchemy.orm.attributes import set_committed_value
+from dotenv import load_dotenv
+from typing import Dict, List
+import logging
+import os
+import threading
+
+import models, database
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# --- Buffer de contadores de voto (write-behind) ---
+# Modo opcional (VOTE_BUFFER_ENABLED=1) para posts virais: o voto de cada
+# usuário continua sendo gravado na hora na tabela 'votes', mas a diferença
+# nos contadores de 'posts' fica acumulada em memória por post e é gravada
+# em lote a cada VOTE_FLUSH_INTERVAL segundos ou quando VOTE_FLUSH_THRESHOLD
+# posts tiverem diferenças pendentes. Assim mil votos no mesmo post viram um
+# único UPDATE, em vez de mil disputas pelo lock da mesma linha: no caminho
+# com buffer o voto só trava o par (usuário, post) (ver votes.py), nunca a
+# linha do post.
+# O ganho depende de o banco ter locks por linha (Postgres). No SQLite toda
+# escrita já espera o lock do arquivo, e no hot_votes de baselines.json o
+# buffer reduz o p95 dos votos mas baixa o total de req/s e piora o p95 de
+# feed/trending (os flushes disputam o mesmo lock); lá, deixe desligado.
+# Toda instância de Post carregada pelo ORM já vem com as diferenças
+# pendentes somadas (evento 'load' abaixo).
+
+ENABLED = os.environ.get("VOTE_BUFFER_ENABLED", "0") == "1"
+FLUSH_INTERVAL = float(os.environ.get("VOTE_FLUSH_INTERVAL", 1.0))
+FLUSH_THRESHOLD = int(os.environ.get("VOTE_FLUSH_THRESHOLD", 500))
+
+
+class VoteBuffer:
+    def __init__(self, enabled: bool, flush_interval: float, flush_threshold: int):
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        # post_id -> [agree_delta, disagree_delta]
+        self._pending: Dict[int, List[int]] = {}
+        self._inflight: Dict[int, List[int]] = {}
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = None
+
+    def add(self, post_id: int, agree_delta: int, disagree_delta: int):
+        if not agree_delta and not disagree_delta:
+            return
+        with self._lock:
+            entry = self._pending.setdefault(post_id, [0, 0])
+            entry[0] += agree_delta
+            entry[1] += disagree_delta
+            full = len(self._pending) >= self.flush_threshold
+        if full:
+            self._wake.set()
+
+    def pending(self, post_id: int):
+        with self._lock:
+            agree, disagree = self._pending.get(post_id, (0, 0))
+            inflight_agree, inflight_disagree = self._inflight.get(post_id, (0, 0))
+        return agree + inflight_agree, disagree + inflight_disagree
+
+    def counts(self, post_id: int, agree_count: int, disagree_count: int):
+        # Contadores lidos do banco (colunas) somados ao que ainda está no buffer
+        if not self.enabled:
+            return agree_count, disagree_count
+        agree, disagree = self.pending(post_id)
+        return agree_count + agree, disagree_count + disagree
+
+    def merge(self, post: models.Post):
+        agree, disagree = self.pending(post.id)
+        if agree or disagree:
+            # Sem marcar o objeto como alterado na sessão
+            set_committed_value(post, "agree_count", post.agree_count + agree)
+            set_committed_value(post, "disagree_count", post.disagree_count + disagree)
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                self._inflight, self._pending = self._pending, {}
+                batch = [
+                    {"post_id": post_id, "agree_delta": agree, "disagree_delta": disagree}
+                    for post_id, (agree, disagree) in self._inflight.items()
+                ]
+
+            stmt = update(models.Post).where(models.Post.id == bindparam("post_id")).values(
+                agree_count=models.Post.agree_count + bindparam("agree_delta"),
+                disagree_count=models.Post.disagree_count + bindparam("disagree_delta")
+            )
+            try:
+                # executemany: um único UPDATE preparado para o lote inteiro
+                with database.engine.begin() as conn:
+                    conn.execute(stmt, batch)
+            except Exception:
+                logger.exception("Falha ao gravar contadores de voto; mantendo no buffer")
+                with self._lock:
+                    for post_id, (agree, disagree) in self._inflight.items():
+                        entry = self._pending.setdefault(post_id, [0, 0])
+                        entry[0] += agree
+                        entry[1] += disagree
+                    self._inflight = {}
+                return 0
+
+            with self._lock:
+                self._inflight = {}
+            return len(batch)
+
+    def _run(self):
+        while not self._stopping:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def start(self):
+        if not self.enabled or self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="vote-buffer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stopping = True
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+        # Desligamento limpo: nada pendente fica para trás
+        self.flush()
+
+
+buffer = VoteBuffer(ENABLED, FLUSH_INTERVAL, FLUSH_THRESHOLD)
+
+@event.listens_for(models.Post, "load")
+def _merge_pending_on_load(post, context):
+    if buffer.enabled:
+        buffer.merge(post)
+
+@event.listens_for(models.Post, "refresh")
+def _merge_pending_on_refresh(post, context, attrs):
+    if buffer.enabled and (attrs is None or "agree_count" in attrs or "disagree_count" in attrs):
+        buffer.merge(post)
@@ -0,0 +1,126 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import delete, exc, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from typing import NamedTuple
+from datetime import datetime
+
+import models, vote_buffer
+
+# --- Voto atômico ---
+# Tudo acontece em SQL dentro de uma única transação, sem ler o post nem
+# o voto para a memória:
+#   1. pg_advisory_xact_lock(user_id, post_id) serializa os votos do mesmo
+#      usuário no mesmo post (e só eles)
+#   2. DELETE ... RETURNING devolve o voto anterior (se existir)
+#   3. UPDATE posts ... RETURNING aplica a diferença nos contadores
+#      (agree_count = agree_count + 1), sem perder votos concorrentes
+#   4. INSERT ... ON CONFLICT grava o novo voto
+# A trava do passo 1 é o que torna a diferença exata: DELETE de um voto que
+# ainda não existe não trava nada, então dois votos simultâneos do mesmo
+# usuário veriam "sem voto anterior" e somariam +1 duas vezes. Travar o par
+# (usuário, post), e não a linha do post, deixa votos de usuários diferentes
+# correrem em paralelo até o UPDATE. A trava é liberada no commit/rollback.
+# (No SQLite não há advisory lock, mas as escritas no arquivo já são
+# serializadas.) Os contadores finais voltam no próprio UPDATE, sem
+# recarregar o post.
+# Com o buffer ativo (vote_buffer.py) o passo 3 some e nenhuma linha de
+# 'posts' é travada: um SELECT simples traz os contadores e a diferença vai
+# para o buffer em memória.
+
+VOTE_VALUES = {"agree": 1, "disagree": -1, "none": 0}
+
+def _insert(db: Session):
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(models.Vote)
+    return sqlite.insert(models.Vote)
+
+def counter_deltas(old_vote: int, new_vote: int):
+    agree_delta = (new_vote == 1) - (old_vote == 1)
+    disagree_delta = (new_vote == -1) - (old_vote == -1)
+    return agree_delta, disagree_delta
+
+class VoteCounts(NamedTuple):
+    id: int
+    created_at: datetime
+    agree_count: int
+    disagree_count: int
+
+def _lock_vote(db: Session, post_id: int, user_id: int):
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(select(func.pg_advisory_xact_lock(user_id, post_id)))
+
+def _read_counts(db: Session, post_id: int):
+    return db.execute(
+        select(models.Post.id, models.Post.created_at, models.Post.agree_count, models.Post.disagree_count)
+        .where(models.Post.id == post_id)
+    ).first()
+
+def _delete_vote(db: Session, post_id: int, user_id: int) -> int:
+    return db.execute(
+        delete(models.Vote)
+        .where(models.Vote.user_id == user_id, models.Vote.post_id == post_id)
+        .returning(models.Vote.vote_type)
+    ).scalar() or 0
+
+def _insert_vote(db: Session, post_id: int, user_id: int, new_vote: int):
+    if new_vote == 0:
+        return
+    stmt = _insert(db).values(user_id=user_id, post_id=post_id, vote_type=new_vote)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[models.Vote.user_id, models.Vote.post_id],
+        set_={"vote_type": stmt.excluded.vote_type}
+    ))
+
+def _apply_buffered(db: Session, post_id: int, user_id: int, new_vote: int):
+    _lock_vote(db, post_id, user_id)
+    post = _read_counts(db, post_id)
+    if post is None:
+        db.rollback()
+        return None
+
+    old_vote = _delete_vote(db, post_id, user_id)
+    try:
+        _insert_vote(db, post_id, user_id, new_vote)
+        db.commit()
+    except exc.IntegrityError:
+        # Post apagado depois do SELECT: a FK de 'votes' recusa o voto
+        db.rollback()
+        return None
+
+    vote_buffer.buffer.add(post_id, *counter_deltas(old_vote, new_vote))
+    agree, disagree = vote_buffer.buffer.pending(post_id)
+    return VoteCounts(post.id, post.created_at, post.agree_count + agree, post.disagree_count + disagree)
+
+def apply_vote(db: Session, post_id: int, user_id: int, vote_type: str):
+    new_vote = VOTE_VALUES[vote_type]
+    if vote_buffer.buffer.enabled:
+        return _apply_buffered(db, post_id, user_id, new_vote)
+
+    _lock_vote(db, post_id, user_id)
+    old_vote = _delete_vote(db, post_id, user_id)
+    agree_delta, disagree_delta = counter_deltas(old_vote, new_vote)
+
+    counts = db.execute(
+        update(models.Post)
+        .where(models.Post.id == post_id)
+        .values(
+            agree_count=models.Post.agree_count + agree_delta,
+            disagree_count=models.Post.disagree_count + disagree_delta
+        )
+        .returning(
+            models.Post.id,
+            models.Post.created_at,
+            models.Post.agree_count,
+            models.Post.disagree_count
+        )
+        .execution_options(synchronize_session=False)
+    ).first()
+
+    # Post inexistente: o endpoint responde 404
+    if counts is None:
+        db.rollback()
+        return None
+
+    _insert_vote(db, post_id, user_id, new_vote)
+    db.commit()
+    return counts
@@ -1,12 +1,15 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.session import make_transient_to_detached
 from jose import JWTError, jwt
 from dotenv import load_dotenv
 import os
+import time
 import models
 import schemas
 import database
+import cache
 
 load_dotenv() 
 
@@ -19,6 +22,36 @@ if SECRET_KEY is None:
 # Aponta para o endpoint /token DESTE serviço (porta 8000)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token") 
 
+# --- Cache de autenticação ---
+# token -> email (até o 'exp' do token): evita verificar a assinatura do JWT
+# email -> cópia desanexada do usuário: evita o SELECT em 'users'. A cópia é
+# colocada na sessão da requisição com db.merge(load=False), sem ir ao banco.
+# O cache é por processo. invalidate_user (PUT /users/me, seguir) só limpa o
+# worker que atendeu a requisição; os demais workers, e os do outro serviço,
+# podem servir nome/username/contadores antigos por até AUTH_PRINCIPAL_TTL
+# segundos. Por isso esse prazo é curto: ainda poupa o SELECT numa rajada de
+# requisições do mesmo usuário. O token -> email não envelhece (o JWT é
+# imutável) e fica AUTH_CACHE_TTL.
+AUTH_CACHE_SIZE = int(os.environ.get("AUTH_CACHE_SIZE", 1024))
+AUTH_CACHE_TTL = float(os.environ.get("AUTH_CACHE_TTL", 60))
+AUTH_PRINCIPAL_TTL = float(os.environ.get("AUTH_PRINCIPAL_TTL", 5))
+
+token_cache = cache.TTLCache(AUTH_CACHE_SIZE, AUTH_CACHE_TTL)
+principal_cache = cache.TTLCache(AUTH_CACHE_SIZE, AUTH_PRINCIPAL_TTL)
+
+def _snapshot(user: models.User) -> models.User:
+    columns = {column.key: getattr(user, column.key) for column in models.User.__mapper__.column_attrs}
+    snapshot = models.User(**columns)
+    make_transient_to_detached(snapshot)
+    return snapshot
+
+def invalidate_user(email: str):
+    principal_cache.delete(email)
+
+def cache_stats() -> dict:
+    return {"tokens": token_cache.stats(), "principals": principal_cache.stats()}
+
+@database.endpoint
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -26,18 +59,31 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
+    email = token_cache.get(token)
+    if email is None:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            email: str = payload.get("sub")
+            if email is None:
+                raise credentials_exception
+
+        except JWTError:
             raise credentials_exception
-            
-    except JWTError:
-        raise credentials_exception
-    
+
+        # Nunca guarda o token além da própria expiração
+        ttl = AUTH_CACHE_TTL
+        if payload.get("exp") is not None:
+            ttl = min(ttl, payload["exp"] - time.time())
+        token_cache.set(token, email, ttl=ttl)
+
+    cached_user = principal_cache.get(email)
+    if cached_user is not None:
+        return db.merge(cached_user, load=False)
+
     user = db.query(models.User).filter(models.User.email == email).first()
     
     if user is None:
         raise credentials_exception
-        
-    return user
\ No newline at end of file
+
+    principal_cache.set(email, _snapshot(user))
+    return user
@@ -0,0 +1,100 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from dotenv import load_dotenv
+from typing import Optional
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:  # opcional: sem o pacote 'brotli', só gzip
+    brotli = None
+
+load_dotenv()
+
+# --- Compressão das respostas (gzip / brotli) ---
+# Escolhe a codificação pelo Accept-Encoding do cliente (brotli, se o pacote
+# estiver instalado, senão gzip) e só comprime corpos com pelo menos
+# COMPRESSION_MIN_SIZE bytes: abaixo disso o cabeçalho e a CPU não compensam.
+# Respostas em streaming (mais de uma mensagem de corpo, ex. NDJSON/SSE) e
+# já codificadas passam direto.
+
+COMPRESSION_ENABLED = os.environ.get("COMPRESSION_ENABLED", "1") == "1"
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", 1024))
+GZIP_LEVEL = int(os.environ.get("GZIP_LEVEL", 5))
+BROTLI_QUALITY = int(os.environ.get("BROTLI_QUALITY", 4))
+
+def _acceptable(params: str) -> bool:
+    quality = params.strip()
+    if not quality.startswith("q="):
+        return True
+    # "gzip;q=0" = explicitamente recusado; q malformado ("q=abc") também
+    try:
+        return float(quality[2:] or 0) > 0
+    except ValueError:
+        return False
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    accepted = set()
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        if _acceptable(params):
+            accepted.add(coding.strip().lower())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+def compress(body: bytes, encoding: str, gzip_level: int = GZIP_LEVEL, brotli_quality: int = BROTLI_QUALITY) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+
+        async def send_compressed(message: Message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                # Segura o início até ver o corpo (tamanho e se é streaming)
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+            ):
+                await send(start)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
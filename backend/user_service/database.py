@@ -1,17 +1,104 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, exc, inspect as inspect_schema
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.util.concurrency import await_only, in_greenlet
 from sqlalchemy.orm import sessionmaker
+from fastapi import Depends
 from dotenv import load_dotenv
+import asyncio
+import functools
+import inspect
 import os
+import threading
+import time
 
 load_dotenv()
 
-DATABASE_URL = os.environ.get("DATABASE_URL") 
+DATABASE_URL = os.environ.get("DATABASE_URL")
 
 if DATABASE_URL is None:
     raise ValueError("Variável de ambiente DATABASE_URL não encontrada. Crie o .env")
 
-engine = create_engine(DATABASE_URL)
+# --- Pool de conexões ---
+# Tamanho, overflow, timeout, recycle e pre-ping vêm do ambiente, para dimensionar
+# o pool por worker. As classes abaixo só acrescentam métricas ao QueuePool
+# padrão: quanto tempo cada checkout esperou por uma conexão livre e quantos
+# estouraram o timeout. Os números ficam em GET /pool/stats.
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, waited: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(1000 * self.wait_total / self.checkouts, 3) if self.checkouts else 0.0,
+                "wait_max_ms": round(1000 * self.wait_max, 3),
+            }
+
+class _TimedCheckout:
+    stats: PoolStats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record(time.perf_counter() - start)
+        return conn
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    stats = PoolStats()
+
+class InstrumentedAsyncPool(_TimedCheckout, AsyncAdaptedQueuePool):
+    stats = PoolStats()
+
+def pool_options(url, poolclass) -> dict:
+    parsed = make_url(url)
+    # SQLite em memória usa um pool próprio, sem fila
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", 5)),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", 10)),
+        "pool_timeout": float(os.environ.get("DB_POOL_TIMEOUT", 30)),
+        "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", -1)),
+        "pool_pre_ping": os.environ.get("DB_POOL_PRE_PING", "1") == "1",
+    }
+
+def _describe(pool) -> dict:
+    if not isinstance(pool, _TimedCheckout):
+        return {"class": type(pool).__name__}
+    return {
+        "class": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        **pool.stats.snapshot(),
+    }
+
+engine = create_engine(DATABASE_URL, **pool_options(DATABASE_URL, InstrumentedQueuePool))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -20,4 +107,125 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# --- Modo assíncrono (DB_ASYNC=1) ---
+# Usa AsyncEngine/AsyncSession (asyncpg no Postgres, aiosqlite no SQLite).
+# Os endpoints marcados com @database.endpoint viram 'async def' e o corpo
+# síncrono roda via AsyncSession.run_sync: as consultas aguardam o driver
+# assíncrono no event loop em vez de ocupar uma thread do threadpool.
+
+ASYNC_MODE = os.environ.get("DB_ASYNC", "0") == "1"
+
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+def async_url(url: str):
+    parsed = make_url(url)
+    return parsed.set(drivername=_ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername))
+
+async_engine = None
+AsyncSessionLocal = None
+
+if ASYNC_MODE:
+    _async_database_url = os.environ.get("ASYNC_DATABASE_URL") or async_url(DATABASE_URL)
+    async_engine = create_async_engine(
+        _async_database_url, **pool_options(_async_database_url, InstrumentedAsyncPool)
+    )
+    # expire_on_commit=False: a resposta é serializada fora do run_sync e
+    # não pode disparar um refresh implícito
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def endpoint(fn):
+    if not ASYNC_MODE:
+        return fn
+
+    signature = inspect.signature(fn)
+    parameters = [
+        param.replace(default=Depends(get_async_db)) if param.name == "db" else param
+        for param in signature.parameters.values()
+    ]
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        db = kwargs.pop("db")
+        return await db.run_sync(lambda session: fn(*args, db=session, **kwargs))
+
+    wrapper.__signature__ = signature.replace(parameters=parameters)
+    return wrapper
+
+# Chamada bloqueante (HTTP, arquivo) feita de dentro de um endpoint: no modo
+# assíncrono o corpo roda no event loop (run_sync), então ela vai para uma
+# thread e o greenlet aguarda o resultado sem travar as outras requisições.
+# No modo síncrono o endpoint já está numa thread do threadpool.
+def run_blocking(fn, *args):
+    if ASYNC_MODE and in_greenlet():
+        return await_only(asyncio.to_thread(fn, *args))
+    return fn(*args)
+
+def pool_status() -> dict:
+    status = {"sync": _describe(engine.pool)}
+    if async_engine is not None:
+        status["async"] = _describe(async_engine.pool)
+    return status
+
+# --- Inicialização do worker (ver lifecycle.py) ---
+# O schema é criado/atualizado pelo migrate.py de cada serviço, não mais ao
+# importar o main.py. Na subida o worker só confere se as tabelas e colunas
+# dos models existem (um banco antigo, sem users.followers_count por exemplo,
+# fica fora do /ready em vez de responder 500) e abre DB_POOL_WARM conexões
+# (padrão: DB_POOL_SIZE) de uma vez, para as primeiras requisições não pagarem
+# connect/handshake/autenticação.
+
+POOL_WARM = int(os.environ.get("DB_POOL_WARM", os.environ.get("DB_POOL_SIZE", 5)))
+
+def require_tables(tables):
+    inspector = inspect_schema(engine)
+    existing = set(inspector.get_table_names())
+    missing = [name for name in tables if name not in existing]
+    if missing:
+        raise RuntimeError(f"Tabelas ausentes: {', '.join(missing)}. Rode 'python migrate.py'.")
+    missing = []
+    for table in tables.values():
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        missing.extend(f"{table.name}.{column.name}" for column in table.columns if column.name not in columns)
+    if missing:
+        raise RuntimeError(f"Colunas ausentes: {', '.join(missing)}. Rode 'python migrate.py'.")
+
+def _warm_count(pool) -> int:
+    # Além de pool_size as conexões extras seriam descartadas na devolução
+    if isinstance(pool, QueuePool):
+        return min(POOL_WARM, pool.size())
+    return min(POOL_WARM, 1)
+
+def warm_up():
+    connections = []
+    try:
+        for _ in range(_warm_count(engine.pool)):
+            connection = engine.connect()
+            connections.append(connection)
+            connection.exec_driver_sql("SELECT 1")
+    finally:
+        for connection in connections:
+            connection.close()
+
+async def warm_up_async():
+    if async_engine is None:
+        return
+    connections = []
+    try:
+        for _ in range(_warm_count(async_engine.pool)):
+            connection = await async_engine.connect()
+            connections.append(connection)
+            await connection.exec_driver_sql("SELECT 1")
+    finally:
+        for connection in connections:
+            await connection.close()
@@ -0,0 +1,93 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import delete, update, select
+from typing import List, Optional
+from sqlalchemy.dialects import postgresql, sqlite
+
+import models
+
+# --- Seguir / deixar de seguir ---
+# A relação fica só na tabela 'follows'; users.followers_count e
+# users.following_count são ajustados na mesma transação, e só quando a
+# linha de 'follows' foi de fato inserida/removida (rowcount). Nenhuma lista
+# de seguidores é carregada, então o custo não depende do tamanho do perfil.
+
+def _insert(db: Session):
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(models.follows)
+    return sqlite.insert(models.follows)
+
+def _adjust_counts(db: Session, follower_id: int, followed_id: int, delta: int):
+    updates = {
+        follower_id: {"following_count": models.User.following_count + delta},
+        followed_id: {"followers_count": models.User.followers_count + delta},
+    }
+    # Sempre na ordem dos ids: dois usuários seguindo um ao outro ao mesmo
+    # tempo travam as linhas na mesma ordem e não entram em deadlock
+    for user_id in sorted(updates):
+        db.execute(
+            update(models.User)
+            .where(models.User.id == user_id)
+            .values(**updates[user_id])
+            .execution_options(synchronize_session=False)
+        )
+
+def follow(db: Session, follower_id: int, followed_id: int) -> bool:
+    inserted = db.execute(
+        _insert(db)
+        .values(follower_id=follower_id, followed_id=followed_id)
+        .on_conflict_do_nothing()
+    ).rowcount
+    if inserted:
+        _adjust_counts(db, follower_id, followed_id, 1)
+    db.commit()
+    return bool(inserted)
+
+def unfollow(db: Session, follower_id: int, followed_id: int) -> bool:
+    deleted = db.execute(
+        delete(models.follows).where(
+            models.follows.c.follower_id == follower_id,
+            models.follows.c.followed_id == followed_id
+        )
+    ).rowcount
+    if deleted:
+        _adjust_counts(db, follower_id, followed_id, -1)
+    db.commit()
+    return bool(deleted)
+
+# --- Listagens paginadas ---
+# Keyset sobre o id do outro usuário: "seguidores de X" percorre o índice
+# (followed_id, follower_id) e "quem X segue" a própria PK. O cursor é o id
+# do último usuário da página anterior. Só as colunas do resumo são lidas.
+SUMMARY_COLUMNS = (
+    models.User.id,
+    models.User.name,
+    models.User.username,
+    models.User.email,
+    models.User.college,
+    models.User.profile_picture,
+)
+
+def _page(db: Session, match_column, other_column, user_id: int, cursor: Optional[int], limit: int) -> List:
+    stmt = (
+        select(*SUMMARY_COLUMNS)
+        .select_from(models.follows)
+        .join(models.User, models.User.id == other_column)
+        .where(match_column == user_id)
+        .order_by(other_column)
+        .limit(limit)
+    )
+    if cursor is not None:
+        stmt = stmt.where(other_column > cursor)
+    return db.execute(stmt).all()
+
+def list_followers(db: Session, user_id: int, cursor: Optional[int], limit: int) -> List:
+    return _page(db, models.follows.c.followed_id, models.follows.c.follower_id, user_id, cursor, limit)
+
+def list_following(db: Session, user_id: int, cursor: Optional[int], limit: int) -> List:
+    return _page(db, models.follows.c.follower_id, models.follows.c.followed_id, user_id, cursor, limit)
+
+def next_cursor(rows: list, limit: int) -> Optional[str]:
+    # Página incompleta = fim da lista
+    if len(rows) < limit or not rows:
+        return None
+    return str(rows[-1].id)
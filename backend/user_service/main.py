@@ -1,14 +1,41 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 from sqlalchemy import or_
-from typing import List
-import models, schemas, security, database, auth
+from typing import List, Optional
+from contextlib import asynccontextmanager
+import models, schemas, security, database, auth, follows, etag, compression, metrics, lifecycle
 
-models.Base.metadata.create_all(bind=database.engine)
+# --- Inicialização (ver lifecycle.py) ---
+# As tabelas são criadas/atualizadas pelo migrate.py, antes do deploy. O worker
+# responde /health/live na hora e fica pronto depois destes passos.
+STARTUP_STEPS = [
+    ("schema", lambda: database.require_tables(models.Base.metadata.tables)),
+    ("pool", database.warm_up),
+    ("async_pool", database.warm_up_async),
+]
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    lifecycle.state.start(STARTUP_STEPS)
+    yield
+    await lifecycle.state.stop()
+    security.shutdown_pool()
+    if database.async_engine is not None:
+        await database.async_engine.dispose()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+
+# Fila de hash cheia (ver security.py): pede para o cliente tentar de novo
+@app.exception_handler(security.HashingBusy)
+def hashing_busy_handler(request: Request, exc: security.HashingBusy):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Servidor ocupado, tente novamente em instantes."},
+        headers={"Retry-After": "1"},
+    )
 
 origins = [
     "http://localhost:8080", 
@@ -25,8 +52,48 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# --- Compressão gzip/brotli das respostas grandes (ver compression.py) ---
+app.add_middleware(compression.CompressionMiddleware)
+
+# --- Métricas por rota e SQL por requisição (ver metrics.py) ---
+# Adicionado por último = mais externo: mede também a compressão
+app.add_middleware(metrics.MetricsMiddleware)
+
+# --- Saúde do worker ---
+# live: o processo responde (não toca o banco). ready: inicialização concluída
+# e o worker não está encerrando; enquanto isso, 503 com o passo atual.
+# São 'async def' para responder mesmo com o threadpool ocupado.
+@app.get("/health/live")
+async def health_live():
+    return {"status": "ok"}
+
+@app.get("/health/ready")
+async def health_ready(response: Response):
+    if not lifecycle.state.ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return lifecycle.state.status()
+
+# --- Estatísticas do pool de conexões (por worker) ---
+@app.get("/pool/stats")
+def get_pool_stats():
+    return database.pool_status()
+
+# --- Acertos/erros do cache de autenticação (por worker) ---
+@app.get("/auth/cache/stats")
+def get_auth_cache_stats():
+    return auth.cache_stats()
+
+# --- Métricas no formato do Prometheus (por worker) ---
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+# Cadastro e login continuam síncronos mesmo com DB_ASYNC=1: eles esperam o
+# hash argon2 (pool de processos em security.py) e não devem bloquear o event loop.
+
 # --- Cadastro Atualizado ---
 @app.post("/register/", response_model=schemas.UserResponse)
 def register_user(user: schemas.UserCreate, db: Session = Depends(database.get_db)):
@@ -75,13 +142,16 @@ def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db:
 
 # --- Perfil (Atualizado com contagens) ---
 @app.get("/users/me", response_model=schemas.UserResponse)
-def read_users_me(current_user: models.User = Depends(auth.get_current_user)):
-    # Adiciona contagens dinâmicas
-    current_user.followers_count = len(current_user.followers)
-    current_user.following_count = len(current_user.following)
+@database.endpoint
+def read_users_me(
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(auth.get_current_user)
+):
+    # followers_count/following_count já vêm das colunas (ver follows.py)
     return current_user
 
 @app.put("/users/me", response_model=schemas.UserResponse)
+@database.endpoint
 def update_user_me(
     user_update: schemas.UserUpdate,
     db: Session = Depends(database.get_db),
@@ -99,14 +169,26 @@ def update_user_me(
     db.add(current_user)
     db.commit()
     db.refresh(current_user)
-    
-    current_user.followers_count = len(current_user.followers)
-    current_user.following_count = len(current_user.following)
+    auth.invalidate_user(current_user.email)
     return current_user
 
+# --- Resumos de usuários em lote ---
+# Usado pelo post_service para preencher os autores de uma página inteira com
+# uma única consulta. IDs inexistentes são ignorados.
+MAX_SUMMARY_IDS = 200
+
+@app.get("/users/summaries", response_model=List[schemas.UserSummary])
+@database.endpoint
+def get_user_summaries(ids: List[int] = Query(...), db: Session = Depends(database.get_db)):
+    if len(ids) > MAX_SUMMARY_IDS:
+        raise HTTPException(status_code=400, detail=f"Máximo de {MAX_SUMMARY_IDS} usuários por consulta.")
+
+    return db.query(models.User).filter(models.User.id.in_(set(ids))).all()
+
 # --- NOVOS ENDPOINTS: Seguir/Deixar de Seguir ---
 
 @app.post("/users/{user_id}/follow", status_code=status.HTTP_204_NO_CONTENT)
+@database.endpoint
 def follow_user(
     user_id: int,
     db: Session = Depends(database.get_db),
@@ -120,14 +202,14 @@ def follow_user(
         raise HTTPException(status_code=404, detail="Usuário não encontrado.")
     
     # Se já segue, não faz nada
-    if target_user in current_user.following:
-        return 
-
-    current_user.following.append(target_user)
-    db.commit()
+    if follows.follow(db, current_user.id, target_user.id):
+        # Os contadores mudaram: o usuário em cache ficou desatualizado
+        auth.invalidate_user(current_user.email)
+        auth.invalidate_user(target_user.email)
     return 
 
 @app.delete("/users/{user_id}/follow", status_code=status.HTTP_204_NO_CONTENT)
+@database.endpoint
 def unfollow_user(
     user_id: int,
     db: Session = Depends(database.get_db),
@@ -137,28 +219,63 @@ def unfollow_user(
     if not target_user:
         raise HTTPException(status_code=404, detail="Usuário não encontrado.")
 
-    if target_user in current_user.following:
-        current_user.following.remove(target_user)
-        db.commit()
+    if follows.unfollow(db, current_user.id, target_user.id):
+        auth.invalidate_user(current_user.email)
+        auth.invalidate_user(target_user.email)
     
     return
 
 # --- Endpoints de Listagem de Seguidores/Seguindo ---
+# Paginados por cursor (ver follows.py). O próximo cursor volta no header
+# X-Next-Cursor; sem o header, a lista acabou. A página já é só de colunas
+# do resumo, então o ETag sai das próprias linhas e o 304 pula a serialização.
 
-@app.get("/users/{user_id}/followers", response_model=List[schemas.UserResponse])
-def get_user_followers(user_id: int, db: Session = Depends(database.get_db)):
-
-    user = db.query(models.User).filter(models.User.id == user_id).first()
-    if not user:
+def _ensure_user_exists(db: Session, user_id: int):
+    if db.query(models.User.id).filter(models.User.id == user_id).first() is None:
         raise HTTPException(status_code=404, detail="Usuário não encontrado.")
-    
-    return user.followers
 
-@app.get("/users/{user_id}/following", response_model=List[schemas.UserResponse])
-def get_user_following(user_id: int, db: Session = Depends(database.get_db)):
+@app.get("/users/{user_id}/followers", response_model=List[schemas.UserSummary])
+@database.endpoint
+def get_user_followers(
+    user_id: int,
+    request: Request,
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[int] = None,
+    db: Session = Depends(database.get_db)
+):
+    _ensure_user_exists(db, user_id)
+
+    rows = follows.list_followers(db, user_id, cursor, limit)
+    cursor_out = follows.next_cursor(rows, limit)
+    if cursor_out:
+        response.headers["X-Next-Cursor"] = cursor_out
 
-    user = db.query(models.User).filter(models.User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="Usuário não encontrado.")
-    
-    return user.following
\ No newline at end of file
+    tag = etag.make_etag("followers", user_id, [tuple(row) for row in rows])
+    not_modified = etag.conditional(request, response, tag)
+    if not_modified:
+        return not_modified
+    return rows
+
+@app.get("/users/{user_id}/following", response_model=List[schemas.UserSummary])
+@database.endpoint
+def get_user_following(
+    user_id: int,
+    request: Request,
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[int] = None,
+    db: Session = Depends(database.get_db)
+):
+    _ensure_user_exists(db, user_id)
+
+    rows = follows.list_following(db, user_id, cursor, limit)
+    cursor_out = follows.next_cursor(rows, limit)
+    if cursor_out:
+        response.headers["X-Next-Cursor"] = cursor_out
+
+    tag = etag.make_etag("following", user_id, [tuple(row) for row in rows])
+    not_modified = etag.conditional(request, response, tag)
+    if not_modified:
+        return not_modified
+    return rows
@@ -0,0 +1,73 @@
+from sqlalchemy import func, inspect, select, text, update
+from sqlalchemy.schema import CreateColumn
+import argparse
+import logging
+
+import database, models
+
+logger = logging.getLogger(__name__)
+
+# --- Migração do schema do user_service ---
+# Roda uma vez por deploy, antes de subir os workers (o main.py não cria mais
+# tabelas ao ser importado):
+#     python migrate.py
+# Só faz mudanças aditivas e idempotentes: cria as tabelas e os índices que
+# faltam e acrescenta colunas novas dos models. Quando os contadores de
+# follows acabaram de ser criados, preenche-os a partir da tabela 'follows'
+# (--recount força o recálculo).
+# O user_service é dono de 'users' e 'follows': rode esta migração antes da
+# do post_service.
+
+def add_missing_columns(conn, table) -> list:
+    existing = {column["name"] for column in inspect(conn).get_columns(table.name)}
+    added = []
+    for column in table.columns:
+        if column.name in existing:
+            continue
+        ddl = CreateColumn(column).compile(dialect=conn.dialect)
+        conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+        added.append(column.name)
+    return added
+
+def create_missing_indexes(conn, table) -> list:
+    # checkfirst: só cria o que não existe; índices 'ddl_if' seguem o dialeto.
+    # create_all não cria índices em tabelas que já existem, então é aqui que
+    # bancos antigos ganham os índices novos dos models.
+    before = {index["name"] for index in inspect(conn).get_indexes(table.name)}
+    for index in table.indexes:
+        index.create(conn, checkfirst=True)
+    after = {index["name"] for index in inspect(conn).get_indexes(table.name)}
+    return sorted(after - before)
+
+def recount_follows(conn):
+    follows = models.follows
+    conn.execute(
+        update(models.User).values(
+            followers_count=select(func.count()).where(follows.c.followed_id == models.User.id).scalar_subquery(),
+            following_count=select(func.count()).where(follows.c.follower_id == models.User.id).scalar_subquery(),
+        )
+    )
+
+def migrate(engine, recount: bool = False):
+    # Uma transação só: no Postgres o DDL também volta atrás se algo falhar
+    with engine.begin() as conn:
+        models.Base.metadata.create_all(bind=conn)
+        added = {}
+        for table in models.Base.metadata.sorted_tables:
+            added[table.name] = add_missing_columns(conn, table)
+            for column in added[table.name]:
+                logger.info("Coluna criada: %s.%s", table.name, column)
+            for index in create_missing_indexes(conn, table):
+                logger.info("Índice criado: %s", index)
+
+        if recount or {"followers_count", "following_count"} & set(added["users"]):
+            recount_follows(conn)
+            logger.info("Contadores de follows recalculados")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cria/atualiza o schema do user_service")
+    parser.add_argument("--recount", action="store_true", help="recalcula followers_count/following_count")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    migrate(database.engine, args.recount)
+    logger.info("Schema do user_service atualizado")
@@ -1,5 +1,7 @@
-from sqlalchemy import Column, Integer, String, Boolean, Text, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, Boolean, Text, ForeignKey, Table, Index, func
+from sqlalchemy.sql.expression import text
 from sqlalchemy.orm import relationship
+from sqlalchemy.dialects import postgresql # registra to_tsvector do Postgres
 from database import Base
 
 # Tabela de associação para o sistema de "Seguir"
@@ -7,7 +9,10 @@ from database import Base
 follows = Table(
     'follows', Base.metadata,
     Column('follower_id', Integer, ForeignKey('users.id', ondelete="CASCADE"), primary_key=True),
-    Column('followed_id', Integer, ForeignKey('users.id', ondelete="CASCADE"), primary_key=True)
+    Column('followed_id', Integer, ForeignKey('users.id', ondelete="CASCADE"), primary_key=True),
+    # A PK (follower_id, followed_id) atende "quem X segue"; este índice
+    # inverso atende "quem segue X" sem varrer a tabela inteira
+    Index('ix_follows_followed_id_follower_id', 'followed_id', 'follower_id')
 )
 
 class User(Base):
@@ -34,6 +39,23 @@ class User(Base):
     custom_link = Column(String, nullable=True)
     uni_link = Column(String, nullable=True)
 
+    # Contadores mantidos por follows.py a cada seguir/deixar de seguir,
+    # para o perfil não precisar carregar as listas inteiras. Em bancos
+    # antigos o migrate.py cria as colunas e as preenche a partir de 'follows'
+    followers_count = Column(Integer, nullable=False, default=0, server_default=text('0'))
+    following_count = Column(Integer, nullable=False, default=0, server_default=text('0'))
+
+    # Índice de texto para a busca por nome do autor no post_service (apenas
+    # Postgres). Fica aqui porque a tabela 'users' é deste serviço: é o
+    # migrate.py do user_service que o cria em bancos novos e antigos
+    __table_args__ = (
+        Index(
+            "ix_users_name_fts",
+            func.to_tsvector(text("'portuguese'"), name),
+            postgresql_using="gin"
+        ).ddl_if(dialect="postgresql"),
+    )
+
     # Relacionamento de seguidores
     followers = relationship(
         "User", 
@@ -53,6 +53,18 @@ class UserResponse(BaseModel):
     class Config:
         from_attributes = True
 
+# --- Resumo do usuário (autor de posts/respostas no post_service) ---
+class UserSummary(BaseModel):
+    id: int
+    name: str
+    username: str
+    email: EmailStr
+    college: Optional[str] = None
+    profile_picture: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
 class Token(BaseModel):
     access_token: str
     token_type: str
\ No newline at end of file
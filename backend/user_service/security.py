@@ -1,12 +1,19 @@
 from passlib.context import CryptContext
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from jose import JWTError, jwt
 from dotenv import load_dotenv
+import logging
+import multiprocessing
 import os
+import threading
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # --- Configurações do Token ---
 SECRET_KEY = os.environ.get("SECRET_KEY")
 ALGORITHM = "HS256"
@@ -18,12 +25,78 @@ if SECRET_KEY is None:
 # --- Configuração de Hash de Senha ---
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+# --- Pool de processos para o argon2 ---
+# O argon2 é pesado de propósito (CPU e memória). Rodando na thread da
+# requisição, uma rajada de logins ocupa o threadpool e o GIL e trava até o
+# /users/me. Aqui o hash roda em HASH_WORKERS processos separados e no máximo
+# HASH_QUEUE_LIMIT operações podem estar na fila ao mesmo tempo; quem passar
+# disso espera até HASH_QUEUE_TIMEOUT segundos e então recebe HashingBusy
+# (os endpoints respondem 503).
+# Os processos são criados com 'spawn': fork a partir de um worker do uvicorn,
+# que já tem threads, pode herdar locks presos. Se um deles morrer (ex.: OOM
+# no argon2) o pool inteiro fica quebrado; ele é descartado e a operação é
+# tentada uma vez num pool novo. Quebrando de novo, vira HashingBusy (503).
+HASH_WORKERS = int(os.environ.get("HASH_WORKERS", os.cpu_count() or 2))
+HASH_QUEUE_LIMIT = int(os.environ.get("HASH_QUEUE_LIMIT", HASH_WORKERS * 4))
+HASH_QUEUE_TIMEOUT = float(os.environ.get("HASH_QUEUE_TIMEOUT", 2))
+
+class HashingBusy(Exception):
+    pass
+
+_admission = threading.BoundedSemaphore(HASH_QUEUE_LIMIT)
+_executor_lock = threading.Lock()
+_executor: Optional[ProcessPoolExecutor] = None
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=HASH_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _executor
+
+def _discard_executor(broken: ProcessPoolExecutor):
+    global _executor
+    with _executor_lock:
+        # Outra requisição pode já ter trocado o pool quebrado por um novo
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+def shutdown_pool():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+def _run_in_pool(fn, *args):
+    if not _admission.acquire(timeout=HASH_QUEUE_TIMEOUT):
+        raise HashingBusy()
+    try:
+        for _ in range(2):
+            executor = _get_executor()
+            try:
+                return executor.submit(fn, *args).result()
+            except BrokenProcessPool:
+                logger.warning("Pool de hash quebrado (processo morreu); recriando")
+                _discard_executor(executor)
+        raise HashingBusy()
+    finally:
+        _admission.release()
+
+# Funções de módulo (e não lambdas) para poderem ir por pickle aos processos
+def _verify(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
-def get_password_hash(password: str) -> str:
+def _hash(password: str) -> str:
     return pwd_context.hash(password)
 
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return _run_in_pool(_verify, plain_password, hashed_password)
+
+def get_password_hash(password: str) -> str:
+    return _run_in_pool(_hash, password)
+
 # --- Funções do Token (JWT) ---
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
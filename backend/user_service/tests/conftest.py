@@ -0,0 +1,77 @@
+# --- Testes do user_service ---
+# Rodam contra um SQLite em arquivo (várias conexões de verdade, como em
+# produção), ou contra o banco de TEST_DATABASE_URL (ex.: um Postgres local
+# descartável: as tabelas são apagadas e recriadas).
+#
+#   cd backend/user_service && python -m pytest -q tests
+
+from datetime import datetime, timedelta, timezone
+import os
+import sys
+import tempfile
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+
+_tmpdir = tempfile.mkdtemp(prefix="unitalks-tests-")
+os.environ["DATABASE_URL"] = os.environ.get("TEST_DATABASE_URL", f"sqlite:///{_tmpdir}/test.db")
+os.environ.setdefault("SECRET_KEY", "test")
+
+import pytest
+from fastapi.testclient import TestClient
+from jose import jwt
+from sqlalchemy import event, insert
+from sqlalchemy.engine import Engine
+
+import database, models, auth
+
+
+@event.listens_for(Engine, "connect")
+def _sqlite_compat(dbapi_connection, connection_record):
+    # O SQLite não tem now(), precisa esperar pelo lock do arquivo quando
+    # várias conexões escrevem ao mesmo tempo e só aplica as FKs (ON DELETE
+    # CASCADE) quando pedido, como o Postgres faz
+    if not hasattr(dbapi_connection, "create_function"):
+        return
+    dbapi_connection.create_function(
+        "now", 0, lambda: datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")
+    )
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA busy_timeout=30000")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+@pytest.fixture
+def db_engine():
+    models.Base.metadata.drop_all(bind=database.engine)
+    models.Base.metadata.create_all(bind=database.engine)
+    yield database.engine
+    database.engine.dispose()
+
+
+@pytest.fixture
+def client(db_engine):
+    # Caches de processo começam vazios a cada teste (o banco é recriado).
+    # Sem 'with', o lifespan (aquecimento, pool de hash) não roda.
+    import main
+    for ttl_cache in (auth.token_cache, auth.principal_cache):
+        ttl_cache.clear()
+    return TestClient(main.app)
+
+
+def seed_users(engine, count: int):
+    # Direto no banco: o cadastro passaria pelo pool de hash (security.py)
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            {"id": user_id, "name": f"u{user_id}", "username": f"u{user_id}",
+             "email": f"u{user_id}@x.com", "hashed_password": "-"}
+            for user_id in range(1, count + 1)
+        ])
+
+
+def auth_headers(email: str) -> dict:
+    expire = datetime.now(timezone.utc) + timedelta(hours=1)
+    token = jwt.encode({"sub": email, "exp": expire}, auth.SECRET_KEY, algorithm=auth.ALGORITHM)
+    return {"Authorization": f"Bearer {token}"}
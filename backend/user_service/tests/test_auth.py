@@ -0,0 +1,38 @@
+from types import SimpleNamespace
+
+from sqlalchemy import update
+
+import auth, cache, models
+from conftest import auth_headers, seed_users
+
+
+def test_profile_update_is_visible_on_the_same_worker_at_once(client, db_engine):
+    seed_users(db_engine, 2)
+    headers = auth_headers("u1@x.com")
+    assert client.get("/users/me", headers=headers).json()["name"] == "u1"
+
+    response = client.put("/users/me", json={"name": "Ana", "username": "ana"}, headers=headers)
+    assert response.status_code == 200
+    me = client.get("/users/me", headers=headers).json()
+    assert (me["name"], me["username"]) == ("Ana", "ana")
+
+    # Nome de usuário de outra pessoa: recusado e o cache continua certo
+    response = client.put("/users/me", json={"username": "u2"}, headers=headers)
+    assert response.status_code == 400
+    assert client.get("/users/me", headers=headers).json()["username"] == "ana"
+
+
+def test_change_from_another_worker_goes_stale_for_at_most_the_ttl(client, db_engine, monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(cache, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    seed_users(db_engine, 1)
+    headers = auth_headers("u1@x.com")
+    assert client.get("/users/me", headers=headers).json()["name"] == "u1"
+
+    # Atendido por outro worker: este não recebe invalidate_user
+    with db_engine.begin() as conn:
+        conn.execute(update(models.User).where(models.User.id == 1).values(name="Ana"))
+    assert client.get("/users/me", headers=headers).json()["name"] == "u1"
+
+    clock.now += auth.AUTH_PRINCIPAL_TTL + 0.1
+    assert client.get("/users/me", headers=headers).json()["name"] == "Ana"
@@ -0,0 +1,67 @@
+from sqlalchemy import insert
+
+import models
+from conftest import seed_users
+
+USERS = 12
+
+
+def _seed(engine):
+    # u1 é seguido por todos e segue todos
+    seed_users(engine, USERS)
+    with engine.begin() as conn:
+        conn.execute(insert(models.follows), [
+            {"follower_id": other, "followed_id": 1} for other in range(2, USERS + 1)
+        ] + [
+            {"follower_id": 1, "followed_id": other} for other in range(2, USERS + 1)
+        ])
+
+
+def _walk(client, path: str, limit: int):
+    ids, cursors, params = [], [], {"limit": limit}
+    while True:
+        response = client.get(path, params=params)
+        assert response.status_code == 200
+        ids += [user["id"] for user in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return ids, cursors
+        cursors.append(cursor)
+        params = {"limit": limit, "cursor": cursor}
+
+
+def test_cursor_walks_followers_and_following_once(client, db_engine):
+    _seed(db_engine)
+    expected = list(range(2, USERS + 1))
+    for path in ("/users/1/followers", "/users/1/following"):
+        ids, cursors = _walk(client, path, 4)
+        assert ids == expected
+        # 11 itens em páginas de 4: a última página (3 itens) vem sem cursor
+        assert cursors == ["5", "9"]
+
+
+def test_exact_multiple_ends_with_an_empty_page(client, db_engine):
+    _seed(db_engine)
+    ids, cursors = _walk(client, "/users/1/followers", 11)
+    assert ids == list(range(2, USERS + 1))
+    assert cursors == ["12"]
+
+
+def test_unchanged_page_is_a_304(client, db_engine):
+    _seed(db_engine)
+    first = client.get("/users/1/followers", params={"limit": 5})
+    tag = first.headers["ETag"]
+    again = client.get("/users/1/followers", params={"limit": 5}, headers={"If-None-Match": tag})
+    assert again.status_code == 304
+    assert again.content == b""
+
+    # Um seguidor da página mudou de nome: a página mudou
+    with db_engine.begin() as conn:
+        conn.execute(models.User.__table__.update().where(models.User.id == 3).values(name="Outro"))
+    assert client.get("/users/1/followers", params={"limit": 5}, headers={"If-None-Match": tag}).status_code == 200
+
+
+def test_missing_user_is_404(client, db_engine):
+    seed_users(db_engine, 1)
+    assert client.get("/users/99/followers").status_code == 404
+    assert client.get("/users/99/following").status_code == 404
@@ -0,0 +1,41 @@
+from sqlalchemy import func, select
+
+import models
+from conftest import auth_headers, seed_users
+
+
+def _counts(client, email: str):
+    body = client.get("/users/me", headers=auth_headers(email)).json()
+    return body["followers_count"], body["following_count"]
+
+
+def test_follow_is_idempotent_and_keeps_counters(client, db_engine):
+    seed_users(db_engine, 2)
+    ana = auth_headers("u1@x.com")
+
+    # Carrega u1 e u2 no cache de autenticação antes de seguir
+    assert _counts(client, "u1@x.com") == (0, 0)
+    assert _counts(client, "u2@x.com") == (0, 0)
+
+    for _ in range(2):
+        assert client.post("/users/2/follow", headers=ana).status_code == 204
+    # Seguir invalida o cache dos dois usuários: as contagens já vêm novas
+    assert _counts(client, "u1@x.com") == (0, 1)
+    assert _counts(client, "u2@x.com") == (1, 0)
+
+    for _ in range(2):
+        assert client.delete("/users/2/follow", headers=ana).status_code == 204
+    assert _counts(client, "u1@x.com") == (0, 0)
+    assert _counts(client, "u2@x.com") == (0, 0)
+
+    with db_engine.connect() as conn:
+        assert conn.execute(select(func.count()).select_from(models.follows)).scalar() == 0
+
+
+def test_follow_rejects_self_and_missing_users(client, db_engine):
+    seed_users(db_engine, 1)
+    ana = auth_headers("u1@x.com")
+    assert client.post("/users/1/follow", headers=ana).status_code == 400
+    assert client.post("/users/99/follow", headers=ana).status_code == 404
+    assert client.delete("/users/99/follow", headers=ana).status_code == 404
+    assert _counts(client, "u1@x.com") == (0, 0)
@@ -14,7 +14,8 @@ import { Button } from "@/components/ui/button";
 import { ReplyCard } from "./ReplyCard";
 import { toast } from "./ui/use-toast";
 import { useAuth } from "@/context/AuthContext"; 
-import { ReplyResponse } from "@/types"; // <-- 1. Importar nosso tipo
+import { ReplyNode, ReplyResponse } from "@/types"; // <-- 1. Importar nosso tipo
+import { fetchReplyThread, toReplyNode } from "@/lib/replies";
 
 // Props que o CommentCard espera
 interface CommentCardProps {
@@ -26,6 +27,8 @@ interface CommentCardProps {
   disagreeCount: number;
   timestamp: string;
   initialReplies: ReplyResponse[]; // <-- 2. Receber a prop
+  replyCount: number; // Total de respostas (o feed só traz uma prévia)
+  initialVote?: "agree" | "disagree" | null; // Voto do usuário logado (GET /votes/me)
 }
 
 export function CommentCard({
@@ -37,25 +40,46 @@ export function CommentCard({
   disagreeCount: initialDisagreeCount,
   timestamp,
   initialReplies, // <-- 3. Usar a prop
+  replyCount: initialReplyCount,
+  initialVote = null,
 }: CommentCardProps) {
   
   // --- Estados Locais ---
-  const [userVote, setUserVote] = useState<"agree" | "disagree" | null>(null);
+  const [userVote, setUserVote] = useState<"agree" | "disagree" | null>(initialVote);
   const [isReplying, setIsReplying] = useState(false);
   const [replyContent, setReplyContent] = useState("");
-  const [replies, setReplies] = useState<ReplyResponse[]>(initialReplies); // 4. Inicializar estado com as respostas
+  // Respostas de 1º nível, cada uma com sua subárvore (GET /replies/thread)
+  const [replies, setReplies] = useState<ReplyNode[]>(
+    initialReplies.filter(reply => reply.parent_reply_id === null).map(toReplyNode)
+  );
   const [showReplies, setShowReplies] = useState(false);
+  const [replyCount, setReplyCount] = useState(initialReplyCount);
+  const [repliesLoaded, setRepliesLoaded] = useState(false);
+  const [repliesCursor, setRepliesCursor] = useState<string | null>(null);
+  const [isLoadingReplies, setIsLoadingReplies] = useState(false);
   const [isDeleteModalOpen, setIsDeleteModalOpen] = useState(false);
   const [agreeCount, setAgreeCount] = useState(initialAgreeCount);
   const [disagreeCount, setDisagreeCount] = useState(initialDisagreeCount);
   
+  // Os votos chegam depois dos posts, então sincroniza quando a prop muda
+  useEffect(() => {
+    setUserVote(initialVote);
+  }, [initialVote]);
+
+  // Contadores atualizados em tempo real pelo feed (GET /events)
+  useEffect(() => {
+    setAgreeCount(initialAgreeCount);
+    setDisagreeCount(initialDisagreeCount);
+  }, [initialAgreeCount, initialDisagreeCount]);
+
+  useEffect(() => {
+    setReplyCount(initialReplyCount);
+  }, [initialReplyCount]);
+
   const { user, isLoading: isAuthLoading } = useAuth();
   const isLoggedIn = !!user;
   const isOwner = isLoggedIn && !isAuthLoading && user?.id.toString() === userId;
 
-  // Filtra apenas as respostas de "primeiro nível" (sem 'pai')
-  const topLevelReplies = replies.filter(reply => reply.parent_reply_id === null);
-
   
   // --- Funções de Ação ---
 
@@ -148,7 +172,8 @@ export function CommentCard({
       const newReply: ReplyResponse = await response.json();
 
       // Atualiza o estado local para a UI recarregar
-      setReplies(currentReplies => [...currentReplies, newReply]);
+      setReplies(currentReplies => [...currentReplies, toReplyNode(newReply)]);
+      setReplyCount(c => c + 1);
       setReplyContent("");
       setIsReplying(false);
       setShowReplies(true); // Abre as respostas
@@ -192,7 +217,38 @@ export function CommentCard({
     }
   };
   
-  const toggleShowReplies = () => {
+  // O feed não traz mais todas as respostas: ao abrir busca a árvore já
+  // montada pelo backend (profundidade e página limitadas, ver lib/replies.ts);
+  // mais respostas de 1º nível vêm sob demanda pelo 'next_cursor'
+  const loadMoreReplies = async () => {
+    setIsLoadingReplies(true);
+    try {
+      const page = await fetchReplyThread(id, null, repliesCursor);
+      // Respostas enviadas daqui já estão na lista
+      setReplies(current => [...current, ...page.replies.filter(reply => !current.some(r => r.id === reply.id))]);
+      setRepliesCursor(page.next_cursor);
+    } catch (err) {
+      toast({ title: "Erro", description: "Não foi possível carregar as respostas.", variant: "destructive" });
+    } finally {
+      setIsLoadingReplies(false);
+    }
+  };
+
+  const toggleShowReplies = async () => {
+    if (!showReplies && !repliesLoaded) {
+      setIsLoadingReplies(true);
+      try {
+        const page = await fetchReplyThread(id, null, null);
+        setReplies(page.replies);
+        setRepliesCursor(page.next_cursor);
+        setRepliesLoaded(true);
+      } catch (err) {
+        toast({ title: "Erro", description: "Não foi possível carregar as respostas.", variant: "destructive" });
+        return;
+      } finally {
+        setIsLoadingReplies(false);
+      }
+    }
     setShowReplies(!showReplies); 
   };
 
@@ -255,7 +311,7 @@ export function CommentCard({
                 </Button>
                 
                 {/* 5. Só mostra o botão se houver respostas */}
-                {replies.length > 0 && (
+                {replyCount > 0 && (
                   <Button
                     variant="accent"
                     size="sm"
@@ -264,7 +320,7 @@ export function CommentCard({
                     <CornerDownRight className="h-4 w-4" />
                     {showReplies
                       ? "Ocultar respostas"
-                      : `Ver ${replies.length} ${replies.length > 1 ? "respostas" : "resposta"}`
+                      : `Ver ${replyCount} ${replyCount > 1 ? "respostas" : "resposta"}`
                     }
                   </Button>
                 )}
@@ -284,17 +340,26 @@ export function CommentCard({
               {/* 6. Mostra as respostas de 1º nível */}
               {showReplies && (
                 <div className="mt-4 pl-6 border-l border-border/40 space-y-4">
-                  {topLevelReplies.length > 0 ? (
-                    topLevelReplies.map((reply) => (
+                  {replies.length > 0 ? (
+                    replies.map((reply) => (
                       <ReplyCard
                         key={reply.id}
-                        replyData={reply}
-                        allReplies={replies}
+                        node={reply}
                       />
                     ))
                   ) : (
                     <p className="text-xs text-muted-foreground italic">Nenhuma resposta encontrada.</p>
                   )}
+                  {repliesCursor && (
+                    <Button
+                      variant="subtle"
+                      size="sm"
+                      onClick={loadMoreReplies}
+                      disabled={isLoadingReplies}
+                    >
+                      {isLoadingReplies ? "Carregando..." : "Carregar mais respostas"}
+                    </Button>
+                  )}
                 </div>
               )}
             </div>
@@ -4,7 +4,7 @@ import { Skeleton } from './ui/skeleton';
 import { Button } from './ui/button'; 
 import { format } from 'date-fns'; 
 import { ptBR } from 'date-fns/locale'; 
-import { PostResponse } from '@/types';
+import { PostResponse, MyVote } from '@/types';
 import { useSearchParams } from 'react-router-dom';
 
 export function OpinionFeed() {
@@ -12,15 +12,45 @@ export function OpinionFeed() {
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   
-  const [skip, setSkip] = useState(0);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [hasMore, setHasMore] = useState(true);
   const [isLoadingMore, setIsLoadingMore] = useState(false);
+  // A busca é ranqueada: pagina pela posição no ranking ('skip'), não por cursor
+  const [searchSkip, setSearchSkip] = useState(0);
+  const [myVotes, setMyVotes] = useState<Record<number, "agree" | "disagree">>({});
   const LIMIT = 10; 
 
+  // "todos" = feed global; "seguindo" = timeline de quem o usuário segue
+  const [feedMode, setFeedMode] = useState<"todos" | "seguindo">("todos");
+  const isLoggedIn = !!localStorage.getItem('userToken');
+  const [newPostsCount, setNewPostsCount] = useState(0);
+
   const [searchParams] = useSearchParams();
   const searchQuery = searchParams.get("q");
 
-  const fetchPosts = async (offset: number, isNewContext: boolean = false) => {
+  // Busca de uma vez os votos do usuário logado para a página carregada
+  const fetchMyVotes = async (posts: PostResponse[]) => {
+    const token = localStorage.getItem('userToken');
+    if (!token || posts.length === 0) return;
+
+    const params = posts.map(post => `post_ids=${post.id}`).join("&");
+    try {
+      const response = await fetch(`http://127.0.0.1:8001/votes/me?${params}`, {
+        headers: { "Authorization": `Bearer ${token}` }
+      });
+      if (!response.ok) return;
+      const votes: MyVote[] = await response.json();
+      setMyVotes(prev => {
+        const next = { ...prev };
+        votes.forEach(vote => { next[vote.post_id] = vote.vote_type; });
+        return next;
+      });
+    } catch (err) {
+      console.error("Erro ao buscar votos do usuário:", err);
+    }
+  };
+
+  const fetchPosts = async (cursor: string | null, isNewContext: boolean = false) => {
     if (isNewContext) {
       setIsLoading(true);
       setError(null);
@@ -30,36 +60,47 @@ export function OpinionFeed() {
     
     try {
       let url = "";
+      const headers: Record<string, string> = {};
       
+      const skip = isNewContext ? 0 : searchSkip;
       if (searchQuery) {
-        url = `http://127.0.0.1:8001/search?q=${encodeURIComponent(searchQuery)}`;
+        url = `http://127.0.0.1:8001/search?q=${encodeURIComponent(searchQuery)}&limit=${LIMIT}&skip=${skip}`;
       } else {
-        url = `http://127.0.0.1:8001/posts/?skip=${offset}&limit=${LIMIT}`;
+        if (feedMode === "seguindo") {
+          url = `http://127.0.0.1:8001/timeline?limit=${LIMIT}`;
+          headers["Authorization"] = `Bearer ${localStorage.getItem('userToken')}`;
+        } else {
+          url = `http://127.0.0.1:8001/posts/?limit=${LIMIT}`;
+        }
+        if (cursor) {
+          url += `&cursor=${encodeURIComponent(cursor)}`;
+        }
       }
 
-      const response = await fetch(url);
+      const response = await fetch(url, { headers });
 
       if (!response.ok) {
         throw new Error(`Falha ao buscar posts: ${response.status}`);
       }
 
       const data: PostResponse[] = await response.json();
+      fetchMyVotes(data);
+
+      if (isNewContext) {
+         setComments(data); 
+      } else {
+         setComments(prev => [...prev, ...data]); 
+      }
 
       if (searchQuery) {
-        setComments(data);
-        setHasMore(false); 
+        // Página cheia: pode haver mais resultados
+        setSearchSkip(skip + data.length);
+        setHasMore(data.length === LIMIT);
       } else {
-        if (isNewContext) {
-           setComments(data); 
-        } else {
-           setComments(prev => [...prev, ...data]); 
-        }
-        
-        if (data.length < LIMIT) {
-          setHasMore(false);
-        } else {
-          setHasMore(true);
-        }
+        // O backend devolve o cursor da próxima página no header
+        const cursorHeader = response.headers.get("X-Next-Cursor");
+        setNextCursor(cursorHeader);
+        setHasMore(cursorHeader !== null);
       }
 
     } catch (err) {
@@ -76,15 +117,56 @@ export function OpinionFeed() {
   };
 
   useEffect(() => {
-    setSkip(0);
+    setNextCursor(null);
+    setSearchSkip(0);
+    setHasMore(true);
+    setNewPostsCount(0);
+    fetchPosts(null, true);
+  }, [searchQuery, feedMode]);
+
+  // --- Atualizações em tempo real (Server-Sent Events) ---
+  // Votos e respostas atualizam os contadores dos posts já exibidos; posts
+  // novos só acendem o aviso, e a lista é recarregada quando o usuário quiser.
+  useEffect(() => {
+    const source = new EventSource("http://127.0.0.1:8001/events");
+
+    source.addEventListener("votes", (event) => {
+      const { counts } = JSON.parse((event as MessageEvent).data) as { counts: [number, number, number][] };
+      const byPost = new Map(counts.map(([postId, agree, disagree]) => [postId, { agree, disagree }]));
+      setComments(prev => prev.map(post => {
+        const update = byPost.get(post.id);
+        return update ? { ...post, agree_count: update.agree, disagree_count: update.disagree } : post;
+      }));
+    });
+
+    const changeReplyCount = (delta: number) => (event: Event) => {
+      const { post_id } = JSON.parse((event as MessageEvent).data);
+      setComments(prev => prev.map(post =>
+        post.id === post_id ? { ...post, reply_count: Math.max(0, (post.reply_count ?? 0) + delta) } : post
+      ));
+    };
+    source.addEventListener("reply_created", changeReplyCount(1));
+    source.addEventListener("reply_deleted", changeReplyCount(-1));
+
+    source.addEventListener("post_deleted", (event) => {
+      const { id } = JSON.parse((event as MessageEvent).data);
+      setComments(prev => prev.filter(post => post.id !== id));
+    });
+
+    source.addEventListener("post_created", () => setNewPostsCount(count => count + 1));
+
+    return () => source.close();
+  }, []);
+
+  const handleShowNewPosts = () => {
+    setNewPostsCount(0);
+    setNextCursor(null);
     setHasMore(true);
-    fetchPosts(0, true);
-  }, [searchQuery]);
+    fetchPosts(null, true);
+  };
 
   const handleLoadMore = () => {
-    const newSkip = skip + LIMIT;
-    setSkip(newSkip);
-    fetchPosts(newSkip, false);
+    fetchPosts(nextCursor, false);
   };
 
   if (isLoading && comments.length === 0) {
@@ -109,6 +191,31 @@ export function OpinionFeed() {
 
   return (
     <div className="opinion-feed space-y-4 pb-8"> 
+      {!searchQuery && isLoggedIn && (
+        <div className="flex gap-2 mb-4">
+          {(["todos", "seguindo"] as const).map(mode => (
+            <Button
+              key={mode}
+              onClick={() => setFeedMode(mode)}
+              variant={feedMode === mode ? "default" : "outline"}
+              size="sm"
+              className={feedMode === mode ? "bg-purple-600 hover:bg-purple-700" : "border-tech-gray text-gray-400 hover:text-white hover:bg-white/10"}
+            >
+              {mode === "todos" ? "Todos" : "Seguindo"}
+            </Button>
+          ))}
+        </div>
+      )}
+
+      {!searchQuery && newPostsCount > 0 && (
+        <Button
+          onClick={handleShowNewPosts}
+          className="w-full bg-purple-600 hover:bg-purple-700 text-white"
+        >
+          {newPostsCount === 1 ? "1 novo post" : `${newPostsCount} novos posts`} — clique para ver
+        </Button>
+      )}
+
       {searchQuery && (
         <div className="mb-4 text-xl font-bold text-white">
           Resultados para: <span className="text-purple-400">"{searchQuery}"</span>
@@ -128,17 +235,19 @@ export function OpinionFeed() {
                 disagreeCount={post.disagree_count}
                 timestamp={format(new Date(post.created_at), "dd/MM/yyyy 'às' HH:mm", { locale: ptBR })}
                 initialReplies={post.replies || []} 
+                replyCount={post.reply_count ?? 0}
+                initialVote={myVotes[post.id] ?? null}
               />
             ))}
             
-            {!searchQuery && hasMore && (
+            {hasMore && (
                 <Button 
                     onClick={handleLoadMore} 
                     disabled={isLoadingMore}
                     variant="outline" 
                     className="w-full mt-4 border-tech-gray text-gray-400 hover:text-white hover:bg-white/10"
                 >
-                    {isLoadingMore ? "Carregando..." : "Carregar mais posts..."}
+                    {isLoadingMore ? "Carregando..." : searchQuery ? "Carregar mais resultados..." : "Carregar mais posts..."}
                 </Button>
             )}
             
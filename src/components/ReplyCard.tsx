@@ -7,31 +7,55 @@ import { useAuth } from '@/context/AuthContext';
 import { toast } from './ui/use-toast';
 import { format } from 'date-fns';
 import { ptBR } from 'date-fns/locale';
-import { ReplyResponse } from '@/types'; 
+import { ReplyNode, ReplyResponse } from '@/types'; 
+import { fetchReplyThread, toReplyNode } from '@/lib/replies';
 
 interface ReplyCardProps {
-    replyData: ReplyResponse;
-    allReplies: ReplyResponse[];
+    node: ReplyNode;
 } 
 
 export const ReplyCard: React.FC<ReplyCardProps> = ({
-    replyData,
-    allReplies 
+    node
 }) => {
-    const { id: replyId, post_id: postId, owner_id: userId } = replyData;
-    const authorName = replyData.owner.name;
-    const content = replyData.content;
-    const timestamp = format(new Date(replyData.created_at), "dd/MM/yyyy HH:mm", { locale: ptBR });
+    const { id: replyId, post_id: postId, owner_id: userId } = node;
+    const authorName = node.owner.name;
+    const content = node.content;
+    const timestamp = format(new Date(node.created_at), "dd/MM/yyyy HH:mm", { locale: ptBR });
 
     const [isReplyingToReply, setIsReplyingToReply] = useState(false);
     const [nestedReplyContent, setNestedReplyContent] = useState('');
     const [showNestedReplies, setShowNestedReplies] = useState(false);
+    const [children, setChildren] = useState<ReplyNode[]>(node.children);
+    const [childCursor, setChildCursor] = useState<string | null>(node.next_cursor);
+    const [childCount, setChildCount] = useState(node.reply_count);
+    const [isLoadingChildren, setIsLoadingChildren] = useState(false);
 
     const { user, isLoading: isAuthLoading } = useAuth();
     const isLoggedIn = !!user;
     const isOwner = isLoggedIn && !isAuthLoading && user?.id === userId;
 
-    const nestedReplies = allReplies.filter(reply => reply.parent_reply_id === replyId);
+    // Nó do último nível chega sem filhos: a primeira página vem sem cursor
+    const hasMoreChildren = childCursor !== null || (children.length === 0 && childCount > 0);
+
+    const loadChildren = async () => {
+      setIsLoadingChildren(true);
+      try {
+        const page = await fetchReplyThread(postId, replyId, childCursor);
+        setChildren(current => [...current, ...page.replies.filter(reply => !current.some(r => r.id === reply.id))]);
+        setChildCursor(page.next_cursor);
+      } catch (err) {
+        toast({ title: "Erro", description: "Não foi possível carregar as respostas.", variant: "destructive" });
+      } finally {
+        setIsLoadingChildren(false);
+      }
+    };
+
+    const toggleNestedReplies = async () => {
+      if (!showNestedReplies && children.length === 0 && childCount > 0) {
+        await loadChildren();
+      }
+      setShowNestedReplies(!showNestedReplies);
+    };
 
     const handleSendNestedReply = async () => {
       if (!isLoggedIn) { toast({ title: "Acesso Negado", description: "Faça login para responder.", variant: "destructive"}); return; }
@@ -63,8 +87,14 @@ export const ReplyCard: React.FC<ReplyCardProps> = ({
           throw new Error(errorData.detail || "Falha ao enviar resposta.");
         }
         
+        // Entra no fim dos filhos já carregados, sem recarregar a página
+        const newReply: ReplyResponse = await response.json();
+        setChildren(current => [...current, toReplyNode(newReply)]);
+        setChildCount(count => count + 1);
+        setNestedReplyContent('');
+        setIsReplyingToReply(false);
+        setShowNestedReplies(true);
         toast({ title: "Resposta enviada!" });
-        window.location.reload(); 
 
       } catch (err) {
          if (err instanceof Error) {
@@ -138,10 +168,10 @@ export const ReplyCard: React.FC<ReplyCardProps> = ({
                         <MessageSquareReply className="h-3 w-3 mr-1" /> Responder
                     </Button> 
                     
-                    {nestedReplies.length > 0 && (
-                      <Button variant="ghost" size="sm" className="text-muted-foreground hover:text-foreground h-auto p-1 text-xs" onClick={() => setShowNestedReplies(!showNestedReplies)}> 
+                    {childCount > 0 && (
+                      <Button variant="ghost" size="sm" className="text-muted-foreground hover:text-foreground h-auto p-1 text-xs" onClick={toggleNestedReplies} disabled={isLoadingChildren}> 
                         <CornerDownRight className="h-3 w-3 mr-1" /> 
-                        {showNestedReplies ? "Ocultar" : `Ver ${nestedReplies.length} ${nestedReplies.length > 1 ? "respostas" : "resposta"}`}
+                        {showNestedReplies ? "Ocultar" : `Ver ${childCount} ${childCount > 1 ? "respostas" : "resposta"}`}
                       </Button> 
                     )}
                 </div>
@@ -158,17 +188,21 @@ export const ReplyCard: React.FC<ReplyCardProps> = ({
 
                  {showNestedReplies && (
                     <div className="mt-3 pl-4 border-l-2 border-border/30 space-y-2"> 
-                        {nestedReplies.length > 0 ? (
-                            nestedReplies.map(nestedReply => (
+                        {children.length > 0 ? (
+                            children.map(child => (
                                 <ReplyCard
-                                    key={nestedReply.id}
-                                    replyData={nestedReply} 
-                                    allReplies={allReplies}
+                                    key={child.id}
+                                    node={child}
                                 />
                             ))
                         ) : (
                             <p className="text-xs text-muted-foreground italic py-1">Nenhuma resposta aqui.</p>
                         )}
+                        {hasMoreChildren && children.length > 0 && (
+                            <Button variant="ghost" size="sm" className="text-muted-foreground hover:text-foreground h-auto p-1 text-xs" onClick={loadChildren} disabled={isLoadingChildren}>
+                                {isLoadingChildren ? "Carregando..." : "Carregar mais respostas"}
+                            </Button>
+                        )}
                     </div>
                  )}
             </CardContent>
@@ -75,7 +75,7 @@ export function TrendingDiscussions() {
                       {topic.agree_count}
                     </span>
                     <span className="flex items-center gap-1">
-                      💬 {topic.replies ? topic.replies.length : 0}
+                      💬 {topic.reply_count ?? 0}
                     </span>
                   </div>
                 </div>
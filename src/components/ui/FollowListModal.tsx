@@ -18,9 +18,11 @@ interface FollowListModalProps {
   title: string;
   users: UserSummary[];
   isLoading: boolean;
+  hasMore?: boolean;
+  onLoadMore?: () => void;
 }
 
-export function FollowListModal({ isOpen, onClose, title, users, isLoading }: FollowListModalProps) {
+export function FollowListModal({ isOpen, onClose, title, users, isLoading, hasMore, onLoadMore }: FollowListModalProps) {
   return (
     <Dialog open={isOpen} onOpenChange={onClose}>
       <DialogContent className="bg-[#121212] border-gray-800 text-white max-w-md">
@@ -31,7 +33,7 @@ export function FollowListModal({ isOpen, onClose, title, users, isLoading }: Fo
         </DialogHeader>
         
         <ScrollArea className="h-[300px] pr-4 mt-4">
-          {isLoading ? (
+          {isLoading && users.length === 0 ? (
              <div className="text-center text-gray-500 py-8">Carregando lista...</div>
           ) : users.length > 0 ? (
             <div className="space-y-4">
@@ -51,6 +53,15 @@ export function FollowListModal({ isOpen, onClose, title, users, isLoading }: Fo
                   {/* Futuramente: Botão de Seguir/Deixar de Seguir aqui */}
                 </div>
               ))}
+              {hasMore && (
+                <button
+                  onClick={onLoadMore}
+                  disabled={isLoading}
+                  className="w-full text-sm text-purple-400 hover:text-purple-300 py-2 disabled:text-gray-500"
+                >
+                  {isLoading ? "Carregando..." : "Carregar mais"}
+                </button>
+              )}
             </div>
           ) : (
             <div className="text-center text-gray-500 py-8">
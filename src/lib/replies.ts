@@ -0,0 +1,23 @@
+import { ReplyNode, ReplyResponse, ThreadResponse } from "@/types";
+
+// --- Árvore de respostas (GET /posts/{id}/replies/thread) ---
+// O backend devolve a árvore já montada, limitada a THREAD_DEPTH níveis e
+// THREAD_PAGE_SIZE filhos por nó. O resto de cada subárvore é buscado sob
+// demanda: 'parent_id' + 'next_cursor' do nó (ou só 'parent_id' para um nó
+// no último nível, que chega sem filhos carregados).
+export const THREAD_DEPTH = 3;
+export const THREAD_PAGE_SIZE = 10;
+
+export async function fetchReplyThread(postId: number | string, parentId: number | null, cursor: string | null): Promise<ThreadResponse> {
+  let url = `http://127.0.0.1:8001/posts/${postId}/replies/thread?depth=${THREAD_DEPTH}&page_size=${THREAD_PAGE_SIZE}`;
+  if (parentId !== null) url += `&parent_id=${parentId}`;
+  if (cursor) url += `&cursor=${encodeURIComponent(cursor)}`;
+  const response = await fetch(url);
+  if (!response.ok) throw new Error("Falha ao carregar respostas.");
+  return response.json();
+}
+
+// Resposta recém-criada entra na árvore como um nó sem filhos
+export function toReplyNode(reply: ReplyResponse): ReplyNode {
+  return { ...reply, reply_count: 0, children: [], next_cursor: null };
+}
@@ -44,6 +44,8 @@ export function ProfilePage() {
   const [isFollowersOpen, setIsFollowersOpen] = React.useState(false);
   const [isFollowingOpen, setIsFollowingOpen] = React.useState(false);
   const [followList, setFollowList] = React.useState<any[]>([]);
+  const [followCursor, setFollowCursor] = React.useState<string | null>(null);
+  const [followType, setFollowType] = React.useState<'followers' | 'following'>('followers');
   const [isLoadingFollows, setIsLoadingFollows] = React.useState(false);
 
   const [userPosts, setUserPosts] = React.useState<PostResponse[]>([]);
@@ -91,20 +93,27 @@ export function ProfilePage() {
   }, [navigate]);
 
   // --- Buscar Lista de Seguidores/Seguindo ---
-  const fetchFollowList = async (type: 'followers' | 'following') => {
+  // A lista vem paginada: o próximo cursor chega no header X-Next-Cursor
+  const fetchFollowList = async (type: 'followers' | 'following', cursor: string | null = null) => {
     if (!userProfile) return;
     setIsLoadingFollows(true);
-    setFollowList([]); // Limpa a lista anterior
-    
-    // Abre o modal correspondente
-    if (type === 'followers') setIsFollowersOpen(true);
-    else setIsFollowingOpen(true);
+    if (!cursor) {
+      setFollowList([]); // Limpa a lista anterior
+      setFollowType(type);
+
+      // Abre o modal correspondente
+      if (type === 'followers') setIsFollowersOpen(true);
+      else setIsFollowingOpen(true);
+    }
 
     try {
-      const response = await fetch(`http://127.0.0.1:8000/users/${userProfile.id}/${type}`);
+      const params = new URLSearchParams({ limit: '20' });
+      if (cursor) params.set('cursor', cursor);
+      const response = await fetch(`http://127.0.0.1:8000/users/${userProfile.id}/${type}?${params}`);
       if (response.ok) {
         const data = await response.json();
-        setFollowList(data);
+        setFollowList(prev => cursor ? [...prev, ...data] : data);
+        setFollowCursor(response.headers.get('X-Next-Cursor'));
       }
     } catch (error) {
       console.error(error);
@@ -269,6 +278,7 @@ export function ProfilePage() {
                                     disagreeCount={post.disagree_count}
                                     timestamp={format(new Date(post.created_at), "dd/MM/yyyy HH:mm", { locale: ptBR })}
                                     initialReplies={post.replies || []}
+                                    replyCount={post.reply_count ?? 0}
                                 />
                             ))
                          ) : (
@@ -291,6 +301,7 @@ export function ProfilePage() {
                                     disagreeCount={post.disagree_count}
                                     timestamp={format(new Date(post.created_at), "dd/MM/yyyy HH:mm", { locale: ptBR })}
                                     initialReplies={post.replies || []}
+                                    replyCount={post.reply_count ?? 0}
                                 />
                             ))
                          ) : (
@@ -324,6 +335,8 @@ export function ProfilePage() {
         title="Seguidores" 
         users={followList}
         isLoading={isLoadingFollows}
+        hasMore={!!followCursor}
+        onLoadMore={() => fetchFollowList(followType, followCursor)}
       />
 
       {/* Modal de Seguindo */}
@@ -333,6 +346,8 @@ export function ProfilePage() {
         title="Seguindo" 
         users={followList}
         isLoading={isLoadingFollows}
+        hasMore={!!followCursor}
+        onLoadMore={() => fetchFollowList(followType, followCursor)}
       />
 
       <PostCommentModal 
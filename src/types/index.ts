@@ -17,6 +17,18 @@ export interface ReplyResponse {
   owner: UserResponse;
 }
 
+// Nó da árvore de respostas (GET /posts/{id}/replies/thread)
+export interface ReplyNode extends ReplyResponse {
+  reply_count: number; // Total de respostas diretas a este nó
+  children: ReplyNode[]; // Só a primeira página, até a profundidade pedida
+  next_cursor: string | null; // Para carregar mais filhos deste nó
+}
+
+export interface ThreadResponse {
+  replies: ReplyNode[];
+  next_cursor: string | null;
+}
+
 // Esta interface define um 'post' (que inclui uma lista de respostas)
 export interface PostResponse {
   id: number;
@@ -26,5 +38,12 @@ export interface PostResponse {
   owner: UserResponse;
   agree_count: number;
   disagree_count: number;
-  replies: ReplyResponse[]; // Um post contém uma lista de respostas
+  reply_count: number;
+  replies: ReplyResponse[]; // Prévia das primeiras respostas (vazia por padrão)
+}
+
+// Voto do usuário logado em um post (GET /votes/me)
+export interface MyVote {
+  post_id: number;
+  vote_type: "agree" | "disagree";
 }
\ No newline at end of file